@@ -5,6 +5,9 @@ from chevalvideo.style import DARK_STYLE
 
 
 def main():
+    if sys.argv[1:2] == ["watch"]:
+        from chevalvideo.watch import run_headless
+        sys.exit(run_headless(sys.argv[2:]))
     app = QApplication(sys.argv)
     app.setApplicationName("chevalvideo")
     app.setStyleSheet(DARK_STYLE)
@@ -2,7 +2,7 @@
 
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
-    QHBoxLayout, QMainWindow, QPushButton, QStackedWidget, QVBoxLayout, QWidget,
+    QDockWidget, QHBoxLayout, QMainWindow, QPushButton, QStackedWidget, QVBoxLayout, QWidget,
 )
 
 from chevalvideo.pages.convert import ConvertPage
@@ -21,6 +21,9 @@ from chevalvideo.pages.rotate import RotatePage
 from chevalvideo.pages.subtitles import SubtitlesPage
 from chevalvideo.pages.audio_mix import AudioMixPage
 from chevalvideo.pages.batch import BatchPage
+from chevalvideo.pages.pipeline import PipelinePage
+from chevalvideo.pages.performance import PerformancePage
+from chevalvideo.widgets.job_queue import JobQueueWidget
 
 
 PAGES = [
@@ -40,6 +43,8 @@ PAGES = [
     ("Thumbnail", ThumbnailPage),
     ("GIF", GifPage),
     ("Batch", BatchPage),
+    ("Pipeline", PipelinePage),
+    ("Performance", PerformancePage),
 ]
 
 
@@ -64,6 +69,7 @@ class MainWindow(QMainWindow):
 
         self._stack = QStackedWidget()
         self._nav_buttons: list[QPushButton] = []
+        pages: dict[str, QWidget] = {}
 
         for i, (name, PageClass) in enumerate(PAGES):
             btn = QPushButton(f"  {name}")
@@ -75,11 +81,27 @@ class MainWindow(QMainWindow):
 
             page = PageClass()
             self._stack.addWidget(page)
+            pages[name] = page
+
+        # Pages whose transforms the Pipeline page can fuse into one pass
+        pages["Pipeline"].set_sources({
+            name: pages[name] for name in ("Rotate/Crop", "Watermark", "Resize", "Subtitles")
+        })
 
         sb_layout.addStretch()
         root.addWidget(sidebar)
         root.addWidget(self._stack, 1)
 
+        # Jobs from every page share one scheduler; this is its queue
+        jobs_dock = QDockWidget("Jobs", self)
+        jobs_dock.setObjectName("jobs_dock")
+        jobs_dock.setWidget(JobQueueWidget())
+        jobs_dock.setFeatures(
+            QDockWidget.DockWidgetFeature.DockWidgetMovable
+            | QDockWidget.DockWidgetFeature.DockWidgetFloatable
+        )
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, jobs_dock)
+
         self._switch(0)
 
     def _switch(self, idx: int):
@@ -0,0 +1,390 @@
+"""Batch operations as plain command builders, shared by BatchPage and watch folders.
+
+Options are a flat dict (see DEFAULT_OPTIONS) so a configuration can come
+from the Batch page's widgets or from the command line.
+"""
+
+import json
+import os
+from functools import partial
+from pathlib import Path
+
+from chevalvideo import detect, loudnorm, watermark
+from chevalvideo.paths import data_dir
+
+VIDEO_EXTENSIONS = (
+    ".mp4", ".mkv", ".webm", ".avi", ".mov", ".flv", ".wmv", ".m4v",
+    ".mpg", ".mpeg", ".3gp", ".ts", ".mts", ".m2ts", ".vob", ".ogv",
+)
+
+OPERATIONS = [
+    "Convert",
+    "Compress",
+    "Extract Audio",
+    "Resize",
+    "Strip Metadata",
+    "Normalize Audio",
+    "Generate Thumbnails",
+    "Auto Trim",
+    "Auto Split",
+    "Watermark",
+]
+
+# Need a black/silence detection pass (detect.py) before their command exists
+DETECT_OPERATIONS = ("Auto Trim", "Auto Split")
+
+CONVERT_FORMATS = ["mp4", "mkv", "webm"]
+CONVERT_CODECS = ["libx264", "libx265", "libsvtav1"]
+
+COMPRESS_CODECS = ["libx264", "libx265", "libsvtav1"]
+
+AUDIO_FORMATS = ["mp3", "flac", "wav", "aac"]
+AUDIO_CODEC_MAP = {
+    "mp3": "libmp3lame",
+    "flac": "flac",
+    "wav": "pcm_s16le",
+    "aac": "aac",
+}
+
+RESOLUTION_PRESETS = {
+    "4K (3840)": "3840:-2",
+    "1080p (1920)": "1920:-2",
+    "720p (1280)": "1280:-2",
+    "480p (854)": "854:-2",
+    "Custom": "",
+}
+
+THUMB_FORMATS = ["png", "jpg"]
+
+DEFAULT_OPTIONS = {
+    "convert_format": "mp4",
+    "convert_codec": "libx264",
+    "convert_crf": 23,
+    "compress_codec": "libx264",
+    "compress_crf": 23,
+    "audio_format": "mp3",
+    "audio_bitrate": 192,
+    "scale": "1920:-2",
+    "lufs": -23.0,
+    "thumb_ts": "00:00:00",
+    "thumb_format": "png",
+    "black_min": 0.5,
+    "silence_db": -50.0,
+    "split_gap": 2.0,
+    "detect_fast": 0,
+    "wm_image": "",               # empty: use wm_text
+    "wm_text": "",
+    "wm_scale": 25.0,             # percent of the video's width
+    "wm_opacity": 1.0,
+    "wm_position": "bottom-right",
+    "wm_padding": 20,
+    "wm_font_size": 48,
+    "wm_color": "#ffffff",
+    "wm_box": "",                 # background box colour, empty for none
+}
+
+
+def coerce_option(key: str, value: str):
+    """Convert a command-line string to the type of DEFAULT_OPTIONS[key]. Raises KeyError/ValueError."""
+    return type(DEFAULT_OPTIONS[key])(value)
+
+
+def detection(inp: str, options: dict) -> detect.Detection | None:
+    """Cached detection result for `inp` at these options, if there is one."""
+    opts = {**DEFAULT_OPTIONS, **options}
+    return detect.cached(inp, opts["black_min"], opts["silence_db"], bool(opts["detect_fast"]))
+
+
+def content_range(inp: str, options: dict) -> tuple[float, float] | None:
+    """(start, end) Auto Trim keeps of `inp`, from a cached detection; None if unknown or all dead."""
+    det = detection(inp, options)
+    return det.content_range() if det else None
+
+
+def _split_path(out_dir: str, stem: str, suffix: str, ext: str, k: int) -> str:
+    return os.path.join(out_dir, f"{stem}{suffix}_part{k:02d}{ext}")
+
+
+def _spec(op: str, inp: str, opts: dict, out_dir: str, suffix: str,
+          *, fused: bool = False) -> tuple[list[str], list[str], str] | None:
+    """(input options, output options, output path) for one operation.
+
+    `fused` asks for a form that can share its input with other outputs:
+    only output-side options, so e.g. the thumbnail seek happens after decode.
+    """
+    stem = Path(inp).stem
+    ext = Path(inp).suffix
+
+    if op == "Convert":
+        out = os.path.join(out_dir, f"{stem}{suffix}.{opts['convert_format']}")
+        return [], [
+            "-c:v", opts["convert_codec"], "-crf", str(opts["convert_crf"]), "-c:a", "aac",
+        ], out
+    if op == "Compress":
+        out = os.path.join(out_dir, f"{stem}{suffix}{ext}")
+        return [], [
+            "-c:v", opts["compress_codec"], "-crf", str(opts["compress_crf"]), "-preset", "medium",
+            "-c:a", "aac", "-b:a", "128k",
+        ], out
+    if op == "Extract Audio":
+        fmt = opts["audio_format"]
+        out = os.path.join(out_dir, f"{stem}{suffix}.{fmt}")
+        args = ["-vn", "-c:a", AUDIO_CODEC_MAP.get(fmt, fmt)]
+        if fmt not in ("flac", "wav"):
+            args += ["-b:a", f"{opts['audio_bitrate']}k"]
+        return [], args, out
+    if op == "Resize":
+        out = os.path.join(out_dir, f"{stem}{suffix}{ext}")
+        return [], ["-vf", f"scale={opts['scale'] or '1920:-2'}", "-c:a", "copy"], out
+    if op == "Strip Metadata":
+        out = os.path.join(out_dir, f"{stem}{suffix}{ext}")
+        return [], ["-map_metadata", "-1", "-c", "copy"], out
+    if op == "Normalize Audio":
+        lufs = opts["lufs"]
+        measured = loudnorm.cached(inp, lufs)
+        if measured is None:
+            return None
+        out = os.path.join(out_dir, f"{stem}{suffix}{ext}")
+        return [], ["-af", loudnorm.apply_filter(measured, lufs), "-c:v", "copy"], out
+    if op == "Auto Trim":
+        rng = content_range(inp, opts)
+        if rng is None:
+            return None
+        out = os.path.join(out_dir, f"{stem}{suffix}{ext}")
+        return ["-ss", f"{rng[0]:.3f}", "-t", f"{rng[1] - rng[0]:.3f}"], [
+            "-c", "copy", "-avoid_negative_ts", "make_zero",
+        ], out
+    if op == "Watermark":
+        out = os.path.join(out_dir, f"{stem}{suffix}{ext}")
+        return [], ["-vf", watermark.video_filter(inp, opts), "-c:a", "copy"], out
+    if op == "Generate Thumbnails":
+        out = os.path.join(out_dir, f"{stem}{suffix}.{opts['thumb_format']}")
+        seek = ["-ss", opts["thumb_ts"] or "00:00:00"]
+        if fused:
+            return [], [*seek, "-frames:v", "1"], out
+        return seek, ["-frames:v", "1"], out
+    return None
+
+
+def output_path(op: str, inp: str, options: dict, out_dir: str, suffix: str) -> str:
+    """Where an operation writes, without needing anything measured first."""
+    opts = {**DEFAULT_OPTIONS, **options}
+    stem = Path(inp).stem
+    ext = {
+        "Convert": f".{opts['convert_format']}",
+        "Extract Audio": f".{opts['audio_format']}",
+        "Generate Thumbnails": f".{opts['thumb_format']}",
+    }.get(op, Path(inp).suffix)
+    if op == "Auto Split":
+        return _split_path(out_dir, stem, suffix, ext, 1)
+    return os.path.join(out_dir, f"{stem}{suffix}{ext}")
+
+
+def build_command(op: str, inp: str, options: dict, out_dir: str, suffix: str) -> list[str] | None:
+    """ffmpeg command for one file, or None if it can't be built yet.
+
+    Normalize Audio needs a cached loudnorm measurement for the file first,
+    Auto Trim and Auto Split a cached detection that found something to keep.
+    Watermark renders its overlay asset on first use and raises ValueError,
+    RuntimeError or OSError if it can't.
+    """
+    if op == "Auto Split":
+        return split_command(inp, options, out_dir, suffix)
+    spec = _spec(op, inp, {**DEFAULT_OPTIONS, **options}, out_dir, suffix)
+    if spec is None:
+        return None
+    pre, args, out = spec
+    return ["ffmpeg", "-y", *pre, "-i", inp, *args, "-progress", "pipe:1", out]
+
+
+def split_command(inp: str, options: dict, out_dir: str, suffix: str) -> list[str] | None:
+    """Stream-copy every detected content segment to its own _partNN file, in one run.
+
+    Each segment is its own seeking input, so cuts land on keyframes at or
+    before the detected boundaries.
+    """
+    opts = {**DEFAULT_OPTIONS, **options}
+    det = detection(inp, opts)
+    segments = det.segments(opts["split_gap"]) if det else []
+    if not segments:
+        return None
+    cmd = ["ffmpeg", "-y", "-progress", "pipe:1"]
+    for start, end in segments:
+        cmd += ["-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", inp]
+    stem, ext = Path(inp).stem, Path(inp).suffix
+    for k in range(len(segments)):
+        cmd += [
+            "-map", f"{k}:v?", "-map", f"{k}:a?", "-c", "copy", "-avoid_negative_ts", "make_zero",
+            _split_path(out_dir, stem, suffix, ext, k + 1),
+        ]
+    return cmd
+
+
+def sample_command(op: str, inp: str, options: dict, out_dir: str, suffix: str,
+                   start: float, secs: float) -> list[str] | None:
+    """Command encoding only [start, start + secs) of `inp`, for estimating a full run.
+
+    Normalize Audio is sampled with single-pass loudnorm, which costs about the
+    same as the real apply pass and needs no measurement. Thumbnails are
+    already a single frame and ignore the window. For Auto Trim the window
+    replaces the trim's own, clamped to the content range.
+    """
+    opts = {**DEFAULT_OPTIONS, **options}
+    if op == "Normalize Audio":
+        out = output_path(op, inp, opts, out_dir, suffix)
+        pre, args = [], ["-af", f"loudnorm=I={opts['lufs']}", "-c:v", "copy"]
+    else:
+        spec = _spec(op, inp, opts, out_dir, suffix)
+        if spec is None:
+            return None
+        pre, args, out = spec
+    if op == "Auto Trim":
+        # A second -ss/-t would override the sample's and copy the whole range
+        lo, hi = content_range(inp, opts)
+        start = min(max(start, lo), hi)
+        secs = min(secs, hi - start)
+        pre = []
+    if op != "Generate Thumbnails":
+        pre = ["-ss", f"{start:.3f}", "-t", f"{secs:.3f}", *pre]
+    return ["ffmpeg", "-y", *pre, "-i", inp, *args, "-progress", "pipe:1", out]
+
+
+def fused_command(inp: str, outputs: list[tuple[str, dict, str]], out_dir: str) -> list[str] | None:
+    """One decode of `inp` feeding one output per (operation, options, suffix)."""
+    cmd = ["ffmpeg", "-y", "-progress", "pipe:1", "-i", inp]
+    for op, options, suffix in outputs:
+        spec = _spec(op, inp, {**DEFAULT_OPTIONS, **options}, out_dir, suffix, fused=True)
+        if spec is None:
+            return None
+        _, args, out = spec
+        cmd += [*args, out]
+    return cmd
+
+
+# ── Multi-step presets ──
+
+# Each step is {"op": name, "suffix": str, "from": index}; "from" makes the
+# step read an earlier step's output instead of the source file.
+PRESETS = {
+    "MP4 + MP3 + thumbnail": [
+        {"op": "Compress", "suffix": "_web"},
+        {"op": "Extract Audio", "suffix": ""},
+        {"op": "Generate Thumbnails", "suffix": "_thumb"},
+    ],
+    "Normalized copy + its MP3": [
+        {"op": "Normalize Audio", "suffix": "_norm"},
+        {"op": "Extract Audio", "suffix": "", "from": 0},
+    ],
+    "Clean 720p + thumbnail": [
+        {"op": "Strip Metadata", "suffix": "_clean"},
+        {"op": "Resize", "suffix": "_720p", "scale": "1280:-2"},
+        {"op": "Generate Thumbnails", "suffix": "_thumb"},
+    ],
+}
+
+
+def presets_dir() -> Path:
+    path = data_dir() / "batch-presets"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def load_presets() -> dict[str, list[dict]]:
+    """Built-in presets plus any valid *.json step lists in presets_dir()."""
+    presets = dict(PRESETS)
+    for file in sorted(presets_dir().glob("*.json")):
+        try:
+            with open(file, encoding="utf-8") as f:
+                steps = json.load(f)
+            validate_steps(steps)
+        except (OSError, ValueError):
+            continue
+        presets[file.stem] = steps
+    return presets
+
+
+def _option_type_ok(default, value) -> bool:
+    """Whether `value` can stand in for an option whose default is `default`."""
+    if isinstance(value, bool) or isinstance(default, bool):
+        return type(value) is type(default)
+    if isinstance(default, float):
+        return isinstance(value, (int, float))
+    return isinstance(value, type(default))
+
+
+def validate_steps(steps) -> None:
+    """Raise ValueError unless `steps` is a well-formed preset step list."""
+    if not isinstance(steps, list) or not steps:
+        raise ValueError("preset must be a non-empty list of steps")
+    for i, step in enumerate(steps):
+        if not isinstance(step, dict) or step.get("op") not in OPERATIONS:
+            raise ValueError(f"step {i + 1}: unknown operation")
+        if step["op"] in DETECT_OPERATIONS:
+            raise ValueError(f"step {i + 1}: {step['op']} can't be part of a preset")
+        if not isinstance(step.get("suffix", ""), str):
+            raise ValueError(f"step {i + 1}: 'suffix' must be text")
+        src = step.get("from")
+        if src is not None and not (isinstance(src, int) and not isinstance(src, bool) and 0 <= src < i):
+            raise ValueError(f"step {i + 1}: 'from' must name an earlier step")
+        for key, value in step.items():
+            if key in DEFAULT_OPTIONS and not _option_type_ok(DEFAULT_OPTIONS[key], value):
+                raise ValueError(f"step {i + 1}: bad value for {key!r}")
+
+
+class Task:
+    """One ffmpeg run in a file's plan; runs once every task in `deps` succeeded."""
+
+    def __init__(self, name: str, deps: list[int], build, *, measure: str = "", lufs: float = 0.0):
+        self.name = name
+        self.deps = deps
+        self.build = build        # () -> list[str] | None, called when the task is due
+        self.measure = measure    # source path, for loudness-measurement tasks
+        self.lufs = lufs
+
+
+def plan_file(inp: str, steps: list[dict], options: dict, out_dir: str,
+              suffix: str = "") -> list[Task]:
+    """Per-file DAG for a preset, in dependency order.
+
+    Steps that read the same source are fused into one ffmpeg run with one
+    output each. A source that feeds Normalize Audio gets a measurement task
+    first, and steps reading another step's output wait for the run that
+    writes it. Raises ValueError on a malformed preset or clashing outputs.
+    """
+    validate_steps(steps)
+    opts = {**DEFAULT_OPTIONS, **options}
+    step_opts = [{**opts, **{k: v for k, v in s.items() if k in DEFAULT_OPTIONS}} for s in steps]
+
+    groups: dict[int, list[int]] = {}          # source step (-1 = input file) -> steps
+    for i, step in enumerate(steps):
+        groups.setdefault(step.get("from", -1), []).append(i)
+
+    outs: list[str] = []
+    for i, step in enumerate(steps):
+        src = inp if step.get("from") is None else outs[step["from"]]
+        outs.append(output_path(step["op"], src, step_opts[i], out_dir, suffix + step.get("suffix", "")))
+    clashes = {p for p in outs if outs.count(p) > 1} | ({inp} & set(outs))
+    if clashes:
+        raise ValueError(f"steps would overwrite {', '.join(sorted(clashes))}; give them distinct suffixes")
+
+    tasks: list[Task] = []
+    writer: dict[int, int] = {}                # step -> task that produces its output
+    for source in sorted(groups):
+        members = groups[source]
+        src = inp if source < 0 else outs[source]
+        deps = [] if source < 0 else [writer[source]]
+        if any(steps[i]["op"] == "Normalize Audio" for i in members):
+            lufs = next(step_opts[i]["lufs"] for i in members if steps[i]["op"] == "Normalize Audio")
+            if source >= 0 or loudnorm.cached(src, lufs) is None:
+                tasks.append(Task(f"measure {Path(src).name}", list(deps),
+                                  partial(loudnorm.measure_cmd, src, lufs),
+                                  measure=src, lufs=lufs))
+                deps = deps + [len(tasks) - 1]
+
+        outputs = [(steps[i]["op"], step_opts[i], suffix + steps[i].get("suffix", "")) for i in members]
+        names = " + ".join(steps[i]["op"] for i in members)
+        tasks.append(Task(f"{names} ← {Path(src).name}", deps,
+                          partial(fused_command, src, outputs, out_dir)))
+        for i in members:
+            writer[i] = len(tasks) - 1
+    return tasks
@@ -0,0 +1,372 @@
+"""Duplicate and near-duplicate detection for batch queues.
+
+Exact duplicates share a size and a hash of three PARTIAL_CHUNK samples
+(start, middle, end), which is enough to tell real copies apart without
+reading whole files. Near duplicates (re-uploads, re-encodes, other
+resolutions) have durations within DURATION_TOL and similar difference
+hashes of keyframes at FRAME_POINTS; a single ffmpeg run per file decodes
+just those keyframes at 9x8 grey. Fingerprints are cached on disk per
+unchanged file. The ffprobe and ffmpeg runs go through a small process
+pool and the partial hashes are read on a worker thread, so nothing but
+stat() touches the disk on the GUI thread.
+"""
+
+import hashlib
+import json
+import os
+
+from PyQt6.QtCore import QObject, QProcess, QThread, pyqtSignal
+
+from chevalvideo import probe
+from chevalvideo.paths import cache_dir
+
+FRAME_POINTS = (0.2, 0.5, 0.8)
+HASH_W, HASH_H = 9, 8        # dHash compares horizontal neighbours: 8x8 = 64 bits
+PARTIAL_CHUNK = 64 * 1024
+NEAR_BITS = 10               # mean differing bits per frame, out of 64
+DURATION_TOL = 0.01          # fraction of duration, but at least one second
+ASPECT_TOL = 0.03
+MAX_CACHED = 5000
+
+
+def _cache_file():
+    return cache_dir() / "fingerprints.json"
+
+
+def partial_hash(path: str, size: int) -> str:
+    h = hashlib.sha1(str(size).encode())
+    with open(path, "rb") as f:
+        for offset in sorted({0, max(0, size // 2 - PARTIAL_CHUNK // 2), max(0, size - PARTIAL_CHUNK)}):
+            f.seek(offset)
+            h.update(f.read(PARTIAL_CHUNK))
+    return h.hexdigest()
+
+
+def fingerprint_cmd(path: str, duration: float) -> list[str]:
+    """One grey HASH_WxHASH_H keyframe per FRAME_POINTS, stacked into a single raw frame."""
+    cmd = ["ffmpeg", "-v", "error", "-nostdin"]
+    for point in FRAME_POINTS:
+        cmd += ["-skip_frame", "nokey", "-noaccurate_seek", "-ss", f"{point * duration:.3f}", "-i", path]
+    n = len(FRAME_POINTS)
+    graph = ";".join(f"[{i}:v]scale={HASH_W}:{HASH_H}:flags=area,format=gray[f{i}]" for i in range(n))
+    graph += ";" + "".join(f"[f{i}]" for i in range(n)) + f"vstack=inputs={n}"
+    return cmd + ["-filter_complex", graph, "-frames:v", "1", "-f", "rawvideo", "pipe:1"]
+
+
+def dhash(grey: bytes) -> int:
+    bits = 0
+    for y in range(HASH_H):
+        row = grey[y * HASH_W:(y + 1) * HASH_W]
+        for x in range(HASH_W - 1):
+            bits = (bits << 1) | (row[x] > row[x + 1])
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class Fingerprint:
+    """What dedup knows about one file; `hashes` is empty for audio-only files."""
+
+    def __init__(self, path: str, size: int, partial: str, duration: float,
+                 width: int, height: int, hashes: list[int]):
+        self.path = path
+        self.size = size
+        self.partial = partial
+        self.duration = duration
+        self.width = width
+        self.height = height
+        self.hashes = hashes
+
+    def to_dict(self) -> dict:
+        return {
+            "size": self.size, "partial": self.partial, "duration": self.duration,
+            "width": self.width, "height": self.height, "hashes": self.hashes,
+        }
+
+    @classmethod
+    def from_dict(cls, path: str, d: dict) -> "Fingerprint":
+        return cls(path, d["size"], d["partial"], d["duration"], d["width"], d["height"], d["hashes"])
+
+
+class Cluster:
+    """Files with the same content; paths[0] is the copy to keep (largest picture, then file)."""
+
+    def __init__(self, kind: str, paths: list[str]):
+        self.kind = kind      # "exact" or "near"
+        self.paths = paths
+
+    @property
+    def keeper(self) -> str:
+        return self.paths[0]
+
+    @property
+    def duplicates(self) -> list[str]:
+        return self.paths[1:]
+
+
+def _near(a: Fingerprint, b: Fingerprint) -> bool:
+    if not a.hashes or len(a.hashes) != len(b.hashes):
+        return False
+    if abs(a.duration - b.duration) > max(1.0, DURATION_TOL * max(a.duration, b.duration)):
+        return False
+    if a.height and b.height and abs(a.width / a.height - b.width / b.height) > ASPECT_TOL:
+        return False
+    return sum(hamming(x, y) for x, y in zip(a.hashes, b.hashes)) <= NEAR_BITS * len(a.hashes)
+
+
+def cluster(fps: list[Fingerprint]) -> list[Cluster]:
+    """Group fingerprints into exact and near-duplicate clusters of two or more files."""
+    parent = list(range(len(fps)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    exact: dict[tuple, int] = {}
+    for i, fp in enumerate(fps):
+        j = exact.setdefault((fp.size, fp.partial), i)
+        parent[find(i)] = find(j)
+
+    # Only files of similar length can match, so compare within a sliding window
+    order = sorted(range(len(fps)), key=lambda i: fps[i].duration)
+    for n, i in enumerate(order):
+        for j in order[n + 1:]:
+            if fps[j].duration - fps[i].duration > max(1.0, DURATION_TOL * fps[j].duration):
+                break
+            if find(i) != find(j) and _near(fps[i], fps[j]):
+                parent[find(i)] = find(j)
+
+    groups: dict[int, list[Fingerprint]] = {}
+    for i, fp in enumerate(fps):
+        groups.setdefault(find(i), []).append(fp)
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        kind = "exact" if len({(m.size, m.partial) for m in members}) == 1 else "near"
+        members.sort(key=lambda m: (-m.width * m.height, -m.size, m.path))
+        clusters.append(Cluster(kind, [m.path for m in members]))
+    return sorted(clusters, key=lambda c: c.keeper)
+
+
+def _cache_key(path: str, st: os.stat_result) -> str:
+    return f"{os.path.abspath(path)}\t{st.st_size}\t{st.st_mtime_ns}"
+
+
+def load_cache() -> dict[str, dict]:
+    try:
+        with open(_cache_file(), encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(entries: dict[str, dict]):
+    # Dicts keep insertion order: drop the oldest entries beyond MAX_CACHED
+    keep = dict(list(entries.items())[-MAX_CACHED:])
+    try:
+        with open(_cache_file(), "w", encoding="utf-8") as f:
+            json.dump(keep, f)
+    except OSError:
+        pass
+
+
+class _Hasher(QThread):
+    """Computes partial_hash() for (path, size) pairs off the GUI thread."""
+
+    hashed = pyqtSignal(str, str)    # (path, partial hash)
+    failed = pyqtSignal(str, str)    # (path, message)
+
+    def __init__(self, files: list[tuple[str, int]], parent=None):
+        super().__init__(parent)
+        self._files = files
+
+    def run(self):
+        for path, size in self._files:
+            if self.isInterruptionRequested():
+                return
+            try:
+                self.hashed.emit(path, partial_hash(path, size))
+            except OSError as e:
+                self.failed.emit(path, str(e))
+
+
+class DuplicateFinder(QObject):
+    """Fingerprints files (cached, `pool_size` ffmpeg processes at once) and clusters them.
+
+    An uncached file needs its partial hash and a probe, then, if it has
+    video, a keyframe decode; it counts as fingerprinted once all are in.
+    """
+
+    progress = pyqtSignal(int, int)    # (files fingerprinted, total)
+    failed = pyqtSignal(str, str)      # (path, message)
+    finished = pyqtSignal(list)        # list[Cluster]
+
+    def __init__(self, pool_size: int = 3, parent=None):
+        super().__init__(parent)
+        self._pool_size = max(1, pool_size)
+        self._queue: list[tuple[str, Fingerprint]] = []     # ("probe" | "frames", fingerprint)
+        self._active: dict[QProcess, tuple[str, Fingerprint]] = {}
+        self._pending: dict[str, tuple[Fingerprint, int]] = {}   # path -> (fingerprint, parts left)
+        self._hasher: _Hasher | None = None
+        self._fps: list[Fingerprint] = []
+        self._cache: dict[str, dict] = {}
+        self._keys: dict[str, str] = {}
+        self._total = 0
+
+    def start(self, paths: list[str]):
+        self.stop()
+        self._cache = load_cache()
+        self._fps = []
+        self._keys = {}
+        self._pending = {}
+        self._total = len(paths)
+        to_hash = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                self.failed.emit(path, str(e))
+                self._total -= 1
+                continue
+            key = _cache_key(path, st)
+            self._keys[path] = key
+            if key in self._cache:
+                # Re-insert so recently seen files survive trimming
+                self._fps.append(Fingerprint.from_dict(path, self._cache.pop(key)))
+                continue
+            fp = Fingerprint(path, st.st_size, "", 0.0, 0, 0, [])
+            self._pending[path] = (fp, 2)   # partial hash, then probe plus keyframes
+            to_hash.append((path, st.st_size))
+            info = probe.cached(path)
+            if info is None:
+                self._queue.append(("probe", fp))
+            else:
+                self._on_probed(fp, info)
+        self.progress.emit(len(self._fps), self._total)
+        if to_hash:
+            self._hasher = _Hasher(to_hash, self)
+            self._hasher.hashed.connect(self._on_hashed)
+            self._hasher.failed.connect(self._on_file_failed)
+            self._hasher.finished.connect(self._on_hasher_finished)
+            self._hasher.start()
+        self._fill()
+        self._check_done()
+
+    def stop(self):
+        self._queue.clear()
+        for proc in list(self._active):
+            proc.finished.disconnect()
+            proc.errorOccurred.disconnect()
+            proc.kill()
+            proc.deleteLater()
+        self._active.clear()
+        if self._hasher is not None:
+            hasher, self._hasher = self._hasher, None
+            hasher.hashed.disconnect()
+            hasher.failed.disconnect()
+            hasher.finished.disconnect()
+            hasher.requestInterruption()
+            hasher.wait()   # at most the file it is reading
+            hasher.deleteLater()
+        self._pending.clear()
+
+    def is_running(self) -> bool:
+        return bool(self._active or self._queue or self._hasher is not None)
+
+    def _fill(self):
+        while self._queue and len(self._active) < self._pool_size:
+            kind, fp = self._queue.pop(0)
+            cmd = probe.probe_cmd(fp.path) if kind == "probe" else fingerprint_cmd(fp.path, fp.duration)
+            proc = QProcess(self)
+            proc.finished.connect(lambda code, _st, p=proc: self._on_finished(p, code))
+            proc.errorOccurred.connect(lambda err, p=proc: self._on_error(p, err))
+            self._active[proc] = (kind, fp)
+            proc.start(cmd[0], cmd[1:])
+
+    def _on_finished(self, proc: QProcess, exit_code: int):
+        kind, fp = self._active.pop(proc)
+        data = proc.readAllStandardOutput().data()
+        proc.deleteLater()
+        if fp.path not in self._pending:
+            pass   # failed meanwhile (its hash could not be read)
+        elif kind == "probe":
+            try:
+                if exit_code != 0:
+                    raise ValueError(f"ffprobe exited with code {exit_code}")
+                info = json.loads(data)
+            except ValueError as e:
+                self._on_file_failed(fp.path, f"ffprobe failed: {e}")
+            else:
+                probe.remember(fp.path, info)
+                self._on_probed(fp, info)
+        else:
+            frame = HASH_W * HASH_H
+            if exit_code == 0 and len(data) >= frame * len(FRAME_POINTS):
+                fp.hashes = [dhash(data[i * frame:(i + 1) * frame]) for i in range(len(FRAME_POINTS))]
+            # Without frame hashes the file can still match exact copies
+            self._part_done(fp.path)
+        self._fill()
+        self._check_done()
+
+    def _on_error(self, proc: QProcess, error):
+        # A process that never started emits no finished signal of its own
+        if error == QProcess.ProcessError.FailedToStart and proc in self._active:
+            self._on_finished(proc, -1)
+
+    def _on_probed(self, fp: Fingerprint, info: dict):
+        try:
+            fp.duration = probe.get_duration_secs(info)
+            fp.width, fp.height = probe.get_video_size(info)
+        except (TypeError, ValueError) as e:
+            self._on_file_failed(fp.path, str(e))
+            return
+        if fp.width and fp.duration > 0:
+            self._queue.append(("frames", fp))
+        else:
+            self._part_done(fp.path)
+
+    def _on_hashed(self, path: str, partial: str):
+        if path in self._pending:
+            self._pending[path][0].partial = partial
+            self._part_done(path)
+
+    def _part_done(self, path: str):
+        if path not in self._pending:
+            return   # already failed
+        fp, left = self._pending[path]
+        if left > 1:
+            self._pending[path] = (fp, left - 1)
+            return
+        del self._pending[path]
+        self._fps.append(fp)
+        self.progress.emit(len(self._fps), self._total)
+
+    def _on_file_failed(self, path: str, msg: str):
+        if self._pending.pop(path, None) is None:
+            return
+        self._queue = [q for q in self._queue if q[1].path != path]
+        self.failed.emit(path, msg)
+        self._total -= 1
+        self.progress.emit(len(self._fps), self._total)
+
+    def _on_hasher_finished(self):
+        self._hasher.deleteLater()
+        self._hasher = None
+        self._check_done()
+
+    def _check_done(self):
+        if not self.is_running():
+            self._done()
+
+    def _done(self):
+        for fp in self._fps:
+            if fp.hashes or not fp.width:   # retry failed keyframe decodes next time
+                self._cache[self._keys[fp.path]] = fp.to_dict()
+        save_cache(self._cache)
+        self.finished.emit(cluster(self._fps))
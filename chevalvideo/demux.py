@@ -0,0 +1,113 @@
+"""Demux many audio and subtitle tracks in a single read of the source.
+
+Every selected stream is mapped to its own output file in one ffmpeg
+invocation, so a remux with dozens of language tracks is read once
+instead of once per track. Streams are copied into a container that
+holds their codec as-is; only text subtitles stored in MP4 (mov_text),
+which have no standalone file format, are converted to SRT.
+"""
+
+from pathlib import Path
+
+from chevalvideo.subtitles import BITMAP_EXTENSIONS
+
+# codec_name -> extension of a container that takes the stream unchanged
+COPY_EXTENSIONS = {
+    "aac": "m4a", "alac": "m4a", "mp3": "mp3", "ac3": "ac3", "eac3": "eac3",
+    "dts": "dts", "truehd": "thd", "flac": "flac", "opus": "opus", "vorbis": "ogg",
+    "subrip": "srt", "ass": "ass", "ssa": "ass", "webvtt": "vtt",
+    **BITMAP_EXTENSIONS,
+}
+# Matroska takes anything left over (.mkv for subtitles: ffmpeg has no .mks muxer)
+FALLBACK_EXTENSIONS = {"audio": "mka", "subtitle": "mkv"}
+# PCM that WAV stores as-is; big-endian, DVD and Blu-ray PCM go to Matroska
+WAV_CODECS = {
+    "pcm_u8", "pcm_s16le", "pcm_s24le", "pcm_s32le", "pcm_f32le", "pcm_f64le",
+    "pcm_alaw", "pcm_mulaw",
+}
+# Text codecs without a file format of their own: (encoder, extension)
+CONVERT_TEXT = {"mov_text": ("srt", "srt"), "text": ("srt", "srt")}
+
+
+class Track:
+    """One audio or subtitle stream of a probed file."""
+
+    def __init__(self, stream: dict, number: int):
+        self.index = stream.get("index", 0)          # absolute stream index
+        self.kind = stream.get("codec_type", "")
+        self.number = number                          # position among streams of its kind
+        self.codec = stream.get("codec_name", "")
+        tags = stream.get("tags", {})
+        self.language = tags.get("language", "")
+        self.title = tags.get("title", "")
+        self.channels = stream.get("channels", 0)
+
+    @property
+    def key(self) -> str:
+        return str(self.index)
+
+    def label(self) -> str:
+        kind = "Audio" if self.kind == "audio" else "Subtitle"
+        return f"{kind} {self.number + 1}" + (f" [{self.language}]" if self.language else "")
+
+    def description(self) -> str:
+        parts = [self.codec or "unknown"]
+        if self.channels:
+            parts.append(f"{self.channels} ch")
+        if self.title:
+            parts.append(self.title)
+        return ", ".join(parts)
+
+    def copy_extension(self) -> str:
+        if self.codec in WAV_CODECS:
+            return "wav"
+        if self.codec in CONVERT_TEXT:
+            return CONVERT_TEXT[self.codec][1]
+        return COPY_EXTENSIONS.get(self.codec, FALLBACK_EXTENSIONS.get(self.kind, "mkv"))
+
+
+def tracks(info: dict) -> list[Track]:
+    """Audio and subtitle streams of a probe result, in file order."""
+    out, counts = [], {"audio": 0, "subtitle": 0}
+    for stream in info.get("streams", []):
+        kind = stream.get("codec_type")
+        if kind in counts:
+            out.append(Track(stream, counts[kind]))
+            counts[kind] += 1
+    return out
+
+
+def output_path(inp: str, track: Track, ext: str, out_dir: str = "") -> str:
+    """<stem>.<a|s><n>[.<lang>].<ext> next to the input (or in out_dir)."""
+    src = Path(inp)
+    name = f"{src.stem}.{track.kind[0]}{track.number + 1}"
+    if track.language:
+        name += f".{track.language}"
+    return str(Path(out_dir or src.parent) / f"{name}.{ext}")
+
+
+def demux_cmd(inp: str, selected: list[Track], *, out_dir: str = "",
+              audio_codec: str = "", audio_ext: str = "", audio_bitrate: str = "") -> tuple[list[str], list[str]]:
+    """One ffmpeg command writing every selected track, and the output paths.
+
+    With `audio_codec` set, audio tracks are encoded to it (into `audio_ext`
+    files) instead of copied; subtitles are never re-encoded beyond CONVERT_TEXT.
+    """
+    cmd = ["ffmpeg", "-y", "-i", inp, "-progress", "pipe:1"]
+    outputs = []
+    for t in selected:
+        cmd += ["-map", f"0:{t.index}"]
+        if t.kind == "audio" and audio_codec:
+            out = output_path(inp, t, audio_ext, out_dir)
+            cmd += ["-c:a", audio_codec]
+            if audio_bitrate:
+                cmd += ["-b:a", audio_bitrate]
+        elif t.codec in CONVERT_TEXT:
+            out = output_path(inp, t, CONVERT_TEXT[t.codec][1], out_dir)
+            cmd += ["-c:s", CONVERT_TEXT[t.codec][0]]
+        else:
+            out = output_path(inp, t, t.copy_extension(), out_dir)
+            cmd += ["-c", "copy"]
+        cmd.append(out)
+        outputs.append(out)
+    return cmd, outputs
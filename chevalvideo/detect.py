@@ -0,0 +1,237 @@
+"""Black-frame and silence detection for auto-trim and auto-split.
+
+One ffmpeg pass runs blackdetect on a downscaled, loop-filter-free decode
+of the video and silencedetect on the audio. Fast mode only reads the
+first and last FAST_WINDOW seconds (two seeking inputs in the same run),
+which is enough to find a leader and trailer but not gaps in between.
+"Dead" time is where the picture is black and the sound silent at once;
+files without audio or video use whichever detector applies.
+
+Results are cached per unchanged file and settings, like loudnorm.
+"""
+
+import os
+import re
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from chevalvideo.probe import get_duration_secs, probe
+from chevalvideo.runner import CommandRunner
+
+SCAN_WIDTH = 160          # blackdetect only needs average luma
+PIX_TH = 0.10
+PICTURE_TH = 0.98
+FAST_WINDOW = 60.0
+TRIM_EDGE = 0.5           # dead range this close to either end counts as leader/trailer
+MIN_SEGMENT = 1.0
+
+_WINDOW_RE = re.compile(r"detect@w(\d+) @ [^\]]*\]\s*(.*)")
+_BLACK_RE = re.compile(r"black_start:\s*([\d.]+)\s+black_end:\s*([\d.]+)")
+_SIL_START_RE = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SIL_END_RE = re.compile(r"silence_end:\s*([\d.]+)")
+
+# (abspath, size, mtime_ns, black_min, silence_db, fast) -> Detection
+_cache: dict[tuple, "Detection"] = {}
+
+
+class Detection:
+    """Detected black and silent ranges of one file, in seconds from its start."""
+
+    def __init__(self, duration: float, has_video: bool, has_audio: bool, fast: bool):
+        self.duration = duration
+        self.has_video = has_video
+        self.has_audio = has_audio
+        self.fast = fast
+        self.black: list[tuple[float, float]] = []
+        self.silence: list[tuple[float, float]] = []
+
+    def dead(self) -> list[tuple[float, float]]:
+        """Ranges that are both black and silent (or whichever applies)."""
+        if not self.has_audio:
+            return list(self.black)
+        if not self.has_video:
+            return list(self.silence)
+        out = []
+        for b0, b1 in self.black:
+            for s0, s1 in self.silence:
+                lo, hi = max(b0, s0), min(b1, s1)
+                if hi > lo:
+                    out.append((lo, hi))
+        return sorted(out)
+
+    def content_range(self) -> tuple[float, float] | None:
+        """(start, end) with the dead leader and trailer removed; None if all dead."""
+        start, end = 0.0, self.duration
+        for lo, hi in self.dead():
+            if lo <= TRIM_EDGE:
+                start = max(start, hi)
+            if hi >= self.duration - TRIM_EDGE:
+                end = min(end, lo)
+        return (start, end) if end - start >= MIN_SEGMENT else None
+
+    def segments(self, gap: float) -> list[tuple[float, float]]:
+        """Content between dead ranges at least `gap` long (plus leader and trailer)."""
+        rng = self.content_range()
+        if rng is None:
+            return []
+        if self.fast:
+            return [rng]
+        out, pos = [], rng[0]
+        for lo, hi in self.dead():
+            if hi <= rng[0] or lo >= rng[1] or hi - lo < gap:
+                continue
+            out.append((pos, lo))
+            pos = hi
+        out.append((pos, rng[1]))
+        return [(a, b) for a, b in out if b - a >= MIN_SEGMENT]
+
+
+def windows(duration: float, fast: bool) -> list[tuple[float, float]]:
+    """(start, length) of each scanned window; length 0 means to the end."""
+    if not fast or duration <= 2 * FAST_WINDOW:
+        return [(0.0, 0.0)]
+    return [(0.0, FAST_WINDOW), (duration - FAST_WINDOW, 0.0)]
+
+
+def detect_cmd(path: str, duration: float, has_video: bool, has_audio: bool, *,
+               black_min: float, silence_db: float, fast: bool) -> list[str]:
+    cmd = ["ffmpeg", "-hide_banner", "-nostats"]
+    graph = []
+    for i, (start, length) in enumerate(windows(duration, fast)):
+        if has_video:
+            cmd += ["-skip_loop_filter", "all"]
+        if start:
+            cmd += ["-ss", f"{start:.3f}"]
+        if length:
+            cmd += ["-t", f"{length:.3f}"]
+        cmd += ["-sn", "-dn", "-i", path]
+        if has_video:
+            graph.append(
+                f"[{i}:v:0]scale={SCAN_WIDTH}:-2,"
+                f"blackdetect@w{i}=d={black_min}:pix_th={PIX_TH}:picture_black_ratio_th={PICTURE_TH}[v{i}]"
+            )
+        if has_audio:
+            graph.append(f"[{i}:a:0]silencedetect@w{i}=n={silence_db}dB:d={black_min}[a{i}]")
+    cmd += ["-filter_complex", ";".join(graph)]
+    for i in range(len(windows(duration, fast))):
+        if has_video:
+            cmd += ["-map", f"[v{i}]"]
+        if has_audio:
+            cmd += ["-map", f"[a{i}]"]
+    return cmd + ["-progress", "pipe:1", "-f", "null", "-"]
+
+
+def parse_detection(lines: list[str], det: Detection):
+    """Fill det.black / det.silence from the detectors' log lines."""
+    wins = windows(det.duration, det.fast)
+    open_silence: dict[int, float] = {}
+    for line in lines:
+        m = _WINDOW_RE.search(line)
+        if not m:
+            continue
+        i, text = int(m.group(1)), m.group(2)
+        offset = wins[i][0] if i < len(wins) else 0.0
+        if b := _BLACK_RE.search(text):
+            det.black.append((offset + float(b.group(1)), offset + float(b.group(2))))
+        elif s := _SIL_START_RE.search(text):
+            open_silence[i] = offset + max(0.0, float(s.group(1)))
+        elif (e := _SIL_END_RE.search(text)) and i in open_silence:
+            det.silence.append((open_silence.pop(i), offset + float(e.group(1))))
+    # Silence still running when a window ended
+    for i, start in open_silence.items():
+        w_start, w_len = wins[i]
+        det.silence.append((start, w_start + w_len if w_len else det.duration))
+    det.black.sort()
+    det.silence.sort()
+
+
+def _cache_key(path: str, black_min: float, silence_db: float, fast: bool) -> tuple | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), st.st_size, st.st_mtime_ns, float(black_min), float(silence_db), bool(fast))
+
+
+def cached(path: str, black_min: float, silence_db: float, fast: bool) -> Detection | None:
+    key = _cache_key(path, black_min, silence_db, fast)
+    return _cache.get(key) if key else None
+
+
+def store(path: str, det: Detection, black_min: float, silence_db: float, fast: bool):
+    key = _cache_key(path, black_min, silence_db, fast)
+    if key:
+        _cache[key] = det
+
+
+def prepare(path: str, black_min: float, silence_db: float, fast: bool) -> tuple[Detection, list[str]]:
+    """Empty Detection for `path` and the command that fills it. Raises on probe failure."""
+    info = probe(path)
+    kinds = {s.get("codec_type") for s in info.get("streams", [])}
+    det = Detection(get_duration_secs(info), "video" in kinds, "audio" in kinds, fast)
+    if not (det.has_video or det.has_audio):
+        raise ValueError("no audio or video stream")
+    cmd = detect_cmd(path, det.duration, det.has_video, det.has_audio,
+                     black_min=black_min, silence_db=silence_db, fast=fast)
+    return det, cmd
+
+
+class DetectAnalyzer(QObject):
+    """Runs detection passes for many files with bounded concurrency."""
+
+    detected = pyqtSignal(str, object)   # (path, Detection)
+    failed = pyqtSignal(str, str)        # (path, message)
+    all_done = pyqtSignal()
+
+    def __init__(self, max_parallel: int = 4, parent=None):
+        super().__init__(parent)
+        self._max_parallel = max(1, max_parallel)
+        self._queue: list[str] = []
+        self._active: dict[CommandRunner, tuple[str, Detection, list[str]]] = {}
+        self._params = (0.5, -50.0, False)
+        self.limits = None  # ProcessLimits for the detection runners
+
+    def start(self, paths: list[str], black_min: float, silence_db: float, fast: bool):
+        """Detect every path not already cached. Emits all_done when finished."""
+        self._params = (black_min, silence_db, fast)
+        self._queue = [p for p in paths if cached(p, *self._params) is None]
+        self._fill()
+        if not self._active:
+            self.all_done.emit()
+
+    def cancel(self):
+        self._queue.clear()
+        for runner in list(self._active):
+            runner.cancel()
+
+    def is_running(self) -> bool:
+        return bool(self._active)
+
+    def _fill(self):
+        while self._queue and len(self._active) < self._max_parallel:
+            path = self._queue.pop(0)
+            try:
+                det, cmd = prepare(path, *self._params)
+            except (RuntimeError, ValueError, OSError) as e:
+                self.failed.emit(path, str(e))
+                continue
+            runner = CommandRunner(self)
+            runner.limits = self.limits
+            lines: list[str] = []
+            runner.output.connect(lines.append)
+            runner.finished.connect(lambda ok, msg, r=runner: self._on_finished(r, ok, msg))
+            self._active[runner] = (path, det, lines)
+            runner.run(cmd, duration=det.duration if len(windows(det.duration, det.fast)) == 1 else 0.0)
+
+    def _on_finished(self, runner: CommandRunner, ok: bool, msg: str):
+        path, det, lines = self._active.pop(runner)
+        runner.deleteLater()
+        if ok:
+            parse_detection(lines, det)
+            store(path, det, *self._params)
+            self.detected.emit(path, det)
+        else:
+            self.failed.emit(path, msg)
+        self._fill()
+        if not self._active:
+            self.all_done.emit()
@@ -0,0 +1,253 @@
+"""Dry-run size and time prediction for Batch operations.
+
+Each file is encoded for SAMPLE_SECS at SAMPLE_POINTS spots spread through
+it (short files are encoded whole). The sampled output bitrate and encode
+speed are extrapolated to the file's full duration, or for Auto Trim to the
+detected content range the samples are taken from. Samples run
+concurrently, so the measured speed already reflects sharing the machine;
+expect the real batch to be at least this fast. Files not yet probed are
+probed by ffprobe processes sharing the same pool, never on the GUI thread.
+"""
+
+import heapq
+import json
+import os
+import shutil
+
+from PyQt6.QtCore import QObject, QProcess, pyqtSignal
+
+from chevalvideo import batchops, probe
+from chevalvideo.paths import cache_dir
+from chevalvideo.runner import CommandRunner
+
+SAMPLE_SECS = 4.0
+SAMPLE_POINTS = 3
+# Predictions are approximate; want this much headroom on the output disk
+DISK_MARGIN = 1.1
+
+
+def sample_windows(duration: float) -> list[tuple[float, float]]:
+    """(start, length) of each sample, centred on evenly spaced points."""
+    if duration <= SAMPLE_SECS * SAMPLE_POINTS * 2:
+        return [(0.0, duration)]
+    return [
+        ((k + 0.5) / SAMPLE_POINTS * duration - SAMPLE_SECS / 2, SAMPLE_SECS)
+        for k in range(SAMPLE_POINTS)
+    ]
+
+
+def wall_time(secs: list[float], parallel: int) -> float:
+    """Makespan of running jobs of these lengths `parallel` at a time, longest first."""
+    slots = [0.0] * max(1, parallel)
+    for s in sorted(secs, reverse=True):
+        heapq.heappush(slots, heapq.heappop(slots) + s)
+    return max(slots)
+
+
+class FileEstimate:
+    """Predicted output size and encode time for one input."""
+
+    def __init__(self, path: str, duration: float, out_dir: str, size: int, secs: float):
+        self.path = path
+        self.duration = duration
+        self.out_dir = out_dir
+        self.size = size
+        self.secs = secs
+
+
+def disk_shortfalls(estimates: list[FileEstimate]) -> list[tuple[str, int, int]]:
+    """(folder, bytes needed, bytes free) for each output filesystem that would run short."""
+    by_dev: dict[int, tuple[str, int]] = {}
+    for e in estimates:
+        try:
+            dev = os.stat(e.out_dir).st_dev
+        except OSError:
+            continue
+        folder, needed = by_dev.get(dev, (e.out_dir, 0))
+        by_dev[dev] = (folder, needed + e.size)
+    short = []
+    for folder, needed in by_dev.values():
+        free = shutil.disk_usage(folder).free
+        if needed * DISK_MARGIN > free:
+            short.append((folder, needed, free))
+    return short
+
+
+class BatchEstimator(QObject):
+    """Samples many files with bounded concurrency and emits a FileEstimate for each."""
+
+    estimated = pyqtSignal(str, object)   # (path, FileEstimate)
+    failed = pyqtSignal(str, str)         # (path, message)
+    all_done = pyqtSignal()
+
+    def __init__(self, max_parallel: int = 4, parent=None):
+        super().__init__(parent)
+        self._max_parallel = max(1, max_parallel)
+        self._to_probe: list[tuple[int, str]] = []     # (position in the batch, path)
+        self._probing: dict[QProcess, tuple[int, str]] = {}
+        self._queue: list[tuple[str, list[str]]] = []
+        self._active: dict[CommandRunner, str] = {}
+        self._files: dict[str, dict] = {}
+        self._results: list[FileEstimate] = []
+        self._op = ""
+        self._options: dict = {}
+        self._out_dirs: dict[str, str] = {}
+        self.limits = None  # ProcessLimits for the sampling runners
+
+    def start(self, paths: list[str], op: str, options: dict, out_dirs: dict[str, str]):
+        """Sample every path; out_dirs maps each path to where its output would go."""
+        self._op = op
+        self._options = options
+        self._out_dirs = out_dirs
+        self._to_probe.clear()
+        self._queue.clear()
+        self._files.clear()
+        self._results = []
+        for i, path in enumerate(paths):
+            info = probe.cached(path)
+            if info is None:
+                self._to_probe.append((i, path))
+            else:
+                self._plan(i, path, info)
+        self._fill()
+        if not self.is_running():
+            self.all_done.emit()
+
+    def _plan(self, i: int, path: str, info: dict):
+        """Queue the sample encodes of one probed file."""
+        op, options = self._op, self._options
+        try:
+            duration = probe.get_duration_secs(info)
+        except (TypeError, ValueError) as e:
+            self.failed.emit(path, str(e))
+            return
+        if duration <= 0:
+            self.failed.emit(path, "unknown duration")
+            return
+        # Auto Trim only writes the content range; sample and extrapolate within it
+        rng = batchops.content_range(path, options) if op == "Auto Trim" else None
+        offset, span = (rng[0], rng[1] - rng[0]) if rng else (0.0, duration)
+        if op == "Generate Thumbnails":
+            windows = [(0.0, duration)]
+        else:
+            windows = [(offset + start, secs) for start, secs in sample_windows(span)]
+        tmp = str(cache_dir("estimate"))
+        try:
+            cmds = [
+                batchops.sample_command(op, path, options, tmp, f".{i}.{j}", start, secs)
+                for j, (start, secs) in enumerate(windows)
+            ]
+        except (OSError, RuntimeError, ValueError) as e:
+            self.failed.emit(path, str(e))
+            return
+        if None in cmds:
+            self.failed.emit(path, "no command for this operation")
+            return
+        self._files[path] = {
+            "duration": duration, "span": span, "out_dir": self._out_dirs.get(path, os.path.dirname(path)),
+            "left": len(cmds), "bytes": 0, "media": 0.0, "wall": 0.0,
+            "windows": dict(zip((c[-1] for c in cmds), (w[1] for w in windows))),
+        }
+        self._queue += [(path, cmd) for cmd in cmds]
+
+    def results(self) -> list[FileEstimate]:
+        return list(self._results)
+
+    def cancel(self):
+        self._to_probe.clear()
+        for proc in list(self._probing):
+            proc.finished.disconnect()
+            proc.errorOccurred.disconnect()
+            proc.kill()
+            proc.deleteLater()
+        self._probing.clear()
+        self._queue.clear()
+        self._files.clear()
+        for runner in list(self._active):
+            runner.cancel()
+        if not self._active:
+            self.all_done.emit()   # only probes were running; no runner will report
+
+    def is_running(self) -> bool:
+        return bool(self._active or self._probing)
+
+    def _fill(self):
+        # Probes first, so their files' samples join the queue early
+        while self._to_probe and len(self._active) + len(self._probing) < self._max_parallel:
+            i, path = self._to_probe.pop(0)
+            cmd = probe.probe_cmd(path)
+            proc = QProcess(self)
+            proc.finished.connect(lambda code, _st, p=proc: self._on_probed(p, code))
+            proc.errorOccurred.connect(lambda err, p=proc: self._on_probe_error(p, err))
+            self._probing[proc] = (i, path)
+            proc.start(cmd[0], cmd[1:])
+        while self._queue and len(self._active) + len(self._probing) < self._max_parallel:
+            path, cmd = self._queue.pop(0)
+            runner = CommandRunner(self)
+            runner.limits = self.limits
+            runner.finished.connect(lambda ok, msg, r=runner, c=cmd: self._on_finished(r, c, ok, msg))
+            self._active[runner] = path
+            runner.run(cmd)
+
+    def _on_probe_error(self, proc: QProcess, error):
+        # A process that never started emits no finished signal of its own
+        if error == QProcess.ProcessError.FailedToStart and proc in self._probing:
+            self._on_probed(proc, -1)
+
+    def _on_probed(self, proc: QProcess, exit_code: int):
+        i, path = self._probing.pop(proc)
+        data = proc.readAllStandardOutput().data()
+        proc.deleteLater()
+        try:
+            if exit_code != 0:
+                raise ValueError(f"exited with code {exit_code}")
+            info = json.loads(data)
+        except ValueError as e:
+            self.failed.emit(path, f"ffprobe failed: {e}")
+        else:
+            probe.remember(path, info)
+            self._plan(i, path, info)
+        self._fill()
+        if not self.is_running():
+            self.all_done.emit()
+
+    def _on_finished(self, runner: CommandRunner, cmd: list[str], ok: bool, msg: str):
+        path = self._active.pop(runner)
+        wall = runner.last_metrics.get("wall_s", 0.0)
+        runner.deleteLater()
+        out = cmd[-1]
+        try:
+            size = os.path.getsize(out)
+            os.remove(out)
+        except OSError:
+            size = 0
+        info = self._files.get(path)
+        if info is not None:
+            if not ok or size == 0:
+                del self._files[path]
+                self._queue = [q for q in self._queue if q[0] != path]
+                self.failed.emit(path, msg if not ok else "sample produced no output")
+            else:
+                info["bytes"] += size
+                info["media"] += info["windows"][out]
+                info["wall"] += wall
+                info["left"] -= 1
+                if info["left"] == 0:
+                    self._finish_file(path, self._files.pop(path))
+        self._fill()
+        if not self.is_running():
+            self.all_done.emit()
+
+    def _finish_file(self, path: str, info: dict):
+        if self._op == "Generate Thumbnails":
+            size, secs = info["bytes"], info["wall"]
+        else:
+            scale = info["span"] / info["media"]
+            size = int(info["bytes"] * scale)
+            secs = info["wall"] * scale
+            if self._op == "Normalize Audio":
+                # Plus the measurement pass, an audio-only decode of the whole file
+                secs *= 2
+        est = FileEstimate(path, info["duration"], info["out_dir"], size, secs)
+        self._results.append(est)
+        self.estimated.emit(path, est)
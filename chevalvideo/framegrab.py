@@ -0,0 +1,254 @@
+"""Frame-grab service — decode single downscaled frames straight into QImages.
+
+ffmpeg writes one raw rgb24 frame to stdout, so there is no temp file and no
+image encode/decode. Grabs run on a small pool of processes; while the pool
+is busy only the newest requests are kept, so scrubbing never builds a
+backlog. Results live in a byte-bounded LRU keyed by (file, time, size).
+
+KeyframeStrip uses the same raw pipe to build a timeline strip of keyframe
+thumbnails, cached per file on disk.
+"""
+
+import hashlib
+import os
+import shutil
+from collections import OrderedDict
+
+from PyQt6.QtCore import QObject, QProcess, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from chevalvideo.paths import cache_dir
+
+# Keyframe strips kept on disk, least recently loaded evicted first
+MAX_STRIPS = 200
+
+
+def grab_cmd(path: str, ts: float, width: int, height: int, *, keyframe: bool = False) -> list[str]:
+    """Raw rgb24 frame at `ts`; `keyframe` decodes only the keyframe the seek lands on."""
+    skip = ["-skip_frame", "nokey"] if keyframe else []
+    return [
+        "ffmpeg", "-v", "error", "-nostdin",
+        *skip, "-ss", f"{ts:.3f}", "-i", path,
+        "-frames:v", "1", "-an", "-sn",
+        "-vf", f"scale={width}:{height}",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1",
+    ]
+
+
+def fit_size(src_w: int, src_h: int, max_w: int) -> tuple[int, int]:
+    """Scale (src_w, src_h) down to max_w wide, keeping aspect; both even."""
+    if src_w <= 0 or src_h <= 0:
+        return max_w, max_w * 9 // 16 // 2 * 2
+    w = min(max_w, src_w) // 2 * 2
+    h = max(2, round(src_h * w / src_w / 2) * 2)
+    return w, h
+
+
+class FrameCache:
+    """LRU of QImages bounded by total pixel bytes."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[tuple, QImage] = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: tuple) -> QImage | None:
+        img = self._items.get(key)
+        if img is not None:
+            self._items.move_to_end(key)
+        return img
+
+    def put(self, key: tuple, img: QImage):
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= old.sizeInBytes()
+        self._items[key] = img
+        self._bytes += img.sizeInBytes()
+        while self._bytes > self.max_bytes and len(self._items) > 1:
+            _, evicted = self._items.popitem(last=False)
+            self._bytes -= evicted.sizeInBytes()
+
+    def clear(self):
+        self._items.clear()
+        self._bytes = 0
+
+
+class FrameGrabber(QObject):
+    """Asynchronous cached frame grabs. Emits frame_ready(path, ts, image)."""
+
+    frame_ready = pyqtSignal(str, float, QImage)
+    failed = pyqtSignal(str, float, str)
+
+    def __init__(self, pool_size: int = 2, max_pending: int = 2,
+                 cache: FrameCache | None = None, parent=None):
+        super().__init__(parent)
+        self._pool_size = max(1, pool_size)
+        self._max_pending = max(1, max_pending)
+        self.cache = cache or FrameCache()
+        self._pending: list[tuple] = []
+        self._active: dict[QProcess, tuple] = {}
+
+    @staticmethod
+    def key(path: str, ts: float, width: int, height: int) -> tuple:
+        # Millisecond resolution: finer than any frame, coarse enough to hit
+        return (path, round(ts, 3), width, height)
+
+    def cached(self, path: str, ts: float, width: int, height: int) -> QImage | None:
+        return self.cache.get(self.key(path, ts, width, height))
+
+    def request(self, path: str, ts: float, width: int, height: int):
+        """Emit the frame now if cached, otherwise schedule a grab."""
+        key = self.key(path, ts, width, height)
+        img = self.cache.get(key)
+        if img is not None:
+            self.frame_ready.emit(path, key[1], img)
+            return
+        if key in self._pending or key in self._active.values():
+            return
+        self._pending.append(key)
+        # Superseded scrub positions are dropped, oldest first
+        del self._pending[:-self._max_pending]
+        self._fill()
+
+    def cancel_pending(self):
+        self._pending.clear()
+
+    def _fill(self):
+        while self._pending and len(self._active) < self._pool_size:
+            key = self._pending.pop()
+            path, ts, w, h = key
+            cmd = grab_cmd(path, ts, w, h)
+            proc = QProcess(self)
+            proc.finished.connect(lambda code, _st, p=proc: self._on_finished(p, code))
+            self._active[proc] = key
+            proc.start(cmd[0], cmd[1:])
+
+    def _on_finished(self, proc: QProcess, exit_code: int):
+        key = self._active.pop(proc)
+        path, ts, w, h = key
+        data = proc.readAllStandardOutput().data()
+        err = proc.readAllStandardError().data().decode(errors="replace").strip()
+        proc.deleteLater()
+        frame_bytes = w * h * 3
+        if exit_code == 0 and len(data) >= frame_bytes:
+            # copy() detaches the image from the Python bytes buffer
+            img = QImage(data[:frame_bytes], w, h, w * 3, QImage.Format.Format_RGB888).copy()
+            self.cache.put(key, img)
+            self.frame_ready.emit(path, ts, img)
+        else:
+            self.failed.emit(path, ts, err or f"ffmpeg exited with code {exit_code}")
+        self._fill()
+
+
+def _coarse_to_fine(n: int) -> list[int]:
+    """Slot order that fills a strip evenly: start and middle first, then quarters, ..."""
+    order, seen = [], set()
+    step = 1
+    while step < n:
+        step *= 2
+    while step >= 1:
+        for i in range(0, n, step):
+            if i not in seen:
+                seen.add(i)
+                order.append(i)
+        step //= 2
+    return order
+
+
+class KeyframeStrip(QObject):
+    """Progressively loads `count` evenly spaced keyframe thumbnails for a file.
+
+    Each slot is one input-seek plus a keyframe-only decode, so cost does not
+    grow with file length. Finished thumbnails are written as PNGs under the
+    user cache dir, keyed by path, size and mtime, and reloaded instantly.
+    Only the MAX_STRIPS most recently loaded strips are kept on disk.
+    """
+
+    thumb_ready = pyqtSignal(int, QImage)   # (slot index, image)
+    finished = pyqtSignal()
+
+    def __init__(self, pool_size: int = 3, parent=None):
+        super().__init__(parent)
+        self._pool_size = max(1, pool_size)
+        self._queue: list[int] = []
+        self._active: dict[QProcess, int] = {}
+        self._path = ""
+        self._dir = ""
+
+    def load(self, path: str, duration: float, count: int, width: int, height: int):
+        self.stop()
+        self._path = path
+        self._duration = duration
+        self._count = count
+        self._size = (width, height)
+        self._dir = self._cache_path(path, count, width, height)
+        if self._dir:
+            # Mark this strip as the newest before pruning the oldest
+            os.utime(self._dir)
+            self._prune()
+        self._queue = []
+        for i in _coarse_to_fine(count):
+            img = QImage(self._slot_file(i)) if self._dir else QImage()
+            if not img.isNull():
+                self.thumb_ready.emit(i, img)
+            else:
+                self._queue.append(i)
+        self._fill()
+        if not self._active:
+            self.finished.emit()
+
+    def stop(self):
+        self._queue.clear()
+        for proc in list(self._active):
+            proc.finished.disconnect()
+            proc.kill()
+            proc.deleteLater()
+        self._active.clear()
+
+    def slot_time(self, i: int) -> float:
+        # Centre of each slot, so the first thumb isn't always a black intro frame
+        return (i + 0.5) * self._duration / self._count
+
+    @staticmethod
+    def _cache_path(path: str, count: int, width: int, height: int) -> str:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return ""
+        ident = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{count}|{width}x{height}"
+        return str(cache_dir("strips", hashlib.sha1(ident.encode()).hexdigest()))
+
+    @staticmethod
+    def _prune(keep: int = MAX_STRIPS):
+        strips = sorted(
+            (e for e in os.scandir(cache_dir("strips")) if e.is_dir()),
+            key=lambda e: e.stat().st_mtime,
+        )
+        for old in strips[:-keep]:
+            shutil.rmtree(old.path, ignore_errors=True)
+
+    def _slot_file(self, i: int) -> str:
+        return os.path.join(self._dir, f"{i:04d}.png")
+
+    def _fill(self):
+        while self._queue and len(self._active) < self._pool_size:
+            i = self._queue.pop(0)
+            cmd = grab_cmd(self._path, self.slot_time(i), *self._size, keyframe=True)
+            proc = QProcess(self)
+            proc.finished.connect(lambda code, _st, p=proc: self._on_finished(p, code))
+            self._active[proc] = i
+            proc.start(cmd[0], cmd[1:])
+
+    def _on_finished(self, proc: QProcess, exit_code: int):
+        i = self._active.pop(proc)
+        data = proc.readAllStandardOutput().data()
+        proc.deleteLater()
+        w, h = self._size
+        if exit_code == 0 and len(data) >= w * h * 3:
+            img = QImage(data[:w * h * 3], w, h, w * 3, QImage.Format.Format_RGB888).copy()
+            if self._dir:
+                img.save(self._slot_file(i), "PNG")
+            self.thumb_ready.emit(i, img)
+        self._fill()
+        if not self._active:
+            self.finished.emit()
@@ -0,0 +1,230 @@
+"""Raw frame and PCM pipes for in-process analysis.
+
+FrameReader runs ffmpeg with `-f rawvideo` to stdout and reads each frame
+with readinto() into a small ring of preallocated buffers, so iterating
+allocates nothing per frame. With NumPy installed frames are ndarrays of
+shape (height, width, channels) viewing those buffers; without it they are
+memoryviews. AudioReader does the same for interleaved PCM.
+
+A yielded frame is only valid until the reader has moved `buffers` frames
+further on; copy it to keep it. Both readers block, so call them from a
+worker or a headless script, not the GUI thread:
+
+    with FrameReader(path, pix_fmt="gray", width=160) as frames:
+        for frame in frames:
+            if frame.mean() < 16: ...
+"""
+
+import subprocess
+import tempfile
+
+from chevalvideo.probe import get_video_size, probe
+
+try:
+    import numpy as np
+except ImportError:  # optional: pip install chevalvideo[analysis]
+    np = None
+
+PIX_CHANNELS = {"gray": 1, "rgb24": 3, "bgr24": 3, "rgba": 4}
+# sample_fmt -> (NumPy dtype, memoryview format, bytes per sample)
+SAMPLE_FORMATS = {"s16le": ("int16", "h", 2), "f32le": ("float32", "f", 4)}
+
+
+def _read_exact(stream, view: memoryview) -> int:
+    """Fill `view` from `stream`; returns bytes read, short only at EOF."""
+    got = 0
+    while got < len(view):
+        n = stream.readinto(view[got:])
+        if not n:
+            break
+        got += n
+    return got
+
+
+class _Pipe:
+    """Shared ffmpeg process handling for the readers."""
+
+    def __init__(self):
+        self._proc: subprocess.Popen | None = None
+        self._stderr = None
+        self.error = ""
+
+    def _open(self, cmd: list[str]):
+        self.close()
+        # stderr goes to a file: a damaged input can log more than a pipe holds,
+        # which would stall ffmpeg while we wait on stdout
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=self._stderr, bufsize=0,
+        )
+
+    def close(self):
+        """Stop ffmpeg (if still running) and keep its error output in `error`."""
+        if self._proc is None:
+            return
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.stdout.close()
+        self._proc.wait()
+        self._stderr.seek(0)
+        self.error = self._stderr.read().decode(errors="replace").strip()
+        self._stderr.close()
+        self._proc = self._stderr = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameReader(_Pipe):
+    """Iterates decoded video frames as views into reusable buffers.
+
+    `width`/`height` scale the picture (0 keeps the source size, one of them
+    0 keeps the aspect ratio); `fps` resamples the frame rate; `vf` adds
+    filters before scaling; `keyframes_only` decodes only keyframes.
+    """
+
+    def __init__(self, path: str, *, pix_fmt: str = "gray", width: int = 0, height: int = 0,
+                 fps: float = 0.0, start: float = 0.0, duration: float = 0.0, vf: str = "",
+                 keyframes_only: bool = False, buffers: int = 2):
+        super().__init__()
+        if pix_fmt not in PIX_CHANNELS:
+            raise ValueError(f"pix_fmt must be one of {', '.join(PIX_CHANNELS)}")
+        self.path = path
+        self.pix_fmt = pix_fmt
+        self.channels = PIX_CHANNELS[pix_fmt]
+        self.width, self.height = self._frame_size(width, height)
+        self.fps = fps
+        self.start = start
+        self.duration = duration
+        self.vf = vf
+        self.keyframes_only = keyframes_only
+        self.frame_index = -1
+        self.frame_bytes = self.width * self.height * self.channels
+        self._buffers = [bytearray(self.frame_bytes) for _ in range(max(1, buffers))]
+        if np is not None:
+            shape = (self.height, self.width, self.channels)
+            self._frames = [np.frombuffer(b, dtype=np.uint8).reshape(shape) for b in self._buffers]
+        else:
+            self._frames = [memoryview(b) for b in self._buffers]
+
+    def _frame_size(self, width: int, height: int) -> tuple[int, int]:
+        if width and height:
+            return width, height
+        src_w, src_h = get_video_size(probe(self.path))
+        if not src_w or not src_h:
+            raise ValueError(f"no video stream in {self.path}")
+        if width:
+            return width, max(2, round(src_h * width / src_w / 2) * 2)
+        if height:
+            return max(2, round(src_w * height / src_h / 2) * 2), height
+        return src_w, src_h
+
+    def command(self) -> list[str]:
+        cmd = ["ffmpeg", "-v", "error", "-nostdin"]
+        if self.keyframes_only:
+            cmd += ["-skip_frame", "nokey"]
+        if self.start:
+            cmd += ["-ss", f"{self.start:.3f}"]
+        if self.duration:
+            cmd += ["-t", f"{self.duration:.3f}"]
+        filters = [f for f in (self.vf, f"fps={self.fps}" if self.fps else "") if f]
+        filters.append(f"scale={self.width}:{self.height}")
+        return cmd + [
+            "-i", self.path, "-an", "-sn", "-dn",
+            "-vf", ",".join(filters),
+            "-f", "rawvideo", "-pix_fmt", self.pix_fmt, "pipe:1",
+        ]
+
+    def __iter__(self):
+        self._open(self.command())
+        self.frame_index = -1
+        stream = self._proc.stdout
+        views = [memoryview(b) for b in self._buffers]
+        try:
+            while True:
+                slot = (self.frame_index + 1) % len(self._buffers)
+                if _read_exact(stream, views[slot]) < self.frame_bytes:
+                    return
+                self.frame_index += 1
+                yield self._frames[slot]
+        finally:
+            self.close()
+
+    def timestamp(self) -> float:
+        """Time of the current frame, when a fixed `fps` was requested."""
+        return self.start + self.frame_index / self.fps if self.fps else 0.0
+
+
+class AudioReader(_Pipe):
+    """Iterates interleaved PCM in chunks of `chunk` sample frames.
+
+    Each chunk is shaped (samples, channels) with NumPy; the last one may be
+    shorter. Channels and rate are resampled to `channels`/`rate`.
+    """
+
+    def __init__(self, path: str, *, rate: int = 48000, channels: int = 1,
+                 sample_fmt: str = "f32le", chunk: int = 4800, start: float = 0.0,
+                 duration: float = 0.0, af: str = "", buffers: int = 2):
+        super().__init__()
+        if sample_fmt not in SAMPLE_FORMATS:
+            raise ValueError(f"sample_fmt must be one of {', '.join(SAMPLE_FORMATS)}")
+        self.path = path
+        self.rate = rate
+        self.channels = channels
+        self.sample_fmt = sample_fmt
+        self.start = start
+        self.duration = duration
+        self.af = af
+        self.samples_read = 0
+        dtype, code, width = SAMPLE_FORMATS[sample_fmt]
+        self._frame_bytes = width * channels
+        self.chunk_bytes = chunk * self._frame_bytes
+        self._buffers = [bytearray(self.chunk_bytes) for _ in range(max(1, buffers))]
+        if np is not None:
+            self._chunks = [np.frombuffer(b, dtype=dtype).reshape(-1, channels) for b in self._buffers]
+        else:
+            self._chunks = [memoryview(b).cast(code) for b in self._buffers]
+
+    def command(self) -> list[str]:
+        cmd = ["ffmpeg", "-v", "error", "-nostdin"]
+        if self.start:
+            cmd += ["-ss", f"{self.start:.3f}"]
+        if self.duration:
+            cmd += ["-t", f"{self.duration:.3f}"]
+        cmd += ["-i", self.path, "-vn", "-sn", "-dn"]
+        if self.af:
+            cmd += ["-af", self.af]
+        return cmd + [
+            "-ac", str(self.channels), "-ar", str(self.rate),
+            "-f", self.sample_fmt, "pipe:1",
+        ]
+
+    def __iter__(self):
+        self._open(self.command())
+        self.samples_read = 0
+        stream = self._proc.stdout
+        views = [memoryview(b) for b in self._buffers]
+        slot = 0
+        try:
+            while True:
+                got = _read_exact(stream, views[slot])
+                n = got // self._frame_bytes
+                if n == 0:
+                    return
+                self.samples_read += n
+                chunk = self._chunks[slot]
+                if got < self.chunk_bytes:
+                    chunk = chunk[:n] if np is not None else chunk[:n * self.channels]
+                yield chunk
+                if got < self.chunk_bytes:
+                    return
+                slot = (slot + 1) % len(self._buffers)
+        finally:
+            self.close()
+
+    def timestamp(self) -> float:
+        """Time just past the last sample read."""
+        return self.start + self.samples_read / self.rate
@@ -0,0 +1,249 @@
+"""Smooth-motion (frame interpolation) engine for speed changes.
+
+Tiers, cheapest first:
+  blend     framerate filter — frame blending, slice-threaded
+  mci       minterpolate mi_mode=mci in one process (single-threaded)
+  parallel  minterpolate per chunk in parallel processes, chunks split at
+            scene cuts so no motion is interpolated across a boundary,
+            then stream-copy concatenated
+"""
+
+import os
+import re
+import shutil
+import tempfile
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from chevalvideo import limits
+from chevalvideo.runner import CommandRunner
+from chevalvideo.scheduler import scheduler
+
+TIERS = [
+    {"value": "off", "label": "Off", "description": "No interpolation"},
+    {"value": "blend", "label": "Fast blend", "description": "framerate filter, multithreaded"},
+    {"value": "mci", "label": "Motion (MCI)", "description": "minterpolate, single process"},
+    {"value": "parallel", "label": "Motion (parallel)", "description": "minterpolate per scene chunk"},
+]
+
+DEFAULT_FPS = 60  # minterpolate's own default output rate
+SCENE_THRESHOLD = 0.35
+SAMPLE_SECS = 3.0
+
+_PTS_RE = re.compile(r"pts_time:([\d.]+)")
+
+# Chunk encoders for containers that can't take the default H.264 copy
+CHUNK_CODECS = {
+    ".webm": ["-c:v", "libvpx-vp9", "-crf", "24", "-b:v", "0", "-row-mt", "1"],
+    ".ogv": ["-c:v", "libtheora", "-q:v", "8"],
+}
+DEFAULT_CHUNK_CODEC = ["-c:v", "libx264", "-crf", "18", "-preset", "medium"]
+
+
+def smooth_filter(tier: str, fps: int) -> str:
+    """Interpolation filter for a tier; empty string for "off"."""
+    fps = fps or DEFAULT_FPS
+    if tier == "blend":
+        return f"framerate=fps={fps}"
+    if tier in ("mci", "parallel"):
+        return f"minterpolate=fps={fps}:mi_mode=mci"
+    return ""
+
+
+def sample_cmd(path: str, vf: str, start: float, secs: float = SAMPLE_SECS) -> list[str]:
+    """Process a short slice to a null sink, to time the filter chain."""
+    return [
+        "ffmpeg", "-hide_banner", "-ss", f"{start:.3f}", "-t", f"{secs:.3f}",
+        "-i", path, "-an", "-sn", "-vf", vf,
+        "-progress", "pipe:1", "-f", "null", "-",
+    ]
+
+
+def scene_cmd(path: str, threshold: float = SCENE_THRESHOLD) -> list[str]:
+    """Scene-change scan on a tiny downscaled decode; cut times come from showinfo."""
+    return [
+        "ffmpeg", "-hide_banner", "-i", path, "-an", "-sn",
+        "-vf", f"scale=160:-2,select='gt(scene,{threshold})',showinfo",
+        "-progress", "pipe:1", "-f", "null", "-",
+    ]
+
+
+def parse_scene_time(line: str) -> float | None:
+    if "Parsed_showinfo" not in line:
+        return None
+    m = _PTS_RE.search(line)
+    return float(m.group(1)) if m else None
+
+
+def plan_chunks(duration: float, cuts: list[float], n: int,
+                min_len: float = 5.0) -> list[tuple[float, float]]:
+    """Split [0, duration] into about `n` chunks, snapping boundaries to scene cuts.
+
+    Each ideal boundary k*duration/n takes the nearest scene cut if one lies
+    within half a chunk; otherwise the ideal time is used. Chunks shorter than
+    `min_len` are merged into their neighbour.
+    """
+    if duration <= 0 or n <= 1:
+        return [(0.0, duration)]
+    ideal = duration / n
+    bounds = [0.0]
+    cuts = sorted(c for c in cuts if 0 < c < duration)
+    for k in range(1, n):
+        target = k * ideal
+        near = min(cuts, key=lambda c: abs(c - target), default=None)
+        t = near if near is not None and abs(near - target) < ideal / 2 else target
+        if t - bounds[-1] >= min_len and duration - t >= min_len:
+            bounds.append(t)
+    bounds.append(duration)
+    return list(zip(bounds, bounds[1:]))
+
+
+def chunk_codec(out_path: str) -> list[str]:
+    """Encoder arguments for chunks that will be stream-copied into `out_path`."""
+    return CHUNK_CODECS.get(os.path.splitext(out_path)[1].lower(), DEFAULT_CHUNK_CODEC)
+
+
+def estimate_secs(duration: float, sample_src: float, sample_wall: float, parallel: int = 1) -> float:
+    """Extrapolate full wall time from a timed sample of `sample_src` source seconds."""
+    if sample_src <= 0 or sample_wall <= 0:
+        return 0.0
+    return duration * (sample_wall / sample_src) / max(1, parallel)
+
+
+def format_eta(secs: float) -> str:
+    h, rem = divmod(int(secs), 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h {m:02d}m" if h else f"{m}m {s:02d}s"
+
+
+class ChunkedInterpolator(QObject):
+    """Interpolates chunks in parallel processes, then concatenates them.
+
+    Mirrors CommandRunner's signals so a page can drive it the same way.
+    """
+
+    progress = pyqtSignal(float)
+    output = pyqtSignal(str)
+    finished = pyqtSignal(bool, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._active: dict[CommandRunner, int] = {}
+        self._queue: list[int] = []
+        self._chunk_pct: list[float] = []
+        self._tmpdir = ""
+        self._failed = ""
+        self._final: CommandRunner | None = None
+
+    def is_running(self) -> bool:
+        return bool(self._active) or self._final is not None
+
+    def start(self, path: str, chunks: list[tuple[float, float]], vf: str, out_path: str,
+              *, speed: float, audio_args: list[str], parallel: int):
+        """`vf` is the full video chain; `audio_args` are applied at the final mux."""
+        self._path = path
+        self._chunks = chunks
+        self._vf = vf
+        self._out_path = out_path
+        self._speed = speed
+        self._audio_args = audio_args
+        # Chunks are encodes; hold enough cpu slots for all of them to run at once
+        self._parallel = scheduler().reserve(self, "cpu", max(1, parallel))
+        self._tmpdir = tempfile.mkdtemp(prefix="chevalvideo-interp-")
+        self._queue = list(range(len(chunks)))
+        self._chunk_pct = [0.0] * len(chunks)
+        self._failed = ""
+        # Split the cores between the chunks that actually run side by side
+        self._limits = limits.defaults()
+        if self._limits.threads <= 0:
+            self._limits = self._limits.replace(threads=max(1, limits.cpu_count() // self._parallel))
+        self.output.emit(f"Interpolating {len(chunks)} chunks, {self._parallel} at a time")
+        self._fill()
+
+    def cancel(self):
+        self._queue.clear()
+        self._failed = self._failed or "Cancelled"
+        for runner in list(self._active):
+            runner.cancel()
+        if self._final is not None:
+            self._final.cancel()
+
+    def _chunk_path(self, i: int) -> str:
+        return os.path.join(self._tmpdir, f"chunk{i:04d}.mkv")
+
+    def _fill(self):
+        while self._queue and len(self._active) < self._parallel:
+            i = self._queue.pop(0)
+            start, end = self._chunks[i]
+            cmd = [
+                "ffmpeg", "-y", "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}",
+                "-i", self._path, "-an", "-sn",
+                "-vf", self._vf,
+                *chunk_codec(self._out_path),
+                "-progress", "pipe:1", self._chunk_path(i),
+            ]
+            runner = CommandRunner(self)
+            runner.progress.connect(lambda pct, i=i: self._on_chunk_progress(i, pct))
+            runner.output.connect(self._on_chunk_output)
+            runner.finished.connect(lambda ok, msg, r=runner: self._on_chunk_done(r, ok, msg))
+            self._active[runner] = i
+            runner.run(cmd, duration=(end - start) / self._speed, limits=self._limits)
+
+    def _on_chunk_output(self, line: str):
+        # Per-chunk -progress key=value lines would swamp the log
+        if "=" in line and " " not in line:
+            return
+        self.output.emit(line)
+
+    def _on_chunk_progress(self, i: int, pct: float):
+        self._chunk_pct[i] = pct
+        # Chunk encodes are ~95% of the work; the final mux the rest
+        self.progress.emit(sum(self._chunk_pct) / len(self._chunk_pct) * 0.95)
+
+    def _on_chunk_done(self, runner: CommandRunner, ok: bool, msg: str):
+        i = self._active.pop(runner)
+        runner.deleteLater()
+        if not ok and not self._failed:
+            self._failed = f"Chunk {i + 1} failed: {msg}"
+            self.cancel()
+        # Keep every slot busy; chunks snapped to scene cuts vary in length
+        if self._queue and not self._failed:
+            self._fill()
+        if self._active or self._queue:
+            return
+        if self._failed:
+            self._cleanup()
+            self.finished.emit(False, self._failed)
+            return
+        self._concat()
+
+    def _concat(self):
+        list_path = os.path.join(self._tmpdir, "chunks.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            for i in range(len(self._chunks)):
+                f.write(f"file '{self._chunk_path(i)}'\n")
+        cmd = [
+            "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_path,
+            "-i", self._path,
+            "-map", "0:v", "-map", "1:a?", "-c:v", "copy",
+            *self._audio_args,
+            "-progress", "pipe:1", self._out_path,
+        ]
+        self._final = CommandRunner(self)
+        self._final.output.connect(self.output)
+        self._final.finished.connect(self._on_concat_done)
+        self._final.run(cmd)
+
+    def _on_concat_done(self, ok: bool, msg: str):
+        self._final.deleteLater()
+        self._final = None
+        self._cleanup()
+        if ok:
+            self.progress.emit(100.0)
+        self.finished.emit(ok, msg)
+
+    def _cleanup(self):
+        scheduler().release(self)
+        if self._tmpdir:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = ""
@@ -0,0 +1,161 @@
+"""On-disk job logs with a sparse line index.
+
+Every job's output goes to its own file under the user cache dir; only the
+newest MAX_FILES are kept. Reading a line seeks to the nearest indexed
+offset (one per INDEX_STRIDE lines) and scans forward, and search runs a
+regex over an mmap of the file, so memory stays flat however long the log.
+Reads go through the handle the log is written with, never the path: another
+job's pruning may unlink a file that a view is still showing.
+"""
+
+import itertools
+import mmap
+import os
+import re
+import time
+from array import array
+from collections import OrderedDict
+
+from chevalvideo.paths import cache_dir
+
+MAX_FILES = 50
+INDEX_STRIDE = 64
+BLOCK_CACHE = 32
+
+ERROR_RE = re.compile(
+    rb"error|failed|invalid|no such file|not found|denied|unable to|conversion failed",
+    re.IGNORECASE,
+)
+
+_seq = itertools.count()
+
+
+def logs_dir():
+    return cache_dir("logs")
+
+
+def _prune(keep: int = MAX_FILES):
+    files = sorted(logs_dir().glob("*.log"), key=lambda p: p.stat().st_mtime)
+    for old in files[:-keep]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+
+class JobLog:
+    """Append-only log file for one job, readable by line number."""
+
+    def __init__(self):
+        self.path = ""
+        self._fh = None
+        self._count = 0
+        self._size = 0
+        self._index = array("Q")          # byte offset of every INDEX_STRIDE-th line
+        self._blocks: OrderedDict[int, list[str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return self._count
+
+    # ── Writing ──
+
+    def open_new(self):
+        """Close the current file and start a fresh one on the next append."""
+        self.close()
+        self.path = ""
+        self._count = 0
+        self._size = 0
+        self._index = array("Q")
+        self._blocks.clear()
+
+    def append(self, text: str) -> int:
+        """Append one or more lines; returns how many were added."""
+        if self._fh is None:
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_seq)}.log"
+            self.path = str(logs_dir() / name)
+            self._fh = open(self.path, "a+b")
+            _prune()
+        lines = text.splitlines() or [""]
+        for line in lines:
+            if self._count % INDEX_STRIDE == 0:
+                self._index.append(self._size)
+            data = line.encode("utf-8", errors="replace") + b"\n"
+            self._fh.write(data)
+            self._size += len(data)
+            self._count += 1
+        # The last block may have grown; drop it so it is re-read
+        self._blocks.pop((self._count - 1) // INDEX_STRIDE, None)
+        return len(lines)
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    # ── Reading ──
+
+    def line(self, n: int) -> str:
+        if not 0 <= n < self._count:
+            return ""
+        block = self._block(n // INDEX_STRIDE)
+        return block[n % INDEX_STRIDE] if n % INDEX_STRIDE < len(block) else ""
+
+    def _block(self, b: int) -> list[str]:
+        lines = self._blocks.get(b)
+        if lines is not None:
+            self._blocks.move_to_end(b)
+            return lines
+        self._fh.flush()
+        start = self._index[b]
+        end = self._index[b + 1] if b + 1 < len(self._index) else self._size
+        self._fh.seek(start)
+        raw = self._fh.read(end - start)
+        lines = raw.decode("utf-8", errors="replace").split("\n")[:INDEX_STRIDE]
+        self._blocks[b] = lines
+        while len(self._blocks) > BLOCK_CACHE:
+            self._blocks.popitem(last=False)
+        return lines
+
+    def _line_at(self, mm, offset: int) -> int:
+        """Line number containing byte `offset`."""
+        lo, hi = 0, len(self._index) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._index[mid] <= offset:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo * INDEX_STRIDE + mm[self._index[lo]:offset].count(b"\n")
+
+    def find(self, pattern: re.Pattern, start_line: int, backward: bool = False) -> int:
+        """First line matching `pattern` (a bytes regex) after / before `start_line`; -1 if none."""
+        if self._count == 0:
+            return -1
+        self._fh.flush()
+        with mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if not backward:
+                b = min((start_line + 1) // INDEX_STRIDE, len(self._index) - 1)
+                pos = self._index[b]
+                first = b * INDEX_STRIDE
+                # Skip to the line after start_line within its block
+                for _ in range(max(0, start_line + 1 - first)):
+                    nl = mm.find(b"\n", pos)
+                    if nl < 0:
+                        return -1
+                    pos = nl + 1
+                m = pattern.search(mm, pos)
+                return self._line_at(mm, m.start()) if m else -1
+            # Backward: scan block by block from the end, keeping the last hit
+            b = min(start_line // INDEX_STRIDE, len(self._index) - 1)
+            while b >= 0:
+                end = self._index[b + 1] if b + 1 < len(self._index) else len(mm)
+                hits = [self._line_at(mm, m.start())
+                        for m in pattern.finditer(mm, self._index[b], end)]
+                hits = [n for n in hits if n < start_line]
+                if hits:
+                    return hits[-1]
+                b -= 1
+            return -1
+
+    def find_error(self, start_line: int) -> int:
+        return self.find(ERROR_RE, start_line)
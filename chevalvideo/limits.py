@@ -0,0 +1,171 @@
+"""Process priority, I/O class, CPU affinity and thread caps for spawned tools.
+
+Limits are applied by prefixing the command with `taskset`, `ionice` and
+`nice` (each exec()s the next, so the tool keeps the PID and every thread it
+creates inherits the settings), and for ffmpeg by adding -threads /
+-filter_threads and an x265 `pools` cap. Global defaults live in
+limits.json in the data dir; a runner can override them per job.
+"""
+
+import json
+import os
+import shutil
+
+from chevalvideo.paths import data_dir
+
+IONICE_CLASSES = {
+    "": [],                           # inherit
+    "low": ["-c", "2", "-n", "7"],    # best-effort, lowest level
+    "idle": ["-c", "3"],              # only when the disk is otherwise idle
+}
+
+
+def parse_cpus(text: str) -> set[int]:
+    """Parse a taskset-style list ("0-3,6"). Raises ValueError."""
+    cpus: set[int] = set()
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        lo, _, hi = part.partition("-")
+        a, b = int(lo), int(hi or lo)
+        if a < 0 or b < a:
+            raise ValueError(f"bad CPU range: {part!r}")
+        cpus.update(range(a, b + 1))
+    return cpus
+
+
+def cpu_count() -> int:
+    """CPUs this process may run on (respects an inherited affinity mask)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ProcessLimits:
+    """Scheduling limits for one spawned process. Zero / empty means "inherit"."""
+
+    def __init__(self, nice: int = 0, ionice: str = "", cpus: str = "", threads: int = 0):
+        self.nice = nice
+        self.ionice = ionice if ionice in IONICE_CLASSES else ""
+        self.cpus = cpus
+        self.threads = threads
+
+    def replace(self, **changes) -> "ProcessLimits":
+        data = self.to_dict()
+        data.update(changes)
+        return ProcessLimits(**data)
+
+    def to_dict(self) -> dict:
+        return {"nice": self.nice, "ionice": self.ionice, "cpus": self.cpus, "threads": self.threads}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ProcessLimits":
+        return cls(
+            nice=int(data.get("nice", 0)),
+            ionice=str(data.get("ionice", "")),
+            cpus=str(data.get("cpus", "")),
+            threads=int(data.get("threads", 0)),
+        )
+
+    def apply(self, cmd: list[str]) -> list[str]:
+        """Return `cmd` with the limits applied; tools that are missing are skipped."""
+        if self.threads > 0 and os.path.basename(cmd[0]) == "ffmpeg":
+            cmd = with_thread_cap(cmd, self.threads)
+        prefix: list[str] = []
+        if self.cpus and shutil.which("taskset"):
+            prefix += ["taskset", "-c", self.cpus]
+        if IONICE_CLASSES[self.ionice] and shutil.which("ionice"):
+            prefix += ["ionice", *IONICE_CLASSES[self.ionice]]
+        if self.nice and shutil.which("nice"):
+            prefix += ["nice", "-n", str(self.nice)]
+        return prefix + cmd
+
+
+# ffmpeg options that take no value; every other option consumes the next argument
+_FLAG_OPTIONS = frozenset({
+    "-y", "-n", "-nostdin", "-stdin", "-hide_banner", "-stats", "-nostats", "-copyts",
+    "-start_at_zero", "-debug_ts", "-shortest", "-an", "-vn", "-sn", "-dn", "-re",
+    "-accurate_seek", "-noaccurate_seek", "-autorotate", "-noautorotate", "-autoscale",
+    "-noautoscale", "-benchmark", "-benchmark_all", "-xerror", "-ignore_unknown",
+    "-copy_unknown", "-dump", "-hex", "-report", "-vstats", "-psnr", "-qphist",
+})
+
+
+def _arg_positions(cmd: list[str]) -> tuple[list[int], list[int]]:
+    """Indexes of an ffmpeg command's input paths (-i values) and output paths."""
+    inputs, outputs = [], []
+    i = 1
+    while i < len(cmd):
+        arg = cmd[i]
+        if arg == "-i":
+            inputs.append(i + 1)
+            i += 2
+        elif arg.startswith("-") and arg != "-":
+            i += 1 if arg in _FLAG_OPTIONS else 2
+        else:
+            outputs.append(i)
+            i += 1
+    return inputs, outputs
+
+
+def output_indexes(cmd: list[str]) -> list[int]:
+    """Indexes of the output arguments of an ffmpeg command, in order."""
+    return _arg_positions(cmd)[1]
+
+
+def with_thread_cap(cmd: list[str], threads: int) -> list[str]:
+    """Cap ffmpeg's filter and encoder threads, unless the command sets its own.
+
+    -threads is an output option, so it goes before every output that lacks
+    one; a command can write several (fused presets, Auto Split, demuxing).
+    x265 sizes its own thread pools and ignores -threads; it gets pools=N
+    instead. -filter_threads is global and added once.
+    """
+    inputs, outputs = _arg_positions(cmd)
+    cmd = list(cmd)
+    capped = False
+    # From the last output back, so earlier indexes stay valid as options go in
+    for k in range(len(outputs) - 1, -1, -1):
+        out = outputs[k]
+        start = outputs[k - 1] + 1 if k else max([i + 1 for i in inputs if i < out], default=1)
+        segment = cmd[start:out]
+        if "-threads" in segment:
+            continue
+        extra = ["-threads", str(threads)]
+        if "libx265" in segment:
+            if "-x265-params" in segment:
+                i = start + segment.index("-x265-params") + 1
+                cmd[i] = f"{cmd[i]}:pools={threads}"
+            else:
+                extra += ["-x265-params", f"pools={threads}"]
+        cmd[out:out] = extra
+        capped = True
+    if capped and "-filter_threads" not in cmd:
+        cmd[1:1] = ["-filter_threads", str(threads)]
+    return cmd
+
+
+# ── Global defaults ──
+
+_defaults: ProcessLimits | None = None
+
+
+def _defaults_path():
+    return data_dir() / "limits.json"
+
+
+def defaults() -> ProcessLimits:
+    global _defaults
+    if _defaults is None:
+        try:
+            with open(_defaults_path(), encoding="utf-8") as f:
+                _defaults = ProcessLimits.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError, AttributeError):
+            _defaults = ProcessLimits()
+    return _defaults
+
+
+def set_defaults(limits: ProcessLimits):
+    global _defaults
+    _defaults = limits
+    with open(_defaults_path(), "w", encoding="utf-8") as f:
+        json.dump(limits.to_dict(), f, indent=2)
@@ -0,0 +1,141 @@
+"""Two-pass EBU R128 loudnorm — measure pass, linear apply pass, per-file cache."""
+
+import json
+import os
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from chevalvideo.runner import CommandRunner
+
+TRUE_PEAK = -1.5
+LRA = 11.0
+
+_MEASURED_KEYS = ("input_i", "input_tp", "input_lra", "input_thresh", "target_offset")
+
+# (abspath, size, mtime_ns, I, TP, LRA) -> measured dict
+_cache: dict[tuple, dict] = {}
+
+
+def measure_cmd(path: str, target_i: float, tp: float = TRUE_PEAK, lra: float = LRA) -> list[str]:
+    """Pass 1: audio-only decode that prints loudnorm's measurement as JSON."""
+    return [
+        "ffmpeg", "-hide_banner", "-nostats",
+        "-i", path,
+        "-vn", "-sn", "-dn",
+        "-af", f"loudnorm=I={target_i}:TP={tp}:LRA={lra}:print_format=json",
+        "-progress", "pipe:1",
+        "-f", "null", "-",
+    ]
+
+
+def apply_filter(measured: dict, target_i: float, tp: float = TRUE_PEAK, lra: float = LRA) -> str:
+    """Pass 2: loudnorm filter string in linear mode using the measured values."""
+    return (
+        f"loudnorm=I={target_i}:TP={tp}:LRA={lra}"
+        f":measured_I={measured['input_i']}"
+        f":measured_TP={measured['input_tp']}"
+        f":measured_LRA={measured['input_lra']}"
+        f":measured_thresh={measured['input_thresh']}"
+        f":offset={measured['target_offset']}"
+        ":linear=true:print_format=summary"
+    )
+
+
+def parse_measurement(lines: list[str]) -> dict | None:
+    """Pull loudnorm's JSON block out of collected ffmpeg output lines."""
+    block = None
+    for line in lines:
+        line = line.strip()
+        if line == "{":
+            block = [line]
+        elif block is not None:
+            block.append(line)
+            if line == "}":
+                try:
+                    data = json.loads("\n".join(block))
+                except json.JSONDecodeError:
+                    block = None
+                    continue
+                if all(k in data for k in _MEASURED_KEYS):
+                    # "-inf" means silence; linear mode can't use it
+                    if data["input_i"] in ("-inf", "inf"):
+                        return None
+                    return data
+                block = None
+    return None
+
+
+def _cache_key(path: str, target_i: float, tp: float, lra: float) -> tuple | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), st.st_size, st.st_mtime_ns, float(target_i), float(tp), float(lra))
+
+
+def cached(path: str, target_i: float, tp: float = TRUE_PEAK, lra: float = LRA) -> dict | None:
+    """Return cached measurement for an unchanged file, or None."""
+    key = _cache_key(path, target_i, tp, lra)
+    return _cache.get(key) if key else None
+
+
+def store(path: str, measured: dict, target_i: float, tp: float = TRUE_PEAK, lra: float = LRA):
+    key = _cache_key(path, target_i, tp, lra)
+    if key:
+        _cache[key] = measured
+
+
+class LoudnormAnalyzer(QObject):
+    """Runs pass-1 measurements for many files with bounded concurrency."""
+
+    measured = pyqtSignal(str, dict)   # (path, measurement)
+    failed = pyqtSignal(str, str)      # (path, message)
+    all_done = pyqtSignal()
+
+    def __init__(self, max_parallel: int = 4, parent=None):
+        super().__init__(parent)
+        self._max_parallel = max(1, max_parallel)
+        self._queue: list[str] = []
+        self._active: dict[CommandRunner, tuple[str, list[str]]] = {}
+        self._target = (-23.0, TRUE_PEAK, LRA)
+        self.limits = None  # ProcessLimits for the measuring runners
+
+    def start(self, paths: list[str], target_i: float, tp: float = TRUE_PEAK, lra: float = LRA):
+        """Measure every path not already cached. Emits all_done when finished."""
+        self._target = (target_i, tp, lra)
+        self._queue = [p for p in paths if cached(p, target_i, tp, lra) is None]
+        self._fill()
+        if not self._active:
+            self.all_done.emit()
+
+    def cancel(self):
+        self._queue.clear()
+        for runner in list(self._active):
+            runner.cancel()
+
+    def is_running(self) -> bool:
+        return bool(self._active)
+
+    def _fill(self):
+        while self._queue and len(self._active) < self._max_parallel:
+            path = self._queue.pop(0)
+            runner = CommandRunner(self)
+            runner.limits = self.limits
+            lines: list[str] = []
+            runner.output.connect(lines.append)
+            runner.finished.connect(lambda ok, msg, r=runner: self._on_finished(r, ok, msg))
+            self._active[runner] = (path, lines)
+            runner.run(measure_cmd(path, *self._target))
+
+    def _on_finished(self, runner: CommandRunner, ok: bool, msg: str):
+        path, lines = self._active.pop(runner)
+        runner.deleteLater()
+        data = parse_measurement(lines) if ok else None
+        if data is not None:
+            store(path, data, *self._target)
+            self.measured.emit(path, data)
+        else:
+            self.failed.emit(path, msg if not ok else "no loudness measurement (silent or no audio?)")
+        self._fill()
+        if not self._active:
+            self.all_done.emit()
@@ -0,0 +1,135 @@
+"""Per-process resource sampling from /proc, and the JSONL metrics log.
+
+A ProcSampler polls /proc/<pid>/{stat,status,io} while a job runs. CPU time
+and I/O counters are cumulative, so the last sample before exit is the
+total (to within one sample interval); peak RSS comes from the kernel's
+own high-water mark (VmHWM). On systems without /proc only wall time is
+recorded.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from chevalvideo.paths import data_dir
+
+SAMPLE_MS = 250
+
+try:
+    _CLK_TCK = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    _CLK_TCK = 100
+
+
+def metrics_path() -> Path:
+    return data_dir() / "metrics.jsonl"
+
+
+def read_proc(pid: int) -> dict | None:
+    """One snapshot of a process's counters; None once it has gone."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            # comm (field 2) may contain spaces; split after its closing paren
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            status = dict(line.split(":", 1) for line in f if ":" in line)
+    except (OSError, IndexError, ValueError):
+        return None
+    # fields[0] is stat field 3 (state); utime..cstime are fields 14–17
+    utime, stime, cutime, cstime = (int(x) for x in fields[11:15])
+    snap = {
+        "cpu_user": (utime + cutime) / _CLK_TCK,
+        "cpu_sys": (stime + cstime) / _CLK_TCK,
+        "peak_rss": int(status.get("VmHWM", "0 kB").split()[0]) * 1024,
+        "threads": int(status.get("Threads", "0")),
+    }
+    try:
+        with open(f"/proc/{pid}/io", encoding="ascii") as f:
+            io = dict(line.split(":", 1) for line in f if ":" in line)
+        snap["read_bytes"] = int(io["read_bytes"])
+        snap["write_bytes"] = int(io["write_bytes"])
+    except (OSError, KeyError, ValueError):
+        # /proc/<pid>/io needs ptrace access on some kernels
+        pass
+    return snap
+
+
+class ProcSampler:
+    """Accumulates /proc samples for one running process."""
+
+    def __init__(self):
+        self._start = time.monotonic()
+        self._pid = 0
+        self._last: dict = {}
+        self._peak_rss = 0
+        self._max_threads = 0
+        self._samples = 0
+
+    def attach(self, pid: int):
+        self._pid = pid
+        self.sample()
+
+    def sample(self):
+        if not self._pid:
+            return
+        snap = read_proc(self._pid)
+        if snap is None:
+            return
+        self._last = snap
+        self._peak_rss = max(self._peak_rss, snap["peak_rss"])
+        self._max_threads = max(self._max_threads, snap["threads"])
+        self._samples += 1
+
+    def result(self, cmd: list[str], ok: bool, exit_code: int, media_secs: float = 0.0) -> dict:
+        wall = time.monotonic() - self._start
+        cpu_user = self._last.get("cpu_user", 0.0)
+        cpu_sys = self._last.get("cpu_sys", 0.0)
+        m = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "tool": os.path.basename(cmd[0]),
+            "cmd": cmd,
+            "ok": ok,
+            "exit_code": exit_code,
+            "wall_s": round(wall, 3),
+            "cpu_user_s": round(cpu_user, 2),
+            "cpu_sys_s": round(cpu_sys, 2),
+            # >100 means more than one core busy on average
+            "cpu_pct": round((cpu_user + cpu_sys) / wall * 100, 1) if wall > 0 else 0.0,
+            "peak_rss": self._peak_rss,
+            "max_threads": self._max_threads,
+            "read_bytes": self._last.get("read_bytes"),
+            "write_bytes": self._last.get("write_bytes"),
+            "samples": self._samples,
+        }
+        if media_secs > 0 and wall > 0:
+            m["media_s"] = round(media_secs, 3)
+            m["speed"] = round(media_secs / wall, 3)
+        return m
+
+
+def record(metrics: dict):
+    """Append one job's metrics to the JSONL log; failures are not fatal."""
+    try:
+        with open(metrics_path(), "a", encoding="utf-8") as f:
+            f.write(json.dumps(metrics) + "\n")
+    except OSError:
+        pass
+
+
+def _mb(n: int | None) -> str:
+    return "?" if n is None else f"{n / 1_048_576:.0f} MB"
+
+
+def summarize(m: dict) -> str:
+    """One-line human summary for the job log."""
+    parts = [
+        f"wall {m['wall_s']:.1f}s",
+        f"cpu {m['cpu_user_s'] + m['cpu_sys_s']:.1f}s ({m['cpu_pct']:.0f}%)",
+        f"peak RSS {_mb(m['peak_rss'])}",
+        f"read {_mb(m['read_bytes'])}",
+        f"write {_mb(m['write_bytes'])}",
+    ]
+    if "speed" in m:
+        parts.append(f"{m['speed']:.2f}x realtime")
+    return "Resources: " + ", ".join(parts)
@@ -9,6 +9,7 @@ from PyQt6.QtWidgets import (
     QLineEdit, QPushButton, QSlider, QSpinBox, QVBoxLayout, QWidget,
 )
 
+from chevalvideo import loudnorm
 from chevalvideo.probe import probe, summarize, get_duration_secs
 from chevalvideo.runner import CommandRunner
 from chevalvideo.widgets.file_picker import FileDropWidget
@@ -23,7 +24,7 @@ MODES = [
     {"value": "add", "label": "Add Track", "description": "Add additional audio track"},
     {"value": "mix", "label": "Mix/Overlay", "description": "Mix original with new audio"},
     {"value": "remove", "label": "Remove Audio", "description": "Strip all audio"},
-    {"value": "normalize", "label": "Normalize", "description": "EBU R128 loudnorm"},
+    {"value": "normalize", "label": "Normalize", "description": "EBU R128 two-pass loudnorm"},
     {"value": "volume", "label": "Volume", "description": "Adjust volume level"},
 ]
 
@@ -35,6 +36,10 @@ class AudioMixPage(QWidget):
         self._audio_path = ""
         self._duration = 0.0
         self._runner = CommandRunner(self)
+        # Two-pass normalize state: "measure" while pass 1 runs
+        self._phase = ""
+        self._measure_lines: list[str] = []
+        self._pending_out = ""
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(24, 24, 24, 24)
@@ -225,10 +230,11 @@ class AudioMixPage(QWidget):
         # --- Progress ---
         self._progress = ProgressWidget()
         self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._runner.cancel(keep=True))
         layout.addWidget(self._progress)
 
         self._runner.progress.connect(self._progress.set_progress)
-        self._runner.output.connect(self._progress.append_log)
+        self._runner.output.connect(self._on_output)
         self._runner.finished.connect(self._on_done)
 
         layout.addStretch()
@@ -319,15 +325,38 @@ class AudioMixPage(QWidget):
         out_dir = str(Path(self._input_path).parent)
         out_path = os.path.join(out_dir, f"{stem}_audio{ext}")
 
+        self._progress.reset()
+
+        if mode == "normalize":
+            target_lufs = self._lufs_spin.value()
+            if loudnorm.cached(self._input_path, target_lufs) is None:
+                self._start_measure(out_path)
+                return
+
         cmd = self._build_cmd(mode, out_path)
         if cmd is None:
             return
 
-        self._progress.reset()
         self._progress.set_running(True)
         self._go_btn.setEnabled(False)
         self._runner.run(cmd, duration=self._duration)
 
+    def _start_measure(self, out_path: str):
+        """Pass 1 of normalize: audio-only loudness scan, then _on_done runs pass 2."""
+        self._phase = "measure"
+        self._measure_lines = []
+        self._pending_out = out_path
+        self._progress.append_log("Pass 1/2: measuring loudness...")
+        self._progress.set_running(True)
+        self._go_btn.setEnabled(False)
+        cmd = loudnorm.measure_cmd(self._input_path, self._lufs_spin.value())
+        self._runner.run(cmd, duration=self._duration)
+
+    def _on_output(self, line: str):
+        if self._phase == "measure":
+            self._measure_lines.append(line)
+        self._progress.append_log(line)
+
     def _build_cmd(self, mode: str, out_path: str):
         if mode == "replace":
             if not self._audio_path:
@@ -399,7 +428,11 @@ class AudioMixPage(QWidget):
 
         elif mode == "normalize":
             target_lufs = self._lufs_spin.value()
-            filter_str = f"loudnorm=I={target_lufs}:TP=-1.5:LRA=11"
+            measured = loudnorm.cached(self._input_path, target_lufs)
+            if measured is None:
+                self._progress.append_log("Error: no loudness measurement")
+                return None
+            filter_str = loudnorm.apply_filter(measured, target_lufs)
             cmd = [
                 "ffmpeg", "-y",
                 "-i", self._input_path,
@@ -427,6 +460,24 @@ class AudioMixPage(QWidget):
     # ── Completion ─────────────────────────────────────────────────
 
     def _on_done(self, ok, msg):
+        if self._phase == "measure":
+            self._phase = ""
+            measured = loudnorm.parse_measurement(self._measure_lines) if ok else None
+            self._measure_lines = []
+            if measured is not None:
+                loudnorm.store(self._input_path, measured, self._lufs_spin.value())
+                self._progress.append_log(
+                    f"Measured {measured['input_i']} LUFS, "
+                    f"TP {measured['input_tp']} dBTP, LRA {measured['input_lra']} LU"
+                )
+                cmd = self._build_cmd("normalize", self._pending_out)
+                if cmd is not None:
+                    self._progress.append_log("Pass 2/2: applying linear normalization...")
+                    self._progress.set_progress(0)
+                    self._runner.run(cmd, duration=self._duration)
+                    return
+            elif ok:
+                msg = "Loudness measurement failed (silent or no audio?)"
         self._progress.set_running(False)
         self._go_btn.setEnabled(True)
         self._progress.append_log(msg)
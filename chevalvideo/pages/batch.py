@@ -5,51 +5,25 @@ from pathlib import Path
 
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
-    QComboBox, QDoubleSpinBox, QFileDialog, QHBoxLayout, QLabel, QLineEdit,
-    QListWidget, QPushButton, QSlider, QVBoxLayout, QWidget,
+    QCheckBox, QComboBox, QDoubleSpinBox, QFileDialog, QGroupBox, QHBoxLayout, QLabel,
+    QLineEdit, QListWidget, QPushButton, QSlider, QSpinBox, QVBoxLayout, QWidget,
 )
 
-from chevalvideo.probe import probe, get_duration_secs
+from chevalvideo import dedup, detect, estimate, limits, loudnorm, scheduler, watermark
+from chevalvideo.batchops import (
+    AUDIO_FORMATS, COMPRESS_CODECS, CONVERT_CODECS, CONVERT_FORMATS, DETECT_OPERATIONS, OPERATIONS,
+    RESOLUTION_PRESETS, THUMB_FORMATS, VIDEO_EXTENSIONS, build_command, load_presets,
+    output_path, plan_file,
+)
+from chevalvideo.probe import format_timestamp, probe, get_duration_secs
 from chevalvideo.runner import CommandRunner
+from chevalvideo.watch import WatchFolder
 from chevalvideo.widgets.progress import ProgressWidget
 
-VIDEO_EXTENSIONS = (
-    ".mp4", ".mkv", ".webm", ".avi", ".mov", ".flv", ".wmv", ".m4v",
-    ".mpg", ".mpeg", ".3gp", ".ts", ".mts", ".m2ts", ".vob", ".ogv",
-)
-
-OPERATIONS = [
-    "Convert",
-    "Compress",
-    "Extract Audio",
-    "Resize",
-    "Strip Metadata",
-    "Normalize Audio",
-    "Generate Thumbnails",
-]
-
-CONVERT_FORMATS = ["mp4", "mkv", "webm"]
-CONVERT_CODECS = ["libx264", "libx265", "libsvtav1"]
-
-COMPRESS_CODECS = ["libx264", "libx265", "libsvtav1"]
-
-AUDIO_FORMATS = ["mp3", "flac", "wav", "aac"]
-AUDIO_CODEC_MAP = {
-    "mp3": "libmp3lame",
-    "flac": "flac",
-    "wav": "pcm_s16le",
-    "aac": "aac",
-}
-
-RESOLUTION_PRESETS = {
-    "4K (3840)": "3840:-2",
-    "1080p (1920)": "1920:-2",
-    "720p (1280)": "1280:-2",
-    "480p (854)": "854:-2",
-    "Custom": "",
-}
+# Loudness measurement is a cheap audio-only decode, so run several at once
+MEASURE_PARALLEL = max(2, (os.cpu_count() or 2) // 2)
 
-THUMB_FORMATS = ["png", "jpg"]
+PRESET_PREFIX = "Preset: "
 
 
 class BatchPage(QWidget):
@@ -62,6 +36,34 @@ class BatchPage(QWidget):
         self._processed_count = 0
         self._stop_requested = False
         self._runner = CommandRunner(self)
+        self._analyzer = loudnorm.LoudnormAnalyzer(MEASURE_PARALLEL, self)
+        self._analyzer.measured.connect(self._on_measured)
+        self._analyzer.failed.connect(self._on_measure_failed)
+        self._analyzer.all_done.connect(self._on_measure_done)
+        self._detector = detect.DetectAnalyzer(MEASURE_PARALLEL, self)
+        self._detector.detected.connect(self._on_detected)
+        self._detector.failed.connect(self._on_detect_failed)
+        self._detector.all_done.connect(self._on_detect_done)
+        self._measure_count = 0
+        self._estimator = estimate.BatchEstimator(MEASURE_PARALLEL, self)
+        self._estimator.estimated.connect(self._on_estimated)
+        self._estimator.failed.connect(
+            lambda path, msg: self._progress.append_log(f"{Path(path).name}: no estimate — {msg}")
+        )
+        self._estimator.all_done.connect(self._on_estimate_done)
+        self._dedup = dedup.DuplicateFinder(MEASURE_PARALLEL, self)
+        self._dedup.progress.connect(self._on_dedup_progress)
+        self._dedup.failed.connect(
+            lambda path, msg: self._progress.append_log(f"{Path(path).name}: not fingerprinted — {msg}")
+        )
+        self._dedup.finished.connect(self._on_duplicates_found)
+        self._clusters: list[dedup.Cluster] = []
+        self._links: dict[str, list[str]] = {}   # processed file -> duplicates to link
+        self._presets = load_presets()
+        self._tasks = []            # current file's preset plan
+        self._task_index = 0
+        self._task_ok: list[bool] = []
+        self._measure_lines: list[str] | None = None
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(24, 24, 24, 24)
@@ -93,9 +95,26 @@ class BatchPage(QWidget):
         self._clear_btn.clicked.connect(self._clear_files)
         file_btn_row.addWidget(self._clear_btn)
 
+        self._dedup_btn = QPushButton("Find duplicates")
+        self._dedup_btn.setToolTip("Group identical copies and re-uploads of the same video")
+        self._dedup_btn.clicked.connect(self._find_duplicates)
+        file_btn_row.addWidget(self._dedup_btn)
+
         file_btn_row.addStretch()
         layout.addLayout(file_btn_row)
 
+        dup_row = QHBoxLayout()
+        dup_row.addWidget(QLabel("Duplicates:"))
+        self._dup_combo = QComboBox()
+        self._dup_combo.addItems([
+            "Process all", "Skip duplicates", "Link duplicates to the kept copy's output",
+        ])
+        dup_row.addWidget(self._dup_combo)
+        self._dup_label = QLabel("not checked")
+        self._dup_label.setObjectName("subheading")
+        dup_row.addWidget(self._dup_label, 1)
+        layout.addLayout(dup_row)
+
         self._file_count_label = QLabel("0 files loaded")
         layout.addWidget(self._file_count_label)
 
@@ -104,10 +123,16 @@ class BatchPage(QWidget):
         op_row.addWidget(QLabel("Operation:"))
         self._op_combo = QComboBox()
         self._op_combo.addItems(OPERATIONS)
+        self._op_combo.addItems(PRESET_PREFIX + name for name in self._presets)
         self._op_combo.currentIndexChanged.connect(self._on_operation_changed)
         op_row.addWidget(self._op_combo, 1)
         layout.addLayout(op_row)
 
+        self._preset_label = QLabel("")
+        self._preset_label.setObjectName("subheading")
+        self._preset_label.setWordWrap(True)
+        layout.addWidget(self._preset_label)
+
         # ── Per-operation option panels ──────────────────────────────
         # Convert options
         self._convert_widget = QWidget()
@@ -248,6 +273,98 @@ class BatchPage(QWidget):
         tl.addLayout(r)
         layout.addWidget(self._thumb_widget)
 
+        # Auto Trim / Auto Split options (shared panel)
+        self._detect_widget = QWidget()
+        dl = QVBoxLayout(self._detect_widget)
+        dl.setContentsMargins(0, 0, 0, 0)
+        r = QHBoxLayout()
+        r.addWidget(QLabel("Min black/silence (s):"))
+        self._black_min = QDoubleSpinBox()
+        self._black_min.setRange(0.1, 30.0)
+        self._black_min.setValue(0.5)
+        self._black_min.setSingleStep(0.5)
+        r.addWidget(self._black_min)
+        r.addWidget(QLabel("Silence below (dB):"))
+        self._silence_db = QDoubleSpinBox()
+        self._silence_db.setRange(-90.0, -10.0)
+        self._silence_db.setValue(-50.0)
+        r.addWidget(self._silence_db)
+        self._detect_fast = QCheckBox("Fast (head and tail only)")
+        r.addWidget(self._detect_fast)
+        r.addStretch()
+        dl.addLayout(r)
+        self._split_row = QWidget()
+        r2 = QHBoxLayout(self._split_row)
+        r2.setContentsMargins(0, 0, 0, 0)
+        r2.addWidget(QLabel("Split at gaps of at least (s):"))
+        self._split_gap = QDoubleSpinBox()
+        self._split_gap.setRange(0.5, 600.0)
+        self._split_gap.setValue(2.0)
+        r2.addWidget(self._split_gap)
+        r2.addStretch()
+        dl.addWidget(self._split_row)
+        dl.addWidget(QLabel("Cuts are stream copies, so they land on the nearest keyframe."))
+        layout.addWidget(self._detect_widget)
+
+        # Watermark options: overlay assets are rendered once per resolution
+        self._wm_widget = QWidget()
+        wl = QVBoxLayout(self._wm_widget)
+        wl.setContentsMargins(0, 0, 0, 0)
+        r = QHBoxLayout()
+        r.addWidget(QLabel("Image:"))
+        self._wm_image = QLineEdit()
+        self._wm_image.setPlaceholderText("(none — use text)")
+        r.addWidget(self._wm_image, 1)
+        wm_browse = QPushButton("Browse...")
+        wm_browse.clicked.connect(self._pick_watermark_image)
+        r.addWidget(wm_browse)
+        r.addWidget(QLabel("Width (% of video):"))
+        self._wm_scale = QDoubleSpinBox()
+        self._wm_scale.setRange(1.0, 100.0)
+        self._wm_scale.setValue(25.0)
+        r.addWidget(self._wm_scale)
+        r.addWidget(QLabel("Opacity:"))
+        self._wm_opacity = QDoubleSpinBox()
+        self._wm_opacity.setRange(0.0, 1.0)
+        self._wm_opacity.setSingleStep(0.05)
+        self._wm_opacity.setValue(1.0)
+        r.addWidget(self._wm_opacity)
+        wl.addLayout(r)
+        r2 = QHBoxLayout()
+        r2.addWidget(QLabel("Text:"))
+        self._wm_text = QLineEdit()
+        self._wm_text.setPlaceholderText("e.g. Sample Watermark")
+        r2.addWidget(self._wm_text, 1)
+        r2.addWidget(QLabel("Size:"))
+        self._wm_font_size = QSpinBox()
+        self._wm_font_size.setRange(8, 200)
+        self._wm_font_size.setValue(48)
+        r2.addWidget(self._wm_font_size)
+        r2.addWidget(QLabel("Color:"))
+        self._wm_color = QLineEdit("#ffffff")
+        self._wm_color.setFixedWidth(90)
+        r2.addWidget(self._wm_color)
+        r2.addWidget(QLabel("Box:"))
+        self._wm_box = QLineEdit()
+        self._wm_box.setPlaceholderText("#000000@0.5")
+        self._wm_box.setFixedWidth(110)
+        r2.addWidget(self._wm_box)
+        wl.addLayout(r2)
+        r3 = QHBoxLayout()
+        r3.addWidget(QLabel("Position:"))
+        self._wm_position = QComboBox()
+        self._wm_position.addItems(watermark.POSITIONS)
+        self._wm_position.setCurrentText("bottom-right")
+        r3.addWidget(self._wm_position)
+        r3.addWidget(QLabel("Padding (px):"))
+        self._wm_padding = QSpinBox()
+        self._wm_padding.setRange(0, 500)
+        self._wm_padding.setValue(20)
+        r3.addWidget(self._wm_padding)
+        r3.addStretch()
+        wl.addLayout(r3)
+        layout.addWidget(self._wm_widget)
+
         self._option_panels = [
             self._convert_widget,
             self._compress_widget,
@@ -256,6 +373,9 @@ class BatchPage(QWidget):
             self._strip_widget,
             self._normalize_widget,
             self._thumb_widget,
+            self._detect_widget,
+            self._detect_widget,
+            self._wm_widget,
         ]
 
         # ── Output settings ──────────────────────────────────────────
@@ -285,6 +405,9 @@ class BatchPage(QWidget):
         suffix_row.addStretch()
         layout.addLayout(suffix_row)
 
+        self._background_check = QCheckBox("Run in background (lowest CPU and disk priority)")
+        layout.addWidget(self._background_check)
+
         # ── Go / Stop ────────────────────────────────────────────────
         action_row = QHBoxLayout()
         self._go_btn = QPushButton("Go")
@@ -292,6 +415,15 @@ class BatchPage(QWidget):
         self._go_btn.setEnabled(False)
         action_row.addWidget(self._go_btn)
 
+        self._estimate_btn = QPushButton("Estimate")
+        self._estimate_btn.setToolTip(
+            "Encode a few seconds from several points of each file to predict "
+            "output size, run time and disk space"
+        )
+        self._estimate_btn.clicked.connect(self._start_estimate)
+        self._estimate_btn.setEnabled(False)
+        action_row.addWidget(self._estimate_btn)
+
         self._stop_btn = QPushButton("Stop after current")
         self._stop_btn.clicked.connect(self._request_stop)
         self._stop_btn.setEnabled(False)
@@ -299,16 +431,50 @@ class BatchPage(QWidget):
         action_row.addStretch()
         layout.addLayout(action_row)
 
+        # ── Watch folders ────────────────────────────────────────────
+        watch_box = QGroupBox("Watch folders")
+        wl = QVBoxLayout(watch_box)
+        r = QHBoxLayout()
+        self._watch_add_btn = QPushButton("Add watch folder...")
+        self._watch_add_btn.clicked.connect(self._add_watch_dir)
+        r.addWidget(self._watch_add_btn)
+        r.addWidget(QLabel("Parallel:"))
+        self._watch_parallel = QSpinBox()
+        self._watch_parallel.setRange(1, 16)
+        self._watch_parallel.setValue(2)
+        r.addWidget(self._watch_parallel)
+        r.addWidget(QLabel("Then:"))
+        self._watch_after = QComboBox()
+        self._watch_after.addItem("Move to processed/", "move")
+        self._watch_after.addItem("Mark in ledger", "mark")
+        r.addWidget(self._watch_after)
+        self._watch_btn = QPushButton("Start watching")
+        self._watch_btn.clicked.connect(self._toggle_watch)
+        self._watch_btn.setEnabled(False)
+        r.addWidget(self._watch_btn)
+        r.addStretch()
+        wl.addLayout(r)
+        self._watch_label = QLabel("New files are picked up once their size stops changing.")
+        self._watch_label.setObjectName("subheading")
+        self._watch_label.setWordWrap(True)
+        wl.addWidget(self._watch_label)
+        layout.addWidget(watch_box)
+        self._watch_dirs: list[str] = []
+        self._watch: WatchFolder | None = None
+        self._watch_counts = [0, 0]
+
         # ── Progress ─────────────────────────────────────────────────
         self._overall_label = QLabel("")
         layout.addWidget(self._overall_label)
 
         self._progress = ProgressWidget()
-        self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.cancel_button.clicked.connect(self._cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._cancel(keep=True))
         layout.addWidget(self._progress)
 
         self._runner.progress.connect(self._progress.set_progress)
         self._runner.output.connect(self._progress.append_log)
+        self._runner.output.connect(self._collect_measurement)
         self._runner.finished.connect(self._on_file_done)
 
         layout.addStretch()
@@ -359,12 +525,31 @@ class BatchPage(QWidget):
         n = self._file_list.count()
         self._file_count_label.setText(f"{n} files loaded")
         self._go_btn.setEnabled(n > 0 and not self._runner.is_running())
+        self._estimate_btn.setEnabled(n > 0 and not self._estimator.is_running())
 
     # ── Operation switching ──────────────────────────────────────────
 
     def _on_operation_changed(self, index: int):
-        for i, panel in enumerate(self._option_panels):
-            panel.setVisible(i == index)
+        steps = self._preset_steps()
+        ops = {step["op"] for step in steps} if steps else {self._op_combo.currentText()}
+        shown = {id(panel) for op, panel in zip(OPERATIONS, self._option_panels) if op in ops}
+        for panel in self._option_panels:
+            panel.setVisible(id(panel) in shown)
+        self._split_row.setVisible("Auto Split" in ops)
+        self._preset_label.setVisible(steps is not None)
+        if steps:
+            self._preset_label.setText(
+                "Steps: " + " → ".join(
+                    step["op"] + (f" ({step['suffix']})" if step.get("suffix") else "")
+                    for step in steps
+                ) + ". Steps reading the same file share one ffmpeg run."
+            )
+
+    def _preset_steps(self) -> list[dict] | None:
+        text = self._op_combo.currentText()
+        if not text.startswith(PRESET_PREFIX):
+            return None
+        return self._presets.get(text[len(PRESET_PREFIX):])
 
     # ── Output settings ──────────────────────────────────────────────
 
@@ -379,6 +564,14 @@ class BatchPage(QWidget):
             self._custom_output_dir = folder
             self._output_dir_label.setText(folder)
 
+    def _pick_watermark_image(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Select watermark image", "",
+            "Image files (*.png *.jpg *.jpeg *.svg *.bmp);;All files (*)",
+        )
+        if path:
+            self._wm_image.setText(path)
+
     def _get_output_dir(self, input_path: str) -> str:
         if self._output_combo.currentIndex() == 1 and self._custom_output_dir:
             return self._custom_output_dir
@@ -396,6 +589,7 @@ class BatchPage(QWidget):
         self._pending = [
             self._file_list.item(i).text() for i in range(n)
         ]
+        self._skip_duplicates()
         self._total_files = len(self._pending)
         self._processed_count = 0
         self._stop_requested = False
@@ -405,8 +599,217 @@ class BatchPage(QWidget):
         self._stop_btn.setEnabled(True)
         self._set_controls_enabled(False)
 
+        # Background runs yield to interactive work; otherwise use the global defaults
+        background = None
+        if self._background_check.isChecked():
+            background = limits.defaults().replace(nice=19, ionice="idle")
+        self._runner.limits = background
+        self._runner.priority = (
+            scheduler.PRIORITY_BACKGROUND if background else scheduler.PRIORITY_NORMAL
+        )
+        self._analyzer.limits = background
+        self._detector.limits = background
+
+        # Presets measure loudness per file as a step of their own plan
+        if self._op_combo.currentText() == "Normalize Audio":
+            self._start_measure()
+            return
+        if self._op_combo.currentText() in DETECT_OPERATIONS:
+            self._start_detect()
+            return
+        self._process_next()
+
+    def _cancel(self, *, keep: bool = False):
+        if self._estimator.is_running():
+            self._estimator.cancel()
+        if self._analyzer.is_running():
+            self._stop_requested = True
+            self._analyzer.cancel()
+        if self._detector.is_running():
+            self._stop_requested = True
+            self._detector.cancel()
+        # Cancelling a preset abandons the rest of the current file's plan
+        del self._tasks[self._task_index + 1:]
+        self._runner.cancel(keep=keep)
+
+    def _start_measure(self):
+        """Pass 1 for every file concurrently; the per-file loop then applies pass 2."""
+        self._measure_count = 0
+        self._overall_label.setText(f"Measuring loudness of {self._total_files} files...")
+        self._progress.append_log(
+            f"=== Pass 1: loudness measurement ({MEASURE_PARALLEL} parallel) ==="
+        )
+        self._progress.set_running(True)
+        self._analyzer.start(self._pending, self._lufs_spin.value())
+
+    def _on_measured(self, path: str, data: dict):
+        self._measure_count += 1
+        self._progress.set_progress(self._measure_count / self._total_files * 100)
+        self._progress.append_log(f"{Path(path).name}: {data['input_i']} LUFS")
+
+    def _on_measure_failed(self, path: str, msg: str):
+        self._measure_count += 1
+        self._progress.set_progress(self._measure_count / self._total_files * 100)
+        self._progress.append_log(f"{Path(path).name}: measurement failed — {msg}")
+
+    def _on_measure_done(self):
+        self._progress.set_running(False)
+        self._progress.append_log("=== Pass 2: applying normalization ===")
+        self._process_next()
+
+    def _start_detect(self):
+        """Black/silence detection for every file concurrently, then the cuts."""
+        self._measure_count = 0
+        opts = self.operation_options()
+        self._overall_label.setText(f"Detecting black and silence in {self._total_files} files...")
+        self._progress.append_log(
+            f"=== Pass 1: black/silence detection ({MEASURE_PARALLEL} parallel"
+            f"{', head and tail only' if opts['detect_fast'] else ''}) ==="
+        )
+        self._progress.set_running(True)
+        self._detector.start(self._pending, opts["black_min"], opts["silence_db"], bool(opts["detect_fast"]))
+
+    def _on_detected(self, path: str, det):
+        self._measure_count += 1
+        self._progress.set_progress(self._measure_count / self._total_files * 100)
+        rng = det.content_range()
+        keep = (f"keep {format_timestamp(rng[0])}–{format_timestamp(rng[1])}"
+                if rng else "nothing but black/silence")
+        self._progress.append_log(f"{Path(path).name}: {len(det.dead())} dead ranges, {keep}")
+
+    def _on_detect_failed(self, path: str, msg: str):
+        self._measure_count += 1
+        self._progress.set_progress(self._measure_count / self._total_files * 100)
+        self._progress.append_log(f"{Path(path).name}: detection failed — {msg}")
+
+    def _on_detect_done(self):
+        self._progress.set_running(False)
+        self._progress.append_log("=== Pass 2: cutting ===")
         self._process_next()
 
+    # ── Duplicates ───────────────────────────────────────────────────
+
+    def _find_duplicates(self):
+        if self._dedup.is_running():
+            return
+        paths = [self._file_list.item(i).text() for i in range(self._file_list.count())]
+        if len(paths) < 2:
+            return
+        self._dedup_btn.setEnabled(False)
+        self._dup_label.setText(f"Fingerprinting {len(paths)} files...")
+        self._dedup.start(paths)
+
+    def _on_dedup_progress(self, done: int, total: int):
+        self._dup_label.setText(f"Fingerprinting: {done} of {total}")
+
+    def _on_duplicates_found(self, clusters: list):
+        self._clusters = clusters
+        self._dedup_btn.setEnabled(self._add_files_btn.isEnabled())
+        n = sum(len(c.duplicates) for c in clusters)
+        self._dup_label.setText(f"{n} duplicates in {len(clusters)} groups" if clusters else "none found")
+        for c in clusters:
+            self._progress.append_log(
+                f"{'Identical' if c.kind == 'exact' else 'Near-identical'}: keep {Path(c.keeper).name}"
+                f" — duplicates: {', '.join(Path(p).name for p in c.duplicates)}"
+            )
+
+    def _skip_duplicates(self):
+        """Drop duplicates from the pending list per the Duplicates setting."""
+        self._links = {}
+        mode = self._dup_combo.currentIndex()
+        if mode == 0 or not self._clusters:
+            return
+        pending = set(self._pending)
+        skipped: set[str] = set()
+        for c in self._clusters:
+            present = [p for p in c.paths if p in pending]
+            if len(present) < 2:
+                continue
+            skipped.update(present[1:])
+            if mode == 2:
+                self._links[present[0]] = present[1:]
+        if mode == 2 and self._preset_steps() is not None:
+            self._links = {}
+            self._progress.append_log("Presets write several outputs; duplicates are skipped, not linked")
+        self._pending = [p for p in self._pending if p not in skipped]
+        self._progress.append_log(f"Skipping {len(skipped)} duplicate files")
+
+    def _link_duplicates(self, path: str):
+        """Give each duplicate of `path` its output as a hard link (or symlink) to path's output."""
+        op, options, suffix = self._op_combo.currentText(), self.operation_options(), self._suffix_input.text()
+        src = output_path(op, path, options, self._get_output_dir(path), suffix)
+        for dup in self._links.pop(path, []):
+            dst = output_path(op, dup, options, self._get_output_dir(dup), suffix)
+            if dst == src:
+                continue
+            try:
+                if os.path.lexists(dst):
+                    os.remove(dst)
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    os.symlink(os.path.abspath(src), dst)
+            except OSError as e:
+                self._progress.append_log(f"Could not link {Path(dst).name}: {e}")
+                continue
+            self._progress.append_log(f"Linked {Path(dst).name} → {Path(src).name}")
+
+    # ── Estimate ─────────────────────────────────────────────────────
+
+    def _start_estimate(self):
+        if self._estimator.is_running() or self._runner.is_running():
+            return
+        if self._preset_steps() is not None:
+            self._progress.append_log("Estimate: pick a single operation; presets aren't sampled")
+            return
+        paths = [self._file_list.item(i).text() for i in range(self._file_list.count())]
+        if not paths:
+            return
+        self._estimate_btn.setEnabled(False)
+        self._go_btn.setEnabled(False)
+        self._progress.set_running(True)
+        self._overall_label.setText(f"Sampling {len(paths)} files...")
+        self._progress.append_log(
+            f"=== Estimate: {self._op_combo.currentText()}, "
+            f"{estimate.SAMPLE_POINTS} × {estimate.SAMPLE_SECS:.0f}s samples per file ==="
+        )
+        self._estimator.limits = (
+            limits.defaults().replace(nice=19, ionice="idle")
+            if self._background_check.isChecked() else None
+        )
+        self._estimator.start(
+            paths, self._op_combo.currentText(), self.operation_options(),
+            {p: self._get_output_dir(p) for p in paths},
+        )
+
+    def _on_estimated(self, path: str, est):
+        self._progress.append_log(
+            f"{Path(path).name}: ~{est.size / 1_048_576:.1f} MB, "
+            f"~{format_timestamp(est.secs)[:8]} to process"
+        )
+
+    def _on_estimate_done(self):
+        self._progress.set_running(False)
+        self._update_count()
+        results = self._estimator.results()
+        if not results:
+            self._overall_label.setText("Estimate: no file could be sampled")
+            return
+        total = sum(e.size for e in results)
+        times = [e.secs for e in results]
+        parallel = self._watch_parallel.value()
+        self._overall_label.setText(
+            f"Estimate for {len(results)} files: ~{total / 1_073_741_824:.2f} GB, "
+            f"~{format_timestamp(estimate.wall_time(times, 1))[:8]} one at a time "
+            f"(~{format_timestamp(estimate.wall_time(times, parallel))[:8]} at {parallel} parallel)"
+        )
+        for folder, needed, free in estimate.disk_shortfalls(results):
+            self._progress.append_log(
+                f"WARNING: {folder} needs ~{needed / 1_073_741_824:.2f} GB "
+                f"but only {free / 1_073_741_824:.2f} GB is free"
+            )
+        self._progress.append_log("=== Estimate complete ===")
+
     def _request_stop(self):
         self._stop_requested = True
         self._stop_btn.setEnabled(False)
@@ -432,7 +835,32 @@ class BatchPage(QWidget):
         except Exception:
             pass
 
-        cmd = self._build_command(self._current_file)
+        self._progress.append_log(
+            f"--- [{self._processed_count}/{self._total_files}] "
+            f"{Path(self._current_file).name} ---"
+        )
+        steps = self._preset_steps()
+        if steps is not None:
+            try:
+                self._tasks = plan_file(
+                    self._current_file, steps, self.operation_options(),
+                    self._get_output_dir(self._current_file), self._suffix_input.text(),
+                )
+            except ValueError as e:
+                self._progress.append_log(f"Skipped: {e}")
+                self._process_next()
+                return
+            self._task_index = -1
+            self._task_ok = []
+            self._run_next_task()
+            return
+
+        try:
+            cmd = self._build_command(self._current_file)
+        except (OSError, RuntimeError, ValueError) as e:
+            self._progress.append_log(f"Skipped: {e}")
+            self._process_next()
+            return
         if cmd is None:
             self._progress.append_log(f"Skipped (no command): {self._current_file}")
             self._process_next()
@@ -440,16 +868,61 @@ class BatchPage(QWidget):
 
         self._progress.set_progress(0)
         self._progress.set_running(True)
-        self._progress.append_log(
-            f"--- [{self._processed_count}/{self._total_files}] "
-            f"{Path(self._current_file).name} ---"
-        )
         self._runner.run(cmd, duration=self._current_duration)
 
+    def _run_next_task(self):
+        """Start the next task of the current file's plan whose dependencies succeeded."""
+        while True:
+            self._task_index += 1
+            if self._task_index >= len(self._tasks):
+                self._tasks = []
+                self._process_next()
+                return
+            task = self._tasks[self._task_index]
+            if not all(self._task_ok[d] for d in task.deps):
+                self._task_ok.append(False)
+                self._progress.append_log(f"Skipped {task.name}: an earlier step failed")
+                continue
+            try:
+                cmd = task.build()
+            except (OSError, RuntimeError, ValueError) as e:
+                self._task_ok.append(False)
+                self._progress.append_log(f"Skipped {task.name}: {e}")
+                continue
+            if cmd is None:
+                self._task_ok.append(False)
+                self._progress.append_log(f"Skipped {task.name}: no command")
+                continue
+            break
+        self._measure_lines = [] if task.measure else None
+        self._progress.set_progress(0)
+        self._progress.set_running(True)
+        self._progress.append_log(f"[{self._task_index + 1}/{len(self._tasks)}] {task.name}")
+        self._runner.run(cmd, duration=self._current_duration)
+
+    def _collect_measurement(self, line: str):
+        if self._measure_lines is not None:
+            self._measure_lines.append(line)
+
     def _on_file_done(self, ok: bool, msg: str):
         self._progress.set_running(False)
         self._progress.append_log(msg)
-        self._process_next()
+        if not self._tasks:
+            if ok and self._current_file in self._links:
+                self._link_duplicates(self._current_file)
+            self._process_next()
+            return
+        task = self._tasks[self._task_index]
+        if task.measure and ok:
+            data = loudnorm.parse_measurement(self._measure_lines or [])
+            if data is None:
+                ok = False
+                self._progress.append_log("Could not parse the loudness measurement")
+            else:
+                loudnorm.store(task.measure, data, task.lufs)
+        self._measure_lines = None
+        self._task_ok.append(ok)
+        self._run_next_task()
 
     def _finish_batch(self):
         self._go_btn.setEnabled(self._file_list.count() > 0)
@@ -457,7 +930,7 @@ class BatchPage(QWidget):
         self._set_controls_enabled(True)
         if self._stop_requested:
             self._overall_label.setText(
-                f"Stopped. Processed {self._processed_count - 1} of {self._total_files} files."
+                f"Stopped. Processed {max(self._processed_count - 1, 0)} of {self._total_files} files."
             )
         else:
             self._overall_label.setText(
@@ -470,107 +943,105 @@ class BatchPage(QWidget):
         self._add_folder_btn.setEnabled(enabled)
         self._remove_btn.setEnabled(enabled)
         self._clear_btn.setEnabled(enabled)
-        self._op_combo.setEnabled(enabled)
+        self._dedup_btn.setEnabled(enabled)
+        self._dup_combo.setEnabled(enabled)
+        self._op_combo.setEnabled(enabled and self._watch is None)
         self._output_combo.setEnabled(enabled)
         self._suffix_input.setEnabled(enabled)
+        self._background_check.setEnabled(enabled)
+        self._estimate_btn.setEnabled(enabled and self._file_list.count() > 0)
 
-    # ── Command building ─────────────────────────────────────────────
-
-    def _build_command(self, input_path: str) -> list[str] | None:
-        op = self._op_combo.currentText()
-        stem = Path(input_path).stem
-        ext = Path(input_path).suffix
-        suffix = self._suffix_input.text()
-        out_dir = self._get_output_dir(input_path)
-
-        if op == "Convert":
-            return self._cmd_convert(input_path, stem, out_dir, suffix)
-        elif op == "Compress":
-            return self._cmd_compress(input_path, stem, ext, out_dir, suffix)
-        elif op == "Extract Audio":
-            return self._cmd_extract_audio(input_path, stem, out_dir, suffix)
-        elif op == "Resize":
-            return self._cmd_resize(input_path, stem, ext, out_dir, suffix)
-        elif op == "Strip Metadata":
-            return self._cmd_strip_meta(input_path, stem, ext, out_dir, suffix)
-        elif op == "Normalize Audio":
-            return self._cmd_normalize(input_path, stem, ext, out_dir, suffix)
-        elif op == "Generate Thumbnails":
-            return self._cmd_thumbnail(input_path, stem, out_dir, suffix)
-        return None
-
-    def _cmd_convert(self, inp, stem, out_dir, suffix):
-        fmt = self._convert_fmt.currentText()
-        codec = self._convert_codec.currentText()
-        crf = self._convert_crf.value()
-        out = os.path.join(out_dir, f"{stem}{suffix}.{fmt}")
-        cmd = ["ffmpeg", "-y", "-i", inp, "-c:v", codec, "-crf", str(crf)]
-        cmd += ["-c:a", "aac", "-progress", "pipe:1", out]
-        return cmd
-
-    def _cmd_compress(self, inp, stem, ext, out_dir, suffix):
-        codec = self._compress_codec.currentText()
-        crf = self._compress_crf.value()
-        out = os.path.join(out_dir, f"{stem}{suffix}{ext}")
-        return [
-            "ffmpeg", "-y", "-i", inp,
-            "-c:v", codec, "-crf", str(crf), "-preset", "medium",
-            "-c:a", "aac", "-b:a", "128k",
-            "-progress", "pipe:1", out,
-        ]
+    # ── Watch folders ────────────────────────────────────────────────
 
-    def _cmd_extract_audio(self, inp, stem, out_dir, suffix):
-        fmt = self._audio_fmt.currentText()
-        codec = AUDIO_CODEC_MAP.get(fmt, fmt)
-        bitrate = self._audio_bitrate.value()
-        out = os.path.join(out_dir, f"{stem}{suffix}.{fmt}")
-        cmd = ["ffmpeg", "-y", "-i", inp, "-vn", "-c:a", codec]
-        if fmt not in ("flac", "wav"):
-            cmd += ["-b:a", f"{bitrate}k"]
-        cmd += ["-progress", "pipe:1", out]
-        return cmd
-
-    def _cmd_resize(self, inp, stem, ext, out_dir, suffix):
-        custom = self._resize_custom.text().strip()
-        if custom:
-            scale = custom
-        else:
-            preset_key = self._resize_combo.currentText()
-            scale = RESOLUTION_PRESETS.get(preset_key, "1920:-2")
-            if not scale:
-                scale = "1920:-2"
-        out = os.path.join(out_dir, f"{stem}{suffix}{ext}")
-        return [
-            "ffmpeg", "-y", "-i", inp,
-            "-vf", f"scale={scale}",
-            "-c:a", "copy",
-            "-progress", "pipe:1", out,
-        ]
+    def _add_watch_dir(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select folder to watch")
+        if not folder or folder in self._watch_dirs:
+            return
+        self._watch_dirs.append(folder)
+        if self._watch is not None:
+            try:
+                self._watch.add_dir(folder)
+            except ValueError as e:
+                self._watch_dirs.remove(folder)
+                self._progress.append_log(f"Watch: {e}")
+                return
+        self._watch_label.setText("Watching: " + ", ".join(self._watch_dirs))
+        self._watch_btn.setEnabled(True)
+
+    def _toggle_watch(self):
+        if self._watch is not None:
+            self._watch.stop()
+            self._watch.deleteLater()
+            self._watch = None
+            self._watch_btn.setText("Start watching")
+            self._op_combo.setEnabled(True)
+            return
+        if self._preset_steps() is not None:
+            self._progress.append_log("Watch: folders run a single operation; pick one instead of a preset")
+            return
+        out_dir = self._custom_output_dir if self._output_combo.currentIndex() == 1 else ""
+        try:
+            watch = WatchFolder(
+                self._op_combo.currentText(), self.operation_options(),
+                parallel=self._watch_parallel.value(),
+                after=self._watch_after.currentData(),
+                output_dir=out_dir, suffix=self._suffix_input.text(), parent=self,
+            )
+            for d in self._watch_dirs:
+                watch.add_dir(d)
+        except ValueError as e:
+            self._progress.append_log(f"Watch: {e}")
+            return
+        watch.output.connect(self._progress.append_log)
+        watch.file_done.connect(self._on_watch_file_done)
+        self._watch = watch
+        self._watch_counts = [0, 0]
+        self._watch_btn.setText("Stop watching")
+        # Options are captured at start; the operation can't change underneath
+        self._op_combo.setEnabled(False)
+        watch.start()
+
+    def _on_watch_file_done(self, path: str, ok: bool, msg: str):
+        self._watch_counts[0 if ok else 1] += 1
+        done, failed = self._watch_counts
+        self._overall_label.setText(f"Watch: {done} processed, {failed} failed — last: {Path(path).name}")
 
-    def _cmd_strip_meta(self, inp, stem, ext, out_dir, suffix):
-        out = os.path.join(out_dir, f"{stem}{suffix}{ext}")
-        return [
-            "ffmpeg", "-y", "-i", inp,
-            "-map_metadata", "-1", "-c", "copy",
-            "-progress", "pipe:1", out,
-        ]
+    # ── Command building ─────────────────────────────────────────────
 
-    def _cmd_normalize(self, inp, stem, ext, out_dir, suffix):
-        lufs = self._lufs_spin.value()
-        out = os.path.join(out_dir, f"{stem}{suffix}{ext}")
-        return [
-            "ffmpeg", "-y", "-i", inp,
-            "-af", f"loudnorm=I={lufs}:TP=-1.5:LRA=11",
-            "-c:v", "copy",
-            "-progress", "pipe:1", out,
-        ]
+    def operation_options(self) -> dict:
+        """Current option widgets as a batchops options dict."""
+        scale = self._resize_custom.text().strip()
+        if not scale:
+            scale = RESOLUTION_PRESETS.get(self._resize_combo.currentText()) or "1920:-2"
+        return {
+            "convert_format": self._convert_fmt.currentText(),
+            "convert_codec": self._convert_codec.currentText(),
+            "convert_crf": self._convert_crf.value(),
+            "compress_codec": self._compress_codec.currentText(),
+            "compress_crf": self._compress_crf.value(),
+            "audio_format": self._audio_fmt.currentText(),
+            "audio_bitrate": self._audio_bitrate.value(),
+            "scale": scale,
+            "lufs": self._lufs_spin.value(),
+            "thumb_ts": self._thumb_ts.text().strip() or "00:00:00",
+            "thumb_format": self._thumb_fmt.currentText(),
+            "black_min": self._black_min.value(),
+            "silence_db": self._silence_db.value(),
+            "split_gap": self._split_gap.value(),
+            "detect_fast": int(self._detect_fast.isChecked()),
+            "wm_image": self._wm_image.text().strip(),
+            "wm_text": self._wm_text.text(),
+            "wm_scale": self._wm_scale.value(),
+            "wm_opacity": self._wm_opacity.value(),
+            "wm_position": self._wm_position.currentText(),
+            "wm_padding": self._wm_padding.value(),
+            "wm_font_size": self._wm_font_size.value(),
+            "wm_color": self._wm_color.text().strip() or "#ffffff",
+            "wm_box": self._wm_box.text().strip(),
+        }
 
-    def _cmd_thumbnail(self, inp, stem, out_dir, suffix):
-        ts = self._thumb_ts.text().strip() or "00:00:00"
-        fmt = self._thumb_fmt.currentText()
-        out = os.path.join(out_dir, f"{stem}{suffix}.{fmt}")
-        return [
-            "ffmpeg", "-y", "-ss", ts, "-i", inp,
-            "-frames:v", "1",
-            out,
-        ]
+    def _build_command(self, input_path: str) -> list[str] | None:
+        return build_command(
+            self._op_combo.currentText(), input_path, self.operation_options(),
+            self._get_output_dir(input_path), self._suffix_input.text(),
+        )
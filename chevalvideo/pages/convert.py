@@ -128,6 +128,7 @@ class ConvertPage(QWidget):
         # Progress
         self._progress = ProgressWidget()
         self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._runner.cancel(keep=True))
         layout.addWidget(self._progress)
 
         self._runner.progress.connect(self._progress.set_progress)
@@ -1,18 +1,21 @@
 """yt-dlp download page — full power tool."""
 
-import json
 import subprocess
 from pathlib import Path
 
 from PyQt6.QtCore import QProcess, Qt
 from PyQt6.QtWidgets import (
     QCheckBox, QComboBox, QFileDialog, QGridLayout, QGroupBox, QHBoxLayout,
-    QHeaderView, QLabel, QLineEdit, QPushButton, QSpinBox, QTableWidget,
-    QTableWidgetItem, QVBoxLayout, QWidget,
+    QHeaderView, QLabel, QLineEdit, QPushButton, QSpinBox, QTableView,
+    QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget,
 )
 
 from chevalvideo.runner import CommandRunner
+from chevalvideo.widgets.format_table import FormatTableModel
 from chevalvideo.widgets.progress import ProgressWidget
+from chevalvideo.ytdlp import (
+    DownloadQueue, InfoCache, JsonLineParser, archive_path, entry_url,
+)
 
 
 class DownloadPage(QWidget):
@@ -24,7 +27,18 @@ class DownloadPage(QWidget):
         self._out_dir = str(Path.home() / "Downloads")
         self._runner = CommandRunner(self)
         self._fetch_proc = None
-        self._fetch_buf = b""
+        self._parser = JsonLineParser()
+        self._fetch_errors: list[str] = []
+        self._entries: list[dict] = []
+        self._entry_proc = None
+        self._entry_row = -1
+        self._entry_info: dict | None = None   # the entry being fetched, to spot a replaced list
+        self._entry_parser = JsonLineParser()
+        self._entry_objs: list[dict] = []
+        self._entry_errors: list[str] = []
+        self._queue = DownloadQueue(self)
+        self._info_cache = InfoCache()
+        self._queue.info_cache = self._info_cache
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(24, 24, 24, 24)
@@ -100,11 +114,15 @@ class DownloadPage(QWidget):
         # Row 4: checkboxes
         checks_row1 = QHBoxLayout()
         self._playlist_check = QCheckBox("Full playlist")
+        self._flat_check = QCheckBox("Quick list (flat)")
+        self._flat_check.setToolTip("List playlist entries with --flat-playlist; formats are fetched per entry on demand")
+        self._flat_check.setChecked(True)
         self._subs_check = QCheckBox("Subtitles")
         self._thumb_check = QCheckBox("Embed thumbnail")
         self._metadata_check = QCheckBox("Embed metadata")
         self._metadata_check.setChecked(True)
         checks_row1.addWidget(self._playlist_check)
+        checks_row1.addWidget(self._flat_check)
         checks_row1.addWidget(self._subs_check)
         checks_row1.addWidget(self._thumb_check)
         checks_row1.addWidget(self._metadata_check)
@@ -122,6 +140,10 @@ class DownloadPage(QWidget):
         checks_row2.addWidget(self._sponsorblock_check)
         checks_row2.addWidget(self._cookies_check)
         checks_row2.addWidget(self._aria2_check)
+        self._cache_check = QCheckBox("Cache metadata")
+        self._cache_check.setToolTip("Reuse fetched info JSON for an hour; downloads skip re-extraction")
+        self._cache_check.setChecked(True)
+        checks_row2.addWidget(self._cache_check)
         checks_row2.addStretch()
         opts_grid.addLayout(checks_row2, 5, 0, 1, 4)
 
@@ -157,15 +179,95 @@ class DownloadPage(QWidget):
 
         layout.addWidget(opts)
 
+        # ── Playlist entries (filled as -j output streams in) ──
+        self._entries_table = QTableWidget()
+        self._entries_table.setColumnCount(4)
+        self._entries_table.setHorizontalHeaderLabels(["#", "Title", "Duration", "Uploader"])
+        self._entries_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self._entries_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self._entries_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self._entries_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self._entries_table.itemSelectionChanged.connect(self._on_entry_selected)
+        self._entries_table.setMaximumHeight(180)
+        self._entries_table.setVisible(False)
+        layout.addWidget(self._entries_table)
+
         # ── Format table ──
-        self._table = QTableWidget()
-        self._table.setColumnCount(7)
-        self._table.setHorizontalHeaderLabels(["ID", "Ext", "Resolution", "FPS", "Codec", "Size", "Note"])
+        self._format_panel = QWidget()
+        fp_layout = QVBoxLayout(self._format_panel)
+        fp_layout.setContentsMargins(0, 0, 0, 0)
+        filter_row = QHBoxLayout()
+        filter_row.addWidget(QLabel("Codec:"))
+        self._codec_filter = QLineEdit()
+        self._codec_filter.setPlaceholderText("e.g. avc1, vp9, opus")
+        self._codec_filter.textChanged.connect(self._apply_format_filter)
+        filter_row.addWidget(self._codec_filter)
+        filter_row.addWidget(QLabel("Ext:"))
+        self._ext_filter = QComboBox()
+        self._ext_filter.addItem("All")
+        self._ext_filter.currentIndexChanged.connect(self._apply_format_filter)
+        filter_row.addWidget(self._ext_filter)
+        filter_row.addStretch()
+        fp_layout.addLayout(filter_row)
+
+        self._format_model = FormatTableModel(self)
+        self._table = QTableView()
+        self._table.setModel(self._format_model)
+        self._table.setSortingEnabled(True)
         self._table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self._table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self._table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
-        self._table.setVisible(False)
-        layout.addWidget(self._table)
+        self._table.verticalHeader().setVisible(False)
+        self._table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self._table.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        fp_layout.addWidget(self._table)
+        self._format_panel.setVisible(False)
+        layout.addWidget(self._format_panel)
+
+        # ── Download queue ──
+        queue_box = QGroupBox("Queue")
+        ql = QVBoxLayout(queue_box)
+        q_opts = QHBoxLayout()
+        q_opts.addWidget(QLabel("Parallel:"))
+        self._parallel_spin = QSpinBox()
+        self._parallel_spin.setRange(1, 16)
+        self._parallel_spin.setValue(3)
+        self._parallel_spin.valueChanged.connect(self._queue.set_parallel)
+        q_opts.addWidget(self._parallel_spin)
+        q_opts.addWidget(QLabel("Retries:"))
+        self._retries_spin = QSpinBox()
+        self._retries_spin.setRange(0, 10)
+        self._retries_spin.setValue(3)
+        q_opts.addWidget(self._retries_spin)
+        self._archive_check = QCheckBox("Skip already downloaded (archive)")
+        self._archive_check.setChecked(True)
+        q_opts.addWidget(self._archive_check)
+        q_opts.addStretch()
+        ql.addLayout(q_opts)
+
+        self._queue_table = QTableWidget()
+        self._queue_table.setColumnCount(3)
+        self._queue_table.setHorizontalHeaderLabels(["URL", "Status", "Progress"])
+        self._queue_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self._queue_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self._queue_table.setMaximumHeight(160)
+        ql.addWidget(self._queue_table)
+
+        q_btns = QHBoxLayout()
+        self._enqueue_btn = QPushButton("Add URL(s)")
+        self._enqueue_btn.clicked.connect(self._enqueue_input)
+        q_btns.addWidget(self._enqueue_btn)
+        self._enqueue_entries_btn = QPushButton("Queue playlist entries")
+        self._enqueue_entries_btn.clicked.connect(self._enqueue_entries)
+        self._enqueue_entries_btn.setEnabled(False)
+        q_btns.addWidget(self._enqueue_entries_btn)
+        self._queue_start_btn = QPushButton("Start queue")
+        self._queue_start_btn.clicked.connect(self._start_queue)
+        q_btns.addWidget(self._queue_start_btn)
+        self._queue_clear_btn = QPushButton("Clear")
+        self._queue_clear_btn.clicked.connect(self._clear_queue)
+        q_btns.addWidget(self._queue_clear_btn)
+        q_btns.addStretch()
+        ql.addLayout(q_btns)
+        layout.addWidget(queue_box)
 
         # ── Go ──
         btn_row = QHBoxLayout()
@@ -186,12 +288,21 @@ class DownloadPage(QWidget):
         # ── Progress ──
         self._progress = ProgressWidget()
         self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.cancel_button.clicked.connect(self._queue.cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._runner.cancel(keep=True))
+        self._progress.keep_button.clicked.connect(lambda: self._queue.cancel(keep=True))
         layout.addWidget(self._progress)
 
         self._runner.progress.connect(self._progress.set_progress)
         self._runner.output.connect(self._progress.append_log)
         self._runner.finished.connect(self._on_done)
 
+        self._queue.item_status.connect(self._on_queue_status)
+        self._queue.item_progress.connect(self._on_queue_progress)
+        self._queue.output.connect(self._progress.append_log)
+        self._queue.progress.connect(self._progress.set_progress)
+        self._queue.finished.connect(self._on_queue_done)
+
     def _pick_dir(self):
         d = QFileDialog.getExistingDirectory(self, "Save to", self._out_dir)
         if d:
@@ -199,16 +310,33 @@ class DownloadPage(QWidget):
             self._dir_label.setText(d)
 
     def _on_format_mode(self, idx):
-        self._table.setVisible(idx == 4)
+        self._format_panel.setVisible(idx == 4)
+
+    def _apply_format_filter(self):
+        ext = self._ext_filter.currentText()
+        self._format_model.set_filter(self._codec_filter.text(), "" if ext == "All" else ext)
 
     # ── Fetch formats ──
 
     def _fetch(self):
         url = self._url_input.text().strip()
-        if not url or self._fetch_proc is not None:
+        if not url or self._fetch_proc is not None or self._entry_proc is not None:
             return
         self._url = url
-        self._fetch_buf = b""
+        self._parser = JsonLineParser()
+        self._fetch_errors = []
+        self._entries = []
+        self._entries_table.setRowCount(0)
+        self._entries_table.setVisible(False)
+        self._enqueue_entries_btn.setEnabled(False)
+
+        if self._cache_check.isChecked() and not self._playlist_check.isChecked():
+            info = self._info_cache.get(url)
+            if info is not None:
+                self._progress.append_log(f"Using cached metadata for {url}")
+                self._add_entries([info], cached=True)
+                return
+
         self._fetch_btn.setEnabled(False)
         self._info_label.setText("Fetching...")
         self._progress.append_log(f"Fetching formats for {url}...")
@@ -216,6 +344,8 @@ class DownloadPage(QWidget):
         cmd = ["yt-dlp", "-j", "--no-download"]
         if not self._playlist_check.isChecked():
             cmd.append("--no-playlist")
+        elif self._flat_check.isChecked():
+            cmd.append("--flat-playlist")
         cmd.append(url)
 
         self._progress.append_log(f"$ {' '.join(cmd)}")
@@ -226,33 +356,131 @@ class DownloadPage(QWidget):
         self._fetch_proc.start(cmd[0], cmd[1:])
 
     def _on_fetch_output(self):
-        self._fetch_buf += self._fetch_proc.readAllStandardOutput().data()
+        objs, text = self._parser.feed(self._fetch_proc.readAllStandardOutput().data())
+        self._add_entries(objs)
+        self._fetch_errors += text
 
     def _on_fetch_done(self, exit_code, _status):
+        objs, text = self._parser.flush()
+        self._add_entries(objs)
+        self._fetch_errors += text
         self._fetch_proc = None
         self._fetch_btn.setEnabled(True)
 
-        if exit_code != 0:
+        if exit_code != 0 and not self._entries:
             self._info_label.setText("Fetch failed")
             self._progress.append_log(f"yt-dlp exited with code {exit_code}")
-            text = self._fetch_buf.decode(errors="replace").strip()
-            if text:
-                self._progress.append_log(text)
+            for line in self._fetch_errors:
+                self._progress.append_log(line)
             return
 
-        text = self._fetch_buf.decode(errors="replace").strip()
-        lines = [l for l in text.splitlines() if l.strip().startswith("{")]
-        if not lines:
+        if not self._entries:
             self._info_label.setText("No info returned")
             self._progress.append_log("No format info returned")
             return
 
-        try:
-            info = json.loads(lines[0])
-        except json.JSONDecodeError as e:
-            self._progress.append_log(f"JSON parse error: {e}")
+        if exit_code != 0:
+            self._progress.append_log(
+                f"yt-dlp exited with code {exit_code} after {len(self._entries)} entries"
+            )
+        if len(self._entries) > 1:
+            self._progress.append_log(f"Playlist: {len(self._entries)} entries")
+
+    def _add_entries(self, objs: list[dict], *, cached: bool = False):
+        """Append entries as they stream in; the first one is shown right away.
+
+        `cached` entries came from the info cache and aren't written back,
+        which would restart their expiry.
+        """
+        if not objs:
             return
+        first = not self._entries
+        table = self._entries_table
+        table.setUpdatesEnabled(False)
+        for info in objs:
+            row = len(self._entries)
+            self._entries.append(info)
+            if not cached:
+                self._cache_info(info)
+            table.insertRow(row)
+            duration = info.get("duration_string") or info.get("duration") or ""
+            table.setItem(row, 0, QTableWidgetItem(str(row + 1)))
+            table.setItem(row, 1, QTableWidgetItem(info.get("title") or info.get("id", "")))
+            table.setItem(row, 2, QTableWidgetItem(str(duration)))
+            table.setItem(row, 3, QTableWidgetItem(info.get("uploader") or info.get("channel") or ""))
+        table.setUpdatesEnabled(True)
+        if len(self._entries) > 1:
+            table.setVisible(True)
+            self._enqueue_entries_btn.setEnabled(True)
+            self._enqueue_entries_btn.setText(f"Queue {len(self._entries)} playlist entries")
+        if first:
+            self._show_entry(0)
+
+    def _on_entry_selected(self):
+        rows = {i.row() for i in self._entries_table.selectedItems()}
+        if rows:
+            self._show_entry(min(rows))
+
+    def _show_entry(self, row: int):
+        """Show an entry's formats, fetching them lazily for --flat-playlist entries."""
+        info = self._entries[row]
+        if "formats" not in info:
+            self._fetch_entry(row)
+            return
+        self._show_info(info)
 
+    def _fetch_entry(self, row: int):
+        if self._entry_proc is not None:
+            return
+        url = entry_url(self._entries[row])
+        if not url:
+            return
+        self._entry_row = row
+        self._entry_info = self._entries[row]
+        self._entry_parser = JsonLineParser()
+        self._entry_objs = []
+        self._entry_errors = []
+        self._info_label.setText(f"Fetching formats for entry {row + 1}...")
+        cmd = ["yt-dlp", "-j", "--no-download", "--no-playlist", url]
+        self._progress.append_log(f"$ {' '.join(cmd)}")
+        self._entry_proc = QProcess(self)
+        self._entry_proc.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        self._entry_proc.readyReadStandardOutput.connect(self._on_entry_output)
+        self._entry_proc.finished.connect(self._on_entry_fetch_done)
+        self._entry_proc.start(cmd[0], cmd[1:])
+
+    def _on_entry_output(self):
+        objs, text = self._entry_parser.feed(self._entry_proc.readAllStandardOutput().data())
+        self._entry_objs += objs
+        self._entry_errors += text
+
+    def _on_entry_fetch_done(self, exit_code, _status):
+        self._entry_proc = None
+        objs, text = self._entry_parser.flush()
+        objs = self._entry_objs + objs
+        if exit_code != 0 or not objs:
+            self._info_label.setText("Entry fetch failed")
+            for line in self._entry_errors + text:
+                self._progress.append_log(line)
+            return
+        row = self._entry_row
+        if not (0 <= row < len(self._entries) and self._entries[row] is self._entry_info):
+            return   # the entry list was replaced while fetching
+        self._entries[row] = objs[0]
+        self._cache_info(objs[0])
+        self._show_info(objs[0])
+
+    def _cache_info(self, info: dict):
+        if not self._cache_check.isChecked():
+            return
+        url = entry_url(info)
+        if url:
+            self._info_cache.put(url, info)
+        if not self._playlist_check.isChecked() and self._url != url:
+            # Also key by what the user typed (short links, tracking params)
+            self._info_cache.put(self._url, info)
+
+    def _show_info(self, info: dict):
         self._video_info = info
 
         # Show video info
@@ -267,49 +495,36 @@ class DownloadPage(QWidget):
 
         # Populate format table
         self._formats = info.get("formats", [])
-        self._table.setRowCount(len(self._formats))
-        for i, f in enumerate(self._formats):
-            self._table.setItem(i, 0, QTableWidgetItem(str(f.get("format_id", ""))))
-            self._table.setItem(i, 1, QTableWidgetItem(f.get("ext", "")))
-            if f.get("width"):
-                res = f"{f.get('width', '?')}x{f.get('height', '?')}"
-            elif f.get("acodec") and f.get("acodec") != "none":
-                res = "audio"
-            else:
-                res = ""
-            self._table.setItem(i, 2, QTableWidgetItem(res))
-            fps = str(f.get("fps", "")) if f.get("fps") else ""
-            self._table.setItem(i, 3, QTableWidgetItem(fps))
-            vcodec = f.get("vcodec", "none")
-            acodec = f.get("acodec", "none")
-            codec = ""
-            if vcodec and vcodec != "none":
-                codec += vcodec.split(".")[0]
-            if acodec and acodec != "none":
-                codec += (" + " if codec else "") + acodec.split(".")[0]
-            self._table.setItem(i, 4, QTableWidgetItem(codec))
-            size = f.get("filesize") or f.get("filesize_approx")
-            size_str = f"{size / 1048576:.1f} MB" if size else ""
-            self._table.setItem(i, 5, QTableWidgetItem(size_str))
-            self._table.setItem(i, 6, QTableWidgetItem(f.get("format_note", "")))
+        self._format_model.set_formats(self._formats)
+        self._ext_filter.blockSignals(True)
+        self._ext_filter.clear()
+        self._ext_filter.addItems(["All"] + self._format_model.extensions())
+        self._ext_filter.blockSignals(False)
+        self._apply_format_filter()
 
         self._go_btn.setEnabled(True)
         self._audio_btn.setEnabled(True)
         self._progress.append_log(f"Found {len(self._formats)} formats")
-        if len(lines) > 1:
-            self._progress.append_log(f"Playlist: {len(lines)} videos (showing first)")
 
     # ── Build command ──
 
-    def _build_cmd(self, *, audio_only=False) -> list[str]:
-        cmd = ["yt-dlp"]
+    def _build_cmd(self, *, audio_only=False, url: str = "", single=False, replay=True) -> list[str]:
+        """Build the yt-dlp command. `single` forces --no-playlist (queued entries).
+
+        With `replay` a fresh cached extraction replaces the URL; queued
+        commands leave that to the queue, which looks it up at launch.
+        """
+        url = url or self._url
+        cmd = ["yt-dlp", "--newline"]
 
         # Output template
         template = self._filename_input.text().strip() or "%(title)s.%(ext)s"
         cmd += ["-o", f"{self._out_dir}/{template}"]
 
         # Playlist
-        if self._playlist_check.isChecked():
+        if single:
+            cmd.append("--no-playlist")
+        elif self._playlist_check.isChecked():
             cmd.append("--yes-playlist")
         else:
             cmd.append("--no-playlist")
@@ -320,13 +535,11 @@ class DownloadPage(QWidget):
         else:
             fmt_idx = self._format_combo.currentIndex()
             if fmt_idx == 4:
-                # Pick from table
-                sel = self._table.selectedItems()
-                if sel:
-                    row = sel[0].row()
-                    fmt_id = self._formats[row].get("format_id")
-                    if fmt_id:
-                        cmd += ["-f", fmt_id]
+                # Pick from table (format IDs only apply to the fetched video)
+                rows = self._table.selectionModel().selectedRows() if url == self._url else []
+                fmt = self._format_model.format_at(rows[0].row()) if rows else None
+                if fmt and fmt.get("format_id"):
+                    cmd += ["-f", fmt["format_id"]]
             elif fmt_idx == 0:
                 cmd += ["-f", "bv*+ba/b"]
             elif fmt_idx == 1:
@@ -387,12 +600,24 @@ class DownloadPage(QWidget):
         if frags > 1:
             cmd += ["--concurrent-fragments", str(frags)]
 
+        # Archive of finished IDs, shared by every download
+        if self._archive_check.isChecked():
+            cmd += ["--download-archive", archive_path()]
+
         # Extra args
         extra = self._extra_input.text().strip()
         if extra:
             cmd += extra.split()
 
-        cmd.append(self._url)
+        # Replay cached extraction instead of hitting the site again
+        playlist = self._playlist_check.isChecked() and not single
+        cached = None
+        if replay and self._cache_check.isChecked() and not playlist:
+            cached = self._info_cache.get_path(url)
+        if cached:
+            cmd += ["--load-info-json", cached]
+        else:
+            cmd.append(url)
         return cmd
 
     def _run(self):
@@ -423,5 +648,70 @@ class DownloadPage(QWidget):
         if ok:
             self._open_folder_btn.setVisible(True)
 
+    # ── Queue ──
+
+    def _enqueue(self, urls: list[str], *, single=False):
+        for url in urls:
+            # The row must exist first: a running queue starts the item inside add()
+            row = self._queue_table.rowCount()
+            self._queue_table.insertRow(row)
+            self._queue_table.setItem(row, 0, QTableWidgetItem(url))
+            self._queue_table.setItem(row, 1, QTableWidgetItem("Queued"))
+            self._queue_table.setItem(row, 2, QTableWidgetItem(""))
+            replay = self._cache_check.isChecked() and (single or not self._playlist_check.isChecked())
+            self._queue.add(url, self._build_cmd(url=url, single=single, replay=False), replay=replay)
+
+    def _enqueue_input(self):
+        urls = self._url_input.text().split()
+        if urls:
+            self._enqueue(urls)
+            self._url_input.clear()
+
+    def _enqueue_entries(self):
+        urls = [u for u in (entry_url(e) for e in self._entries) if u]
+        self._enqueue(urls, single=True)
+        self._progress.append_log(f"Queued {len(urls)} playlist entries")
+
+    def _start_queue(self):
+        if self._queue.is_running():
+            self._queue.cancel()
+            return
+        if not self._queue.items():
+            return
+        self._queue.set_parallel(self._parallel_spin.value())
+        self._queue.set_retries(self._retries_spin.value())
+        self._progress.reset()
+        self._progress.set_running(True)
+        self._queue_start_btn.setText("Stop queue")
+        self._queue_clear_btn.setEnabled(False)
+        if not self._queue.start():
+            self._progress.append_log("Nothing to download: every queued item is done")
+            self._on_queue_stopped()
+
+    def _on_queue_stopped(self):
+        self._progress.set_running(False)
+        self._queue_start_btn.setText("Start queue")
+        self._queue_clear_btn.setEnabled(True)
+
+    def _clear_queue(self):
+        self._queue.clear()
+        self._queue_table.setRowCount(0)
+
+    def _on_queue_status(self, idx: int, status: str):
+        item = self._queue_table.item(idx, 1)
+        if item:
+            item.setText(status)
+
+    def _on_queue_progress(self, idx: int, pct: float):
+        item = self._queue_table.item(idx, 2)
+        if item:
+            item.setText(f"{pct:.0f}%")
+
+    def _on_queue_done(self, ok: int, failed: int):
+        self._on_queue_stopped()
+        self._progress.append_log(f"Queue finished: {ok} done, {failed} failed")
+        if ok:
+            self._open_folder_btn.setVisible(True)
+
     def _open_folder(self):
         subprocess.Popen(["xdg-open", self._out_dir])
@@ -1,4 +1,4 @@
-"""Extract audio track page."""
+"""Extract audio (and subtitle) tracks page — every selected track in one pass."""
 
 import os
 from pathlib import Path
@@ -6,6 +6,7 @@ from pathlib import Path
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QHBoxLayout, QLabel, QPushButton, QSlider, QVBoxLayout, QWidget
 
+from chevalvideo import demux
 from chevalvideo.probe import probe, summarize, get_duration_secs
 from chevalvideo.runner import CommandRunner
 from chevalvideo.widgets.file_picker import FileDropWidget
@@ -14,6 +15,7 @@ from chevalvideo.widgets.option_grid import OptionGrid
 from chevalvideo.widgets.progress import ProgressWidget
 
 FORMATS = [
+    {"value": "copy", "label": "Original", "description": "Stream copy"},
     {"value": "mp3", "label": "MP3", "description": "Universal"},
     {"value": "flac", "label": "FLAC", "description": "Lossless"},
     {"value": "wav", "label": "WAV", "description": "Uncompressed"},
@@ -34,6 +36,7 @@ class ExtractAudioPage(QWidget):
         super().__init__(parent)
         self._input_path = ""
         self._duration = 0.0
+        self._tracks: list[demux.Track] = []
         self._runner = CommandRunner(self)
 
         layout = QVBoxLayout(self)
@@ -51,8 +54,24 @@ class ExtractAudioPage(QWidget):
         self._info = MediaInfoWidget()
         layout.addWidget(self._info)
 
+        # Tracks to extract; all selected ones come out of a single read
+        tracks_row = QHBoxLayout()
+        tracks_row.addWidget(QLabel("Tracks:"))
+        tracks_row.addStretch()
+        all_btn = QPushButton("All")
+        all_btn.setFixedWidth(80)
+        all_btn.clicked.connect(lambda: self._select_tracks(lambda t: True))
+        tracks_row.addWidget(all_btn)
+        audio_btn = QPushButton("Audio only")
+        audio_btn.setFixedWidth(100)
+        audio_btn.clicked.connect(lambda: self._select_tracks(lambda t: t.kind == "audio"))
+        tracks_row.addWidget(audio_btn)
+        layout.addLayout(tracks_row)
+        self._track_grid = OptionGrid(columns=4, multi=True)
+        layout.addWidget(self._track_grid)
+
         layout.addWidget(QLabel("Audio format:"))
-        self._fmt_grid = OptionGrid(columns=4)
+        self._fmt_grid = OptionGrid(columns=5)
         self._fmt_grid.set_options(FORMATS)
         layout.addWidget(self._fmt_grid)
 
@@ -76,6 +95,7 @@ class ExtractAudioPage(QWidget):
 
         self._progress = ProgressWidget()
         self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._runner.cancel(keep=True))
         layout.addWidget(self._progress)
 
         self._runner.progress.connect(self._progress.set_progress)
@@ -91,10 +111,22 @@ class ExtractAudioPage(QWidget):
             info = probe(path)
             self._duration = get_duration_secs(info)
             self._info.set_info(summarize(info))
+            self._tracks = demux.tracks(info)
         except Exception as e:
+            self._tracks = []
             self._progress.append_log(f"Probe error: {e}")
+        self._select_tracks(lambda t: t.kind == "audio")
         self._go_btn.setEnabled(True)
 
+    def _select_tracks(self, want):
+        # Rebuilding the cards is the simplest way to clear a multi-select grid
+        self._track_grid.set_options([
+            {"value": t.key, "label": t.label(), "description": t.description()} for t in self._tracks
+        ])
+        for t in self._tracks:
+            if want(t):
+                self._track_grid.select(t.key)
+
     def _run(self):
         if not self._input_path or self._runner.is_running():
             return
@@ -103,21 +135,37 @@ class ExtractAudioPage(QWidget):
             return
 
         fmt = fmt_sel[0]
-        codec = CODEC_MAP.get(fmt, fmt)
-        bitrate = self._quality_slider.value()
-        stem = Path(self._input_path).stem
-        out_dir = str(Path(self._input_path).parent)
-        out_path = os.path.join(out_dir, f"{stem}.{fmt}")
-
-        cmd = ["ffmpeg", "-y", "-i", self._input_path, "-vn", "-c:a", codec]
-        if fmt not in ("flac", "wav"):
-            cmd += ["-b:a", f"{bitrate}k"]
-        cmd += ["-progress", "pipe:1", out_path]
-
-        self._progress.reset()
+        codec = "" if fmt == "copy" else CODEC_MAP.get(fmt, fmt)
+        bitrate = "" if fmt in ("copy", "flac", "wav") else f"{self._quality_slider.value()}k"
+
+        if self._tracks:
+            chosen = set(self._track_grid.selected())
+            selected = [t for t in self._tracks if t.key in chosen]
+            if not selected:
+                self._progress.append_log("Error: no tracks selected.")
+                return
+            cmd, outputs = demux.demux_cmd(
+                self._input_path, selected, audio_codec=codec, audio_ext=fmt, audio_bitrate=bitrate,
+            )
+            self._progress.reset()
+            self._progress.append_log(f"Extracting {len(outputs)} tracks in one pass:")
+            for out in outputs:
+                self._progress.append_log(f"  {Path(out).name}")
+        else:
+            # Probe failed: let ffmpeg pick the default audio stream
+            stem = Path(self._input_path).stem
+            out_dir = str(Path(self._input_path).parent)
+            out_path = os.path.join(out_dir, f"{stem}.{'mka' if fmt == 'copy' else fmt}")
+            cmd = ["ffmpeg", "-y", "-i", self._input_path, "-vn", "-sn", "-c:a", codec or "copy"]
+            if bitrate:
+                cmd += ["-b:a", bitrate]
+            cmd += ["-progress", "pipe:1", out_path]
+            outputs = [out_path]
+            self._progress.reset()
+
         self._progress.set_running(True)
         self._go_btn.setEnabled(False)
-        self._runner.run(cmd, duration=self._duration)
+        self._runner.run(cmd, duration=self._duration, outputs=outputs)
 
     def _on_done(self, ok, msg):
         self._progress.set_running(False)
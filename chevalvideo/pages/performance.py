@@ -0,0 +1,101 @@
+"""Performance page — global priority, CPU affinity and thread limits for jobs."""
+
+from PyQt6.QtWidgets import (
+    QComboBox, QGridLayout, QLabel, QLineEdit, QPushButton, QSpinBox, QVBoxLayout, QWidget,
+)
+
+from chevalvideo import limits
+
+IONICE_LABELS = [
+    ("", "Default"),
+    ("low", "Low (best-effort 7)"),
+    ("idle", "Idle only"),
+]
+
+
+class PerformancePage(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(24, 24, 24, 24)
+        layout.setSpacing(12)
+
+        heading = QLabel("Performance")
+        heading.setObjectName("heading")
+        layout.addWidget(heading)
+
+        sub = QLabel(
+            f"Defaults for every ffmpeg / yt-dlp job. {limits.cpu_count()} CPUs available. "
+            "Batch can run at background priority, and parallel jobs split the threads between them."
+        )
+        sub.setObjectName("subheading")
+        sub.setWordWrap(True)
+        layout.addWidget(sub)
+
+        grid = QGridLayout()
+        grid.setHorizontalSpacing(12)
+
+        grid.addWidget(QLabel("CPU priority (nice):"), 0, 0)
+        self._nice_spin = QSpinBox()
+        self._nice_spin.setRange(0, 19)
+        self._nice_spin.setToolTip("0 = normal, 19 = lowest")
+        grid.addWidget(self._nice_spin, 0, 1)
+
+        grid.addWidget(QLabel("Disk priority (ionice):"), 1, 0)
+        self._ionice_combo = QComboBox()
+        for value, label in IONICE_LABELS:
+            self._ionice_combo.addItem(label, value)
+        grid.addWidget(self._ionice_combo, 1, 1)
+
+        grid.addWidget(QLabel("CPU affinity:"), 2, 0)
+        self._cpus_input = QLineEdit()
+        self._cpus_input.setPlaceholderText(f"all (e.g. 0-{max(0, limits.cpu_count() - 2)})")
+        grid.addWidget(self._cpus_input, 2, 1)
+
+        grid.addWidget(QLabel("Threads per job:"), 3, 0)
+        self._threads_spin = QSpinBox()
+        self._threads_spin.setRange(0, 256)
+        self._threads_spin.setSpecialValueText("Auto")
+        self._threads_spin.setToolTip("ffmpeg -threads / -filter_threads; x265 pools")
+        grid.addWidget(self._threads_spin, 3, 1)
+        grid.setColumnStretch(2, 1)
+        layout.addLayout(grid)
+
+        self._save_btn = QPushButton("Save")
+        self._save_btn.clicked.connect(self._save)
+        layout.addWidget(self._save_btn)
+
+        self._status = QLabel("")
+        self._status.setObjectName("subheading")
+        layout.addWidget(self._status)
+
+        layout.addStretch()
+        self._load()
+
+    def _load(self):
+        d = limits.defaults()
+        self._nice_spin.setValue(d.nice)
+        self._ionice_combo.setCurrentIndex(max(0, self._ionice_combo.findData(d.ionice)))
+        self._cpus_input.setText(d.cpus)
+        self._threads_spin.setValue(d.threads)
+
+    def _save(self):
+        cpus = self._cpus_input.text().strip()
+        try:
+            if cpus and not limits.parse_cpus(cpus):
+                raise ValueError("empty CPU list")
+        except ValueError as e:
+            self._status.setText(f"Invalid CPU list: {e}")
+            return
+        try:
+            limits.set_defaults(limits.ProcessLimits(
+                nice=self._nice_spin.value(),
+                ionice=self._ionice_combo.currentData(),
+                cpus=cpus,
+                threads=self._threads_spin.value(),
+            ))
+        except OSError as e:
+            self._status.setText(f"Could not save: {e}")
+            return
+        self._status.setText("Saved — applies to jobs started from now on")
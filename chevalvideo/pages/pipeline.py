@@ -0,0 +1,212 @@
+"""Pipeline page — chain several pages' transforms into one encode."""
+
+import os
+from pathlib import Path
+
+from PyQt6.QtWidgets import (
+    QComboBox, QFileDialog, QHBoxLayout, QLabel, QListWidget, QPushButton,
+    QSpinBox, QVBoxLayout, QWidget,
+)
+
+from chevalvideo import pipeline
+from chevalvideo.probe import probe, summarize, get_duration_secs
+from chevalvideo.runner import CommandRunner
+from chevalvideo.widgets.file_picker import FileDropWidget
+from chevalvideo.widgets.media_info import MediaInfoWidget
+from chevalvideo.widgets.progress import ProgressWidget
+
+CODECS = ["libx264", "libx265", "libsvtav1"]
+RECIPE_FILTERS = "Pipeline recipes (*.json);;All files (*)"
+
+
+class PipelinePage(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._input_path = ""
+        self._duration = 0.0
+        self._steps: list[dict] = []
+        self._sources: dict[str, QWidget] = {}
+        self._runner = CommandRunner(self)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(24, 24, 24, 24)
+        layout.setSpacing(12)
+
+        heading = QLabel("Pipeline")
+        heading.setObjectName("heading")
+        layout.addWidget(heading)
+
+        self._file_drop = FileDropWidget()
+        self._file_drop.file_selected.connect(self._on_file)
+        layout.addWidget(self._file_drop)
+
+        self._info = MediaInfoWidget()
+        layout.addWidget(self._info)
+
+        # Add step from another page's current settings
+        add_row = QHBoxLayout()
+        add_row.addWidget(QLabel("Add step from:"))
+        self._source_combo = QComboBox()
+        add_row.addWidget(self._source_combo, 1)
+        self._add_btn = QPushButton("Add")
+        self._add_btn.clicked.connect(self._add_step)
+        add_row.addWidget(self._add_btn)
+        layout.addLayout(add_row)
+
+        self._step_list = QListWidget()
+        layout.addWidget(self._step_list)
+
+        step_btns = QHBoxLayout()
+        for label, slot in (
+            ("Up", lambda: self._move(-1)),
+            ("Down", lambda: self._move(1)),
+            ("Remove", self._remove_step),
+            ("Save recipe", self._save_recipe),
+            ("Load recipe", self._load_recipe),
+        ):
+            btn = QPushButton(label)
+            btn.clicked.connect(slot)
+            step_btns.addWidget(btn)
+        step_btns.addStretch()
+        layout.addLayout(step_btns)
+
+        enc_row = QHBoxLayout()
+        enc_row.addWidget(QLabel("Codec:"))
+        self._codec_combo = QComboBox()
+        self._codec_combo.addItems(CODECS)
+        enc_row.addWidget(self._codec_combo)
+        enc_row.addWidget(QLabel("CRF:"))
+        self._crf_spin = QSpinBox()
+        self._crf_spin.setRange(0, 51)
+        self._crf_spin.setValue(20)
+        enc_row.addWidget(self._crf_spin)
+        enc_row.addStretch()
+        layout.addLayout(enc_row)
+
+        self._go_btn = QPushButton("Run Pipeline")
+        self._go_btn.clicked.connect(self._run)
+        self._go_btn.setEnabled(False)
+        layout.addWidget(self._go_btn)
+
+        self._progress = ProgressWidget()
+        self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._runner.cancel(keep=True))
+        layout.addWidget(self._progress)
+
+        self._runner.progress.connect(self._progress.set_progress)
+        self._runner.output.connect(self._progress.append_log)
+        self._runner.finished.connect(self._on_done)
+
+        layout.addStretch()
+
+    def set_sources(self, sources: dict[str, QWidget]):
+        """Pages (by nav name) whose pipeline_step() can be added as steps."""
+        self._sources = sources
+        self._source_combo.clear()
+        self._source_combo.addItems(list(sources))
+
+    def _on_file(self, path):
+        self._input_path = path
+        try:
+            info = probe(path)
+            self._duration = get_duration_secs(info)
+            self._info.set_info(summarize(info))
+        except Exception as e:
+            self._progress.append_log(f"Probe error: {e}")
+        self._update_go()
+
+    # ── Steps ──
+
+    def _add_step(self):
+        name = self._source_combo.currentText()
+        page = self._sources.get(name)
+        if page is None:
+            return
+        step = page.pipeline_step()
+        if step is None:
+            self._progress.append_log(f"{name}: nothing to add — configure it on its page first")
+            return
+        self._steps.append(step)
+        self._refresh_list()
+
+    def _move(self, delta: int):
+        row = self._step_list.currentRow()
+        new = row + delta
+        if row < 0 or not 0 <= new < len(self._steps):
+            return
+        self._steps[row], self._steps[new] = self._steps[new], self._steps[row]
+        self._refresh_list()
+        self._step_list.setCurrentRow(new)
+
+    def _remove_step(self):
+        row = self._step_list.currentRow()
+        if row >= 0:
+            del self._steps[row]
+            self._refresh_list()
+
+    def _refresh_list(self):
+        self._step_list.clear()
+        for i, step in enumerate(self._steps, 1):
+            self._step_list.addItem(f"{i}. {pipeline.describe(step)}")
+        self._update_go()
+
+    def _update_go(self):
+        self._go_btn.setEnabled(bool(self._input_path and self._steps))
+
+    # ── Recipes ──
+
+    def _save_recipe(self):
+        if not self._steps:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save recipe", str(pipeline.recipes_dir() / "recipe.json"), RECIPE_FILTERS,
+        )
+        if path:
+            pipeline.save_recipe(
+                path, self._steps,
+                codec=self._codec_combo.currentText(), crf=self._crf_spin.value(),
+            )
+            self._progress.append_log(f"Saved recipe: {path}")
+
+    def _load_recipe(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Load recipe", str(pipeline.recipes_dir()), RECIPE_FILTERS,
+        )
+        if not path:
+            return
+        try:
+            recipe = pipeline.load_recipe(path)
+        except (OSError, ValueError) as e:
+            self._progress.append_log(f"Recipe error: {e}")
+            return
+        self._steps = recipe["steps"]
+        if recipe["codec"] in CODECS:
+            self._codec_combo.setCurrentText(recipe["codec"])
+        self._crf_spin.setValue(int(recipe["crf"]))
+        self._refresh_list()
+
+    # ── Run ──
+
+    def _run(self):
+        if not self._input_path or not self._steps or self._runner.is_running():
+            return
+
+        ext = Path(self._input_path).suffix
+        stem = Path(self._input_path).stem
+        out_dir = str(Path(self._input_path).parent)
+        out_path = os.path.join(out_dir, f"{stem}_pipeline{ext}")
+
+        cmd = pipeline.build_cmd(
+            self._input_path, self._steps, out_path,
+            codec=self._codec_combo.currentText(), crf=self._crf_spin.value(),
+        )
+
+        self._progress.reset()
+        self._progress.set_running(True)
+        self._go_btn.setEnabled(False)
+        self._runner.run(cmd, duration=self._duration)
+
+    def _on_done(self, ok, msg):
+        self._progress.set_running(False)
+        self._update_go()
+        self._progress.append_log(msg)
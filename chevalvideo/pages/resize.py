@@ -5,6 +5,7 @@ from pathlib import Path
 
 from PyQt6.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget
 
+from chevalvideo import pipeline
 from chevalvideo.probe import probe, summarize, get_duration_secs
 from chevalvideo.runner import CommandRunner
 from chevalvideo.widgets.file_picker import FileDropWidget
@@ -64,6 +65,7 @@ class ResizePage(QWidget):
 
         self._progress = ProgressWidget()
         self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._runner.cancel(keep=True))
         layout.addWidget(self._progress)
 
         self._runner.progress.connect(self._progress.set_progress)
@@ -83,13 +85,19 @@ class ResizePage(QWidget):
             self._progress.append_log(f"Probe error: {e}")
         self._go_btn.setEnabled(True)
 
-    def _run(self):
-        if not self._input_path or self._runner.is_running():
-            return
-
+    def _scale_filter(self) -> str:
         custom = self._custom_input.text().strip()
         preset_sel = self._preset_grid.selected()
         scale = custom if custom else (preset_sel[0] if preset_sel else "1920:-2")
+        return f"scale={scale}"
+
+    def pipeline_step(self) -> dict | None:
+        """Current settings as a Pipeline step."""
+        return pipeline.vf_step("Resize", self._scale_filter())
+
+    def _run(self):
+        if not self._input_path or self._runner.is_running():
+            return
 
         ext = Path(self._input_path).suffix
         stem = Path(self._input_path).stem
@@ -98,7 +106,7 @@ class ResizePage(QWidget):
 
         cmd = [
             "ffmpeg", "-y", "-i", self._input_path,
-            "-vf", f"scale={scale}",
+            "-vf", self._scale_filter(),
             "-c:a", "copy",
             "-progress", "pipe:1", out_path,
         ]
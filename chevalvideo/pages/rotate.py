@@ -9,6 +9,7 @@ from PyQt6.QtWidgets import (
     QCheckBox, QHBoxLayout, QLabel, QPushButton, QSpinBox, QVBoxLayout, QWidget,
 )
 
+from chevalvideo import pipeline
 from chevalvideo.probe import probe, summarize, get_duration_secs
 from chevalvideo.runner import CommandRunner
 from chevalvideo.widgets.file_picker import FileDropWidget
@@ -141,6 +142,7 @@ class RotatePage(QWidget):
 
         self._progress = ProgressWidget()
         self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._runner.cancel(keep=True))
         layout.addWidget(self._progress)
 
         self._runner.progress.connect(self._progress.set_progress)
@@ -224,6 +226,11 @@ class RotatePage(QWidget):
 
         return ",".join(filters)
 
+    def pipeline_step(self) -> dict | None:
+        """Current settings as a Pipeline step (auto-crop only if already detected)."""
+        vf = self._build_vf()
+        return pipeline.vf_step("Rotate/Crop", vf) if vf else None
+
     def _ratio_to_crop(self, ratio: str) -> str:
         """Convert an aspect ratio like '16:9' to a crop expression."""
         parts = ratio.split(":")
@@ -2,6 +2,7 @@
 
 import math
 import os
+import time
 from pathlib import Path
 
 from PyQt6.QtCore import Qt
@@ -10,6 +11,7 @@ from PyQt6.QtWidgets import (
     QVBoxLayout, QWidget,
 )
 
+from chevalvideo import interp
 from chevalvideo.probe import probe, summarize, get_duration_secs
 from chevalvideo.runner import CommandRunner
 from chevalvideo.widgets.file_picker import FileDropWidget
@@ -27,6 +29,11 @@ SPEED_PRESETS = [
 ]
 
 
+# Stream copy keeps every frame, so a speed-up multiplies the frame rate.
+# Past this rate players choke and frames have to be dropped by re-encoding.
+MAX_COPY_FPS = 120.0
+
+
 def _build_atempo_chain(speed: float) -> list[str]:
     """Build a chain of atempo filters for the given speed factor.
 
@@ -53,6 +60,10 @@ class SpeedPage(QWidget):
         self._probe_info = {}
         self._duration = 0.0
         self._runner = CommandRunner(self)
+        self._chunker = interp.ChunkedInterpolator(self)
+        # Smooth-motion runs go: "estimate" (timed sample) -> ["scenes"] -> encode
+        self._phase = ""
+        self._job: dict = {}
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(24, 24, 24, 24)
@@ -98,9 +109,27 @@ class SpeedPage(QWidget):
         self._drop_audio = QCheckBox("Drop audio")
         layout.addWidget(self._drop_audio)
 
+        self._fast_remux = QCheckBox(
+            "Fast remux — rewrite video timestamps without re-encoding (audio only is re-encoded)"
+        )
+        self._fast_remux.setChecked(True)
+        layout.addWidget(self._fast_remux)
+
         # Smooth motion
-        self._smooth_motion = QCheckBox("Smooth motion (frame interpolation via minterpolate)")
-        layout.addWidget(self._smooth_motion)
+        layout.addWidget(QLabel("Smooth motion (frame interpolation):"))
+        self._smooth_grid = OptionGrid(columns=4)
+        self._smooth_grid.set_options(interp.TIERS)
+        layout.addWidget(self._smooth_grid)
+
+        par_row = QHBoxLayout()
+        par_row.addWidget(QLabel("Parallel chunks:"))
+        self._parallel_spin = QSpinBox()
+        self._parallel_spin.setRange(2, 64)
+        self._parallel_spin.setValue(max(2, os.cpu_count() or 2))
+        self._parallel_spin.setFixedWidth(100)
+        par_row.addWidget(self._parallel_spin)
+        par_row.addStretch()
+        layout.addLayout(par_row)
 
         # FPS override
         fps_row = QHBoxLayout()
@@ -121,16 +150,22 @@ class SpeedPage(QWidget):
 
         # Progress
         self._progress = ProgressWidget()
-        self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.cancel_button.clicked.connect(self._cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._cancel(keep=True))
         layout.addWidget(self._progress)
 
         self._runner.progress.connect(self._progress.set_progress)
-        self._runner.output.connect(self._progress.append_log)
+        self._runner.output.connect(self._on_output)
         self._runner.finished.connect(self._on_done)
 
+        self._chunker.progress.connect(self._progress.set_progress)
+        self._chunker.output.connect(self._progress.append_log)
+        self._chunker.finished.connect(self._on_done)
+
         layout.addStretch()
 
         self._preset_grid.select("2")
+        self._smooth_grid.select("off")
 
     def _on_file(self, path: str):
         self._input_path = path
@@ -163,17 +198,32 @@ class SpeedPage(QWidget):
     def _get_speed(self) -> float:
         return self._speed_spin.value()
 
+    def _smooth_tier(self) -> str:
+        sel = self._smooth_grid.selected()
+        return sel[0] if sel else "off"
+
+    def _audio_args(self, speed: float) -> list[str]:
+        if self._drop_audio.isChecked():
+            return ["-an"]
+        if self._adjust_pitch.isChecked():
+            # asetrate shifts pitch by changing the sample rate, then
+            # aresample brings it back to the original rate so the
+            # container is well-formed.
+            audio_sr = self._get_audio_sample_rate()
+            new_rate = int(audio_sr * speed)
+            return ["-af", f"asetrate={new_rate},aresample={audio_sr}"]
+        # Use atempo chain for speed without pitch change
+        return ["-af", ",".join(_build_atempo_chain(speed))]
+
     def _run(self):
-        if not self._input_path or self._runner.is_running():
+        if not self._input_path or self._is_busy():
             return
 
         speed = self._get_speed()
         if speed <= 0:
             return
 
-        drop_audio = self._drop_audio.isChecked()
-        adjust_pitch = self._adjust_pitch.isChecked()
-        smooth = self._smooth_motion.isChecked()
+        tier = self._smooth_tier()
         fps_override = self._fps_spin.value()
 
         ext = Path(self._input_path).suffix
@@ -183,41 +233,135 @@ class SpeedPage(QWidget):
 
         # Build video filter chain
         vfilters = [f"setpts=PTS/{speed}"]
+        smooth = interp.smooth_filter(tier, fps_override)
         if smooth:
-            if fps_override > 0:
-                vfilters.append(f"minterpolate=fps={fps_override}:mi_mode=mci")
-            else:
-                vfilters.append("minterpolate=mi_mode=mci")
+            vfilters.append(smooth)
         elif fps_override > 0:
             vfilters.append(f"fps={fps_override}")
 
         vf = ",".join(vfilters)
 
         cmd = ["ffmpeg", "-y", "-i", self._input_path, "-vf", vf]
-
-        if drop_audio:
-            cmd += ["-an"]
-        elif adjust_pitch:
-            # asetrate shifts pitch by changing the sample rate, then
-            # aresample brings it back to the original rate so the
-            # container is well-formed.
-            audio_sr = self._get_audio_sample_rate()
-            new_rate = int(audio_sr * speed)
-            cmd += ["-af", f"asetrate={new_rate},aresample={audio_sr}"]
-        else:
-            # Use atempo chain for speed without pitch change
-            atempo_chain = _build_atempo_chain(speed)
-            cmd += ["-af", ",".join(atempo_chain)]
-
+        cmd += self._audio_args(speed)
         cmd += ["-progress", "pipe:1", out_path]
 
         # Estimate output duration for progress tracking
         out_duration = self._duration / speed if speed > 0 else self._duration
 
         self._progress.reset()
+        remux = self._build_remux_cmd(speed, tier, fps_override, out_path)
+        if remux is not None:
+            cmd = remux
+
+        self._job = {
+            "cmd": cmd, "vf": vf, "speed": speed, "tier": tier,
+            "out_path": out_path, "out_duration": out_duration,
+        }
+
         self._progress.set_running(True)
         self._go_btn.setEnabled(False)
-        self._runner.run(cmd, duration=out_duration)
+
+        if tier != "off" and self._duration > interp.SAMPLE_SECS * 2:
+            self._start_estimate()
+            return
+        self._start_encode()
+
+    def _build_remux_cmd(self, speed: float, tier: str, fps_override: int,
+                         out_path: str) -> list[str] | None:
+        """Stream-copy speed change via -itsscale, or None if the full path is needed.
+
+        The video input is opened with its timestamps scaled by 1/speed and
+        copied untouched; audio comes from a second, unscaled open of the same
+        file so the atempo/asetrate chain sees real time.
+        """
+        if not self._fast_remux.isChecked():
+            return None
+        if tier != "off":
+            return None
+        src_fps = self._get_video_fps()
+        out_fps = src_fps * speed
+        if fps_override > 0 and not math.isclose(fps_override, out_fps, rel_tol=1e-3):
+            self._progress.append_log("Fast remux off: FPS override needs a re-encode")
+            return None
+        if out_fps > MAX_COPY_FPS:
+            self._progress.append_log(
+                f"Fast remux off: {src_fps:g} fps x {speed:g} = {out_fps:g} fps "
+                f"would need frames dropped (max {MAX_COPY_FPS:g})"
+            )
+            return None
+        cmd = [
+            "ffmpeg", "-y",
+            "-itsscale", f"{1 / speed:.9g}", "-i", self._input_path,
+            "-i", self._input_path,
+            "-map", "0:v:0", "-c:v", "copy",
+        ]
+        if not self._drop_audio.isChecked():
+            cmd += ["-map", "1:a:0?"]
+        cmd += self._audio_args(speed)
+        cmd += ["-progress", "pipe:1", out_path]
+        return cmd
+
+    def _get_video_fps(self) -> float:
+        """Average frame rate of the first video stream, defaulting to 30."""
+        for s in self._probe_info.get("streams", []):
+            if s.get("codec_type") != "video":
+                continue
+            for key in ("avg_frame_rate", "r_frame_rate"):
+                num, _, den = s.get(key, "").partition("/")
+                try:
+                    fps = float(num) / float(den or 1)
+                except (ValueError, ZeroDivisionError):
+                    continue
+                if fps > 0:
+                    return fps
+        return 30.0
+
+    def _is_busy(self) -> bool:
+        return self._runner.is_running() or self._chunker.is_running()
+
+    def _start_estimate(self):
+        """Time a few seconds from the middle to predict the full render."""
+        self._phase = "estimate"
+        src_secs = interp.SAMPLE_SECS
+        start = max(0.0, self._duration / 2 - src_secs / 2)
+        self._progress.append_log(f"Estimating render time from a {src_secs:.0f}s sample...")
+        self._job["sample_start"] = time.monotonic()
+        cmd = interp.sample_cmd(self._input_path, self._job["vf"], start, src_secs)
+        self._runner.run(cmd, duration=src_secs / self._job["speed"])
+
+    def _start_scenes(self):
+        self._phase = "scenes"
+        self._job["cuts"] = []
+        self._progress.append_log("Scanning for scene cuts to place chunk boundaries...")
+        self._progress.set_progress(0)
+        self._runner.run(interp.scene_cmd(self._input_path), duration=self._duration)
+
+    def _start_encode(self):
+        self._phase = ""
+        self._progress.set_progress(0)
+        if self._job["tier"] == "parallel":
+            n = self._parallel_spin.value()
+            chunks = interp.plan_chunks(self._duration, self._job.get("cuts", []), n * 2)
+            self._chunker.start(
+                self._input_path, chunks, self._job["vf"], self._job["out_path"],
+                speed=self._job["speed"], audio_args=self._audio_args(self._job["speed"]),
+                parallel=n,
+            )
+            return
+        self._runner.run(self._job["cmd"], duration=self._job["out_duration"])
+
+    def _on_output(self, line: str):
+        if self._phase == "scenes":
+            t = interp.parse_scene_time(line)
+            if t is not None:
+                self._job["cuts"].append(t)
+            return
+        self._progress.append_log(line)
+
+    def _cancel(self, *, keep: bool = False):
+        self._phase = "cancelled" if self._phase else ""
+        self._runner.cancel(keep=keep)
+        self._chunker.cancel()
 
     def _get_audio_sample_rate(self) -> int:
         """Return the audio sample rate from probe info, defaulting to 44100."""
@@ -230,6 +374,28 @@ class SpeedPage(QWidget):
         return 44100
 
     def _on_done(self, ok, msg):
+        if self._phase == "estimate":
+            if ok:
+                wall = time.monotonic() - self._job["sample_start"]
+                parallel = self._parallel_spin.value() if self._job["tier"] == "parallel" else 1
+                eta = interp.estimate_secs(self._duration, interp.SAMPLE_SECS, wall, parallel)
+                self._progress.append_log(
+                    f"Estimated render time: ~{interp.format_eta(eta)} "
+                    f"({interp.SAMPLE_SECS / wall:.2f}x realtime per process)"
+                )
+            else:
+                # The sample is only for the estimate; the real job may still work
+                self._progress.append_log(f"No render time estimate (sample encode failed: {msg})")
+            if self._job["tier"] == "parallel":
+                self._start_scenes()
+            else:
+                self._start_encode()
+            return
+        if self._phase == "scenes" and ok:
+            self._progress.append_log(f"Found {len(self._job['cuts'])} scene cuts")
+            self._start_encode()
+            return
+        self._phase = ""
         self._progress.set_running(False)
         self._go_btn.setEnabled(True)
         self._progress.append_log(msg)
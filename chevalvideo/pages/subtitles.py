@@ -1,14 +1,18 @@
-"""Subtitle operations page — burn in, embed, or extract subtitles."""
+"""Subtitle operations page — burn in, embed, extract or convert subtitles."""
 
 import os
+import shutil
+import tempfile
 from pathlib import Path
 
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
-    QCheckBox, QFileDialog, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QSpinBox, QVBoxLayout, QWidget,
+    QCheckBox, QComboBox, QDoubleSpinBox, QFileDialog, QHBoxLayout, QLabel,
+    QLineEdit, QPushButton, QSpinBox, QVBoxLayout, QWidget,
 )
 
+from chevalvideo import pipeline, sparseburn, subtitles
+from chevalvideo.paths import cache_dir
 from chevalvideo.probe import probe, summarize, get_duration_secs
 from chevalvideo.runner import CommandRunner
 from chevalvideo.widgets.file_picker import FileDropWidget
@@ -19,7 +23,8 @@ from chevalvideo.widgets.progress import ProgressWidget
 MODES = [
     {"value": "burn", "label": "Burn In", "description": "Hardcode subtitles into video"},
     {"value": "embed", "label": "Embed", "description": "Add as soft subtitle track"},
-    {"value": "extract", "label": "Extract", "description": "Rip subtitle track from video"},
+    {"value": "extract", "label": "Extract", "description": "Rip subtitle tracks from video"},
+    {"value": "convert", "label": "Convert", "description": "Shift, retime, merge or convert a file"},
 ]
 
 POSITIONS = [
@@ -35,6 +40,8 @@ EXTRACT_FORMATS = [
 
 SUB_FILE_FILTERS = "Subtitle files (*.srt *.ass *.vtt *.ssa *.sub);;All files (*)"
 
+FRAME_RATES = ["23.976", "24", "25", "29.97", "30", "50", "59.94", "60"]
+
 
 class SubtitlesPage(QWidget):
     def __init__(self, parent=None):
@@ -44,6 +51,12 @@ class SubtitlesPage(QWidget):
         self._probe_info = {}
         self._duration = 0.0
         self._runner = CommandRunner(self)
+        self._steps: list[tuple[str, list[str], float]] = []   # sparse burn, in order
+        self._work_dir = ""
+        self._phase = ""                    # "keyframes" while the sparse burn scan runs
+        self._scan: dict = {}               # sparse burn plan inputs, during the scan
+        self._convert_path = ""
+        self._merge_paths: list[str] = []
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(24, 24, 24, 24)
@@ -63,7 +76,7 @@ class SubtitlesPage(QWidget):
 
         # -- Mode selection --
         layout.addWidget(QLabel("Mode:"))
-        self._mode_grid = OptionGrid(columns=3)
+        self._mode_grid = OptionGrid(columns=4)
         self._mode_grid.set_options(MODES)
         self._mode_grid.selection_changed.connect(self._on_mode)
         layout.addWidget(self._mode_grid)
@@ -118,6 +131,12 @@ class SubtitlesPage(QWidget):
         self._pos_grid.set_options(POSITIONS)
         burn_lay.addWidget(self._pos_grid)
 
+        self._sparse_check = QCheckBox(
+            "Only re-encode where subtitles appear (stream-copy the rest; H.264/HEVC)"
+        )
+        self._sparse_check.setChecked(True)
+        burn_lay.addWidget(self._sparse_check)
+
         layout.addWidget(self._burn_group)
 
         # =====================================================================
@@ -163,12 +182,19 @@ class SubtitlesPage(QWidget):
         extract_lay.setContentsMargins(0, 0, 0, 0)
         extract_lay.setSpacing(8)
 
+        # Every track in one pass, or just one
+        self._all_tracks_check = QCheckBox("All subtitle tracks (one pass over the file)")
+        self._all_tracks_check.setChecked(True)
+        extract_lay.addWidget(self._all_tracks_check)
+
         # Track index
         idx_row = QHBoxLayout()
         idx_row.addWidget(QLabel("Track index:"))
         self._track_index = QSpinBox()
         self._track_index.setRange(0, 99)
         self._track_index.setValue(0)
+        self._track_index.setEnabled(False)
+        self._all_tracks_check.toggled.connect(lambda on: self._track_index.setEnabled(not on))
         idx_row.addWidget(self._track_index)
         idx_row.addStretch()
         extract_lay.addLayout(idx_row)
@@ -181,6 +207,76 @@ class SubtitlesPage(QWidget):
 
         layout.addWidget(self._extract_group)
 
+        # =====================================================================
+        # CONVERT options (no ffmpeg, no video needed)
+        # =====================================================================
+        self._convert_group = QWidget()
+        convert_lay = QVBoxLayout(self._convert_group)
+        convert_lay.setContentsMargins(0, 0, 0, 0)
+        convert_lay.setSpacing(8)
+
+        csub_row = QHBoxLayout()
+        csub_row.addWidget(QLabel("Subtitle file:"))
+        self._convert_label = QLabel("(none)")
+        self._convert_label.setMinimumWidth(200)
+        csub_row.addWidget(self._convert_label, 1)
+        convert_browse = QPushButton("Browse")
+        convert_browse.setFixedWidth(100)
+        convert_browse.clicked.connect(self._browse_sub_convert)
+        csub_row.addWidget(convert_browse)
+        convert_lay.addLayout(csub_row)
+
+        merge_row = QHBoxLayout()
+        merge_row.addWidget(QLabel("Merge with:"))
+        self._merge_label = QLabel("(none)")
+        self._merge_label.setMinimumWidth(200)
+        merge_row.addWidget(self._merge_label, 1)
+        merge_add = QPushButton("Add")
+        merge_add.setFixedWidth(100)
+        merge_add.clicked.connect(self._browse_sub_merge)
+        merge_row.addWidget(merge_add)
+        merge_clear = QPushButton("Clear")
+        merge_clear.setFixedWidth(100)
+        merge_clear.clicked.connect(self._clear_merge)
+        merge_row.addWidget(merge_clear)
+        convert_lay.addLayout(merge_row)
+
+        self._dedupe_check = QCheckBox("Drop duplicate cues (same text at the same time)")
+        self._dedupe_check.setChecked(True)
+        convert_lay.addWidget(self._dedupe_check)
+
+        shift_row = QHBoxLayout()
+        shift_row.addWidget(QLabel("Shift (s):"))
+        self._shift_spin = QDoubleSpinBox()
+        self._shift_spin.setRange(-36000.0, 36000.0)
+        self._shift_spin.setDecimals(3)
+        self._shift_spin.setSingleStep(0.1)
+        shift_row.addWidget(self._shift_spin)
+        shift_row.addStretch()
+        convert_lay.addLayout(shift_row)
+
+        # Frame-rate retime, e.g. a 23.976 fps subtitle on a 25 fps PAL release
+        fps_row = QHBoxLayout()
+        fps_row.addWidget(QLabel("Retime from fps:"))
+        self._from_fps = QComboBox()
+        self._from_fps.setEditable(True)
+        self._from_fps.addItems(FRAME_RATES)
+        fps_row.addWidget(self._from_fps)
+        fps_row.addWidget(QLabel("to:"))
+        self._to_fps = QComboBox()
+        self._to_fps.setEditable(True)
+        self._to_fps.addItems(FRAME_RATES)
+        fps_row.addWidget(self._to_fps)
+        fps_row.addStretch()
+        convert_lay.addLayout(fps_row)
+
+        convert_lay.addWidget(QLabel("Output format:"))
+        self._convert_fmt_grid = OptionGrid(columns=3)
+        self._convert_fmt_grid.set_options(EXTRACT_FORMATS)
+        convert_lay.addWidget(self._convert_fmt_grid)
+
+        layout.addWidget(self._convert_group)
+
         # =====================================================================
         # Go button + progress
         # =====================================================================
@@ -190,11 +286,12 @@ class SubtitlesPage(QWidget):
         layout.addWidget(self._go_btn)
 
         self._progress = ProgressWidget()
-        self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.cancel_button.clicked.connect(self._cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._cancel(keep=True))
         layout.addWidget(self._progress)
 
         self._runner.progress.connect(self._progress.set_progress)
-        self._runner.output.connect(self._progress.append_log)
+        self._runner.output.connect(self._on_output)
         self._runner.finished.connect(self._on_done)
 
         layout.addStretch()
@@ -203,6 +300,7 @@ class SubtitlesPage(QWidget):
         self._mode_grid.select("burn")
         self._pos_grid.select("bottom")
         self._extract_fmt_grid.select("srt")
+        self._convert_fmt_grid.select("srt")
         self._on_mode(["burn"])
 
     # --------------------------------------------------------------------- #
@@ -217,7 +315,7 @@ class SubtitlesPage(QWidget):
             self._info.set_info(summarize(self._probe_info))
         except Exception as e:
             self._progress.append_log(f"Probe error: {e}")
-        self._go_btn.setEnabled(True)
+        self._update_go()
 
     def _browse_sub_burn(self):
         path, _ = QFileDialog.getOpenFileName(self, "Select subtitle file", "", SUB_FILE_FILTERS)
@@ -231,6 +329,23 @@ class SubtitlesPage(QWidget):
             self._sub_path = path
             self._embed_sub_label.setText(Path(path).name)
 
+    def _browse_sub_convert(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Select subtitle file", "", SUB_FILE_FILTERS)
+        if path:
+            self._convert_path = path
+            self._convert_label.setText(Path(path).name)
+            self._update_go()
+
+    def _browse_sub_merge(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Select subtitle files to merge", "", SUB_FILE_FILTERS)
+        if paths:
+            self._merge_paths += paths
+            self._merge_label.setText(", ".join(Path(p).name for p in self._merge_paths))
+
+    def _clear_merge(self):
+        self._merge_paths = []
+        self._merge_label.setText("(none)")
+
     # --------------------------------------------------------------------- #
     # Mode switching
     # --------------------------------------------------------------------- #
@@ -240,6 +355,16 @@ class SubtitlesPage(QWidget):
         self._burn_group.setVisible(mode == "burn")
         self._embed_group.setVisible(mode == "embed")
         self._extract_group.setVisible(mode == "extract")
+        self._convert_group.setVisible(mode == "convert")
+        self._update_go()
+
+    def _update_go(self):
+        if self._runner.is_running():
+            return
+        if self._current_mode() == "convert":
+            self._go_btn.setEnabled(bool(self._convert_path))
+        else:
+            self._go_btn.setEnabled(bool(self._input_path))
 
     # --------------------------------------------------------------------- #
     # Build and run commands
@@ -250,32 +375,116 @@ class SubtitlesPage(QWidget):
         return sel[0] if sel else "burn"
 
     def _run(self):
-        if not self._input_path or self._runner.is_running():
+        if self._runner.is_running():
             return
-
         mode = self._current_mode()
+        if mode == "convert":
+            self._run_convert()
+            return
+        if not self._input_path:
+            return
+
+        if mode == "burn" and self._sub_path and self._sparse_check.isChecked():
+            if self._start_sparse_burn():
+                return
+        self._start_cmd(mode)
+
+    def _start_cmd(self, mode: str, *, keep_log: bool = False):
+        outputs = None
         if mode == "burn":
             cmd = self._build_burn_cmd()
         elif mode == "embed":
             cmd = self._build_embed_cmd()
         elif mode == "extract":
-            cmd = self._build_extract_cmd()
+            cmd, outputs = self._build_extract_cmd() or (None, None)
         else:
             return
 
         if cmd is None:
             return
 
-        self._progress.reset()
+        if keep_log:
+            self._progress.set_progress(0)
+        else:
+            self._progress.reset()
         self._progress.set_running(True)
         self._go_btn.setEnabled(False)
-        self._runner.run(cmd, duration=self._duration)
+        self._runner.run(cmd, duration=self._duration, outputs=outputs)
 
     def _build_burn_cmd(self) -> list[str] | None:
         if not self._sub_path:
             self._progress.append_log("Error: no subtitle file selected.")
             return None
 
+        vf = self._build_burn_vf()
+
+        stem = Path(self._input_path).stem
+        ext = Path(self._input_path).suffix
+        out_dir = str(Path(self._input_path).parent)
+        out_path = os.path.join(out_dir, f"{stem}_burned{ext}")
+
+        return [
+            "ffmpeg", "-y", "-i", self._input_path,
+            "-vf", vf,
+            "-c:a", "copy",
+            "-progress", "pipe:1",
+            out_path,
+        ]
+
+    def _start_sparse_burn(self) -> bool:
+        """Start the keyframe scan for a sparse burn; False (after logging why) to burn everything."""
+        scan_cmd, cues, note = sparseburn.scan(self._input_path, self._sub_path, self._probe_info)
+        self._progress.reset()
+        if not scan_cmd:
+            self._progress.append_log(f"Sparse burn not possible ({note}); burning the whole video")
+            return False
+        self._scan = {"cues": cues, "vf": self._build_burn_vf(), "lines": []}
+        self._phase = "keyframes"
+        self._progress.append_log("Sparse burn: finding keyframes around the cues...")
+        self._progress.set_running(True)
+        self._go_btn.setEnabled(False)
+        self._runner.run(scan_cmd)
+        return True
+
+    def _plan_sparse_burn(self, ok: bool, msg: str):
+        """Turn the keyframe scan into burn steps and start them, or burn everything."""
+        scan, self._scan = self._scan, {}
+        stem = Path(self._input_path).stem
+        ext = Path(self._input_path).suffix
+        out_path = os.path.join(str(Path(self._input_path).parent), f"{stem}_burned{ext}")
+        steps, note = [], f"keyframe scan failed: {msg}"
+        if ok:
+            self._work_dir = tempfile.mkdtemp(prefix="burn-", dir=cache_dir())
+            steps, note = sparseburn.build(
+                self._input_path, scan["vf"], self._probe_info, self._duration, scan["cues"],
+                sparseburn.parse_keyframes(scan["lines"]), out_path, self._work_dir,
+            )
+        if not steps:
+            self._cleanup_sparse()
+            self._progress.append_log(f"Sparse burn not possible ({note}); burning the whole video")
+            self._start_cmd("burn", keep_log=True)
+            return
+        self._progress.append_log(f"Sparse burn: {note}")
+        self._steps = steps
+        self._step_index = -1
+        self._next_step()
+
+    def _next_step(self):
+        self._step_index += 1
+        label, cmd, secs = self._steps[self._step_index]
+        self._progress.append_log(f"--- [{self._step_index + 1}/{len(self._steps)}] {label} ---")
+        self._progress.set_progress(0)
+        self._progress.set_running(True)
+        self._runner.run(cmd, duration=secs)
+
+    def _cleanup_sparse(self):
+        self._steps = []
+        if self._work_dir:
+            shutil.rmtree(self._work_dir, ignore_errors=True)
+            self._work_dir = ""
+
+    def _build_burn_vf(self) -> str:
+        """subtitles= filter with the burn-in style options applied."""
         font_size = self._font_size.value()
         font_color = self._font_color.text().strip().lstrip("#")
 
@@ -311,20 +520,13 @@ class SubtitlesPage(QWidget):
 
         # Escape the subtitle path for the filtergraph: colons and backslashes
         escaped_sub = self._sub_path.replace("\\", "/").replace(":", "\\:")
-        vf = f"subtitles={escaped_sub}:force_style='{force_style}'"
-
-        stem = Path(self._input_path).stem
-        ext = Path(self._input_path).suffix
-        out_dir = str(Path(self._input_path).parent)
-        out_path = os.path.join(out_dir, f"{stem}_burned{ext}")
+        return f"subtitles={escaped_sub}:force_style='{force_style}'"
 
-        return [
-            "ffmpeg", "-y", "-i", self._input_path,
-            "-vf", vf,
-            "-c:a", "copy",
-            "-progress", "pipe:1",
-            out_path,
-        ]
+    def pipeline_step(self) -> dict | None:
+        """Burn-in settings as a Pipeline step."""
+        if not self._sub_path:
+            return None
+        return pipeline.vf_step("Subtitles", self._build_burn_vf())
 
     def _build_embed_cmd(self) -> list[str] | None:
         if not self._sub_path:
@@ -361,32 +563,108 @@ class SubtitlesPage(QWidget):
         cmd += ["-progress", "pipe:1", out_path]
         return cmd
 
-    def _build_extract_cmd(self) -> list[str] | None:
+    def _build_extract_cmd(self) -> tuple[list[str], list[str]] | None:
         fmt_sel = self._extract_fmt_grid.selected()
         if not fmt_sel:
             self._progress.append_log("Error: no output format selected.")
             return None
 
         fmt = fmt_sel[0]
-        idx = self._track_index.value()
+        streams = [s for s in self._probe_info.get("streams", []) if s.get("codec_type") == "subtitle"]
+        if self._all_tracks_check.isChecked():
+            if not streams:
+                self._progress.append_log("Error: the file has no subtitle tracks.")
+                return None
+            wanted = list(enumerate(streams))
+        else:
+            idx = self._track_index.value()
+            wanted = [(idx, streams[idx] if idx < len(streams) else {})]
 
         stem = Path(self._input_path).stem
         out_dir = str(Path(self._input_path).parent)
-        out_path = os.path.join(out_dir, f"{stem}_sub{idx}.{fmt}")
 
-        return [
-            "ffmpeg", "-y",
-            "-i", self._input_path,
-            "-map", f"0:s:{idx}",
-            "-progress", "pipe:1",
-            out_path,
-        ]
+        # One demux pass, one output per track
+        cmd = ["ffmpeg", "-y", "-i", self._input_path, "-progress", "pipe:1"]
+        outputs = []
+        for idx, stream in wanted:
+            codec = stream.get("codec_name", "")
+            lang = stream.get("tags", {}).get("language", "")
+            name = f"{stem}_sub{idx}" + (f".{lang}" if lang else "")
+            if codec in subtitles.BITMAP_EXTENSIONS:
+                # Bitmap subtitles can't become text; copy them as they are
+                out_path = os.path.join(out_dir, f"{name}.{subtitles.BITMAP_EXTENSIONS[codec]}")
+                cmd += ["-map", f"0:s:{idx}", "-c:s", "copy", out_path]
+                outputs.append(out_path)
+                self._progress.append_log(f"Track {idx} is {codec} (bitmap): copying to {Path(out_path).name}")
+            elif codec and codec not in subtitles.TEXT_CODECS:
+                self._progress.append_log(f"Track {idx}: unsupported codec {codec}, skipped")
+            else:
+                out_path = os.path.join(out_dir, f"{name}.{fmt}")
+                cmd += ["-map", f"0:s:{idx}", out_path]
+                outputs.append(out_path)
+        if not outputs:
+            self._progress.append_log("Error: no extractable subtitle tracks.")
+            return None
+        return cmd, outputs
+
+    def _run_convert(self):
+        """Shift, retime, merge and convert in Python; nothing is spawned."""
+        fmt_sel = self._convert_fmt_grid.selected()
+        fmt = fmt_sel[0] if fmt_sel else "srt"
+        try:
+            from_fps = float(self._from_fps.currentText())
+            to_fps = float(self._to_fps.currentText())
+        except ValueError:
+            self._progress.append_log("Error: frame rates must be numbers.")
+            return
+        if from_fps <= 0 or to_fps <= 0:
+            self._progress.append_log("Error: frame rates must be positive.")
+            return
+
+        src = Path(self._convert_path)
+        out_path = str(src.with_name(f"{src.stem}_converted.{fmt}"))
+        self._progress.reset()
+        try:
+            count = subtitles.convert(
+                self._convert_path, out_path,
+                offset=self._shift_spin.value(),
+                fps=(from_fps, to_fps) if from_fps != to_fps else None,
+                extra=self._merge_paths,
+                dedup=self._dedupe_check.isChecked(),
+            )
+        except (OSError, ValueError) as e:
+            self._progress.append_log(f"Conversion failed: {e}")
+            return
+        self._progress.set_progress(100)
+        self._progress.append_log(f"Wrote {count} cues to {out_path}")
 
     # --------------------------------------------------------------------- #
     # Finished
     # --------------------------------------------------------------------- #
 
+    def _on_output(self, line: str):
+        if self._phase == "keyframes":
+            self._scan["lines"].append(line)   # one line per packet; too many to log
+            return
+        self._progress.append_log(line)
+
+    def _cancel(self, *, keep: bool = False):
+        if self._phase == "keyframes":
+            self._phase = "cancelled"
+        self._runner.cancel(keep=keep)
+
     def _on_done(self, ok: bool, msg: str):
+        phase, self._phase = self._phase, ""
+        if phase == "keyframes":
+            self._plan_sparse_burn(ok, msg)
+            return
+        if phase == "cancelled":
+            self._scan = {}
+        if self._steps:
+            if ok and self._step_index + 1 < len(self._steps):
+                self._next_step()
+                return
+            self._cleanup_sparse()
         self._progress.set_running(False)
         self._go_btn.setEnabled(True)
         self._progress.append_log(msg)
@@ -3,14 +3,24 @@
 import os
 from pathlib import Path
 
-from PyQt6.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget
-
-from chevalvideo.probe import probe, summarize
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtWidgets import (
+    QHBoxLayout, QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget,
+)
+
+from chevalvideo.framegrab import FrameGrabber, fit_size
+from chevalvideo.probe import (
+    format_timestamp, get_duration_secs, get_video_size, parse_timestamp, probe, summarize,
+)
 from chevalvideo.runner import CommandRunner
 from chevalvideo.widgets.file_picker import FileDropWidget
 from chevalvideo.widgets.media_info import MediaInfoWidget
 from chevalvideo.widgets.option_grid import OptionGrid
 from chevalvideo.widgets.progress import ProgressWidget
+from chevalvideo.widgets.timeline import TimelineWidget
+
+PREVIEW_WIDTH = 480
 
 IMG_FORMATS = [
     {"value": "png", "label": "PNG", "description": "Lossless"},
@@ -22,7 +32,15 @@ class ThumbnailPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._input_path = ""
+        self._duration = 0.0
+        self._preview_size = fit_size(0, 0, PREVIEW_WIDTH)
+        self._wanted = ("", -1.0)   # (path, ts) of the newest preview request
         self._runner = CommandRunner(self)
+        self._grabber = FrameGrabber(parent=self)
+        self._grabber.frame_ready.connect(self._on_frame)
+        self._grabber.failed.connect(
+            lambda _p, _ts, err: self._progress.append_log(f"Preview error: {err}")
+        )
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(24, 24, 24, 24)
@@ -39,12 +57,23 @@ class ThumbnailPage(QWidget):
         self._info = MediaInfoWidget()
         layout.addWidget(self._info)
 
+        # Preview
+        self._preview = QLabel("No preview")
+        self._preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._preview.setMinimumHeight(180)
+        layout.addWidget(self._preview)
+
+        self._timeline = TimelineWidget(markers=False)
+        self._timeline.position_changed.connect(self._on_scrub)
+        layout.addWidget(self._timeline)
+
         # Timestamp
         ts_row = QHBoxLayout()
         ts_row.addWidget(QLabel("Timestamp:"))
         self._ts_input = QLineEdit()
         self._ts_input.setPlaceholderText("00:00:05")
         self._ts_input.setFixedWidth(120)
+        self._ts_input.editingFinished.connect(self._on_ts_edited)
         ts_row.addWidget(self._ts_input)
         ts_row.addStretch()
         layout.addLayout(ts_row)
@@ -61,6 +90,7 @@ class ThumbnailPage(QWidget):
 
         self._progress = ProgressWidget()
         self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._runner.cancel(keep=True))
         layout.addWidget(self._progress)
 
         self._runner.progress.connect(self._progress.set_progress)
@@ -72,12 +102,47 @@ class ThumbnailPage(QWidget):
 
     def _on_file(self, path):
         self._input_path = path
+        self._duration = 0.0
+        video_size = (0, 0)
         try:
             info = probe(path)
+            self._duration = get_duration_secs(info)
+            video_size = get_video_size(info)
             self._info.set_info(summarize(info))
         except Exception as e:
             self._progress.append_log(f"Probe error: {e}")
+        self._preview_size = fit_size(*video_size, PREVIEW_WIDTH)
         self._go_btn.setEnabled(True)
+        self._grabber.cancel_pending()
+        self._timeline.set_source(path, self._duration, video_size)
+        self._request_preview(0.0)
+
+    # ── Preview ──
+
+    def _on_scrub(self, ts: float):
+        self._ts_input.setText(format_timestamp(ts))
+        self._request_preview(ts)
+
+    def _on_ts_edited(self):
+        try:
+            ts = parse_timestamp(self._ts_input.text())
+        except ValueError:
+            return
+        self._timeline.set_position(ts)
+        self._request_preview(ts)
+
+    def _request_preview(self, ts: float):
+        if self._input_path:
+            # Frames come back under the grabber's rounded timestamp
+            self._wanted = self._grabber.key(self._input_path, ts, *self._preview_size)[:2]
+            self._grabber.request(self._input_path, ts, *self._preview_size)
+
+    def _on_frame(self, path: str, ts: float, img: QImage):
+        # Grabs finish out of order; only show the frame the slider points at
+        if (path, ts) != self._wanted:
+            return
+        self._preview.setPixmap(QPixmap.fromImage(img))
+        self._preview.setToolTip(format_timestamp(ts))
 
     def _run(self):
         if not self._input_path or self._runner.is_running():
@@ -7,11 +7,15 @@ from PyQt6.QtWidgets import (
     QCheckBox, QHBoxLayout, QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget,
 )
 
-from chevalvideo.probe import probe, summarize, get_duration_secs
+from chevalvideo import detect
+from chevalvideo.probe import (
+    format_timestamp, get_duration_secs, get_video_size, parse_timestamp, probe, summarize,
+)
 from chevalvideo.runner import CommandRunner
 from chevalvideo.widgets.file_picker import FileDropWidget
 from chevalvideo.widgets.media_info import MediaInfoWidget
 from chevalvideo.widgets.progress import ProgressWidget
+from chevalvideo.widgets.timeline import TimelineWidget
 
 
 class TrimPage(QWidget):
@@ -20,6 +24,10 @@ class TrimPage(QWidget):
         self._input_path = ""
         self._duration = 0.0
         self._runner = CommandRunner(self)
+        self._detector = detect.DetectAnalyzer(1, self)
+        self._detector.detected.connect(self._on_detected)
+        self._detector.failed.connect(lambda _p, msg: self._progress.append_log(f"Detection failed: {msg}"))
+        self._detector.all_done.connect(lambda: self._detect_btn.setEnabled(bool(self._input_path)))
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(24, 24, 24, 24)
@@ -36,6 +44,11 @@ class TrimPage(QWidget):
         self._info = MediaInfoWidget()
         layout.addWidget(self._info)
 
+        # Timeline: drag the in/out markers, or I / O at the playhead
+        self._timeline = TimelineWidget()
+        self._timeline.range_changed.connect(self._on_range)
+        layout.addWidget(self._timeline)
+
         # Time inputs
         time_row = QHBoxLayout()
         time_row.addWidget(QLabel("Start:"))
@@ -48,10 +61,23 @@ class TrimPage(QWidget):
         self._end_input = QLineEdit()
         self._end_input.setPlaceholderText("00:01:30")
         self._end_input.setFixedWidth(120)
+        self._start_input.editingFinished.connect(self._on_times_edited)
+        self._end_input.editingFinished.connect(self._on_times_edited)
         time_row.addWidget(self._end_input)
         time_row.addStretch()
         layout.addLayout(time_row)
 
+        detect_row = QHBoxLayout()
+        self._detect_btn = QPushButton("Detect black/silent leader && trailer")
+        self._detect_btn.clicked.connect(self._detect)
+        self._detect_btn.setEnabled(False)
+        detect_row.addWidget(self._detect_btn)
+        self._detect_fast = QCheckBox("Fast (head and tail only)")
+        self._detect_fast.setChecked(True)
+        detect_row.addWidget(self._detect_fast)
+        detect_row.addStretch()
+        layout.addLayout(detect_row)
+
         self._copy_check = QCheckBox("Stream copy (no re-encode, fast but less precise)")
         self._copy_check.setChecked(True)
         layout.addWidget(self._copy_check)
@@ -63,6 +89,7 @@ class TrimPage(QWidget):
 
         self._progress = ProgressWidget()
         self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._runner.cancel(keep=True))
         layout.addWidget(self._progress)
 
         self._runner.progress.connect(self._progress.set_progress)
@@ -73,13 +100,57 @@ class TrimPage(QWidget):
 
     def _on_file(self, path):
         self._input_path = path
+        self._duration = 0.0
+        video_size = (0, 0)
         try:
             info = probe(path)
             self._duration = get_duration_secs(info)
+            video_size = get_video_size(info)
             self._info.set_info(summarize(info))
         except Exception as e:
             self._progress.append_log(f"Probe error: {e}")
+        self._timeline.set_source(path, self._duration, video_size)
+        self._start_input.clear()
+        self._end_input.clear()
         self._go_btn.setEnabled(True)
+        self._detect_btn.setEnabled(not self._detector.is_running())
+
+    def _detect(self):
+        if not self._input_path or self._detector.is_running():
+            return
+        self._detect_btn.setEnabled(False)
+        self._progress.append_log("Detecting black and silence...")
+        self._detector.start([self._input_path], 0.5, -50.0, self._detect_fast.isChecked())
+
+    def _on_detected(self, path: str, det):
+        if path != self._input_path:
+            return
+        rng = det.content_range()
+        if rng is None:
+            self._progress.append_log("The whole file is black and silent")
+            return
+        self._progress.append_log(
+            f"Content: {format_timestamp(rng[0])} – {format_timestamp(rng[1])} "
+            f"({len(det.dead())} black+silent ranges)"
+        )
+        self._timeline.set_range(*rng)
+        self._on_range(*rng)
+
+    # ── Timeline sync ──
+
+    def _on_range(self, start: float, end: float):
+        self._start_input.setText(format_timestamp(start))
+        # Out marker at the very end means "to end of file"
+        self._end_input.setText("" if end >= self._duration else format_timestamp(end))
+
+    def _on_times_edited(self):
+        try:
+            start = parse_timestamp(self._start_input.text() or "0")
+            end_text = self._end_input.text().strip()
+            end = parse_timestamp(end_text) if end_text else self._duration
+        except ValueError:
+            return
+        self._timeline.set_range(start, end)
 
     def _run(self):
         if not self._input_path or self._runner.is_running():
@@ -96,7 +167,13 @@ class TrimPage(QWidget):
 
         cmd = ["ffmpeg", "-y", "-ss", start, "-i", self._input_path]
         if end:
-            cmd += ["-to", end]
+            # After an input seek, output timestamps restart at 0: pass a length, not -to
+            try:
+                length = parse_timestamp(end) - parse_timestamp(start)
+            except ValueError:
+                self._progress.append_log("Start and end must be times like 00:01:30")
+                return
+            cmd += ["-t", f"{length:.3f}"]
         if copy:
             cmd += ["-c", "copy"]
         cmd += ["-progress", "pipe:1", out_path]
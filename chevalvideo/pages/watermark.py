@@ -9,7 +9,8 @@ from PyQt6.QtWidgets import (
     QSlider, QSpinBox, QVBoxLayout, QWidget,
 )
 
-from chevalvideo.probe import probe, summarize, get_duration_secs
+from chevalvideo import pipeline, watermark
+from chevalvideo.probe import probe, summarize, get_duration_secs, get_video_size
 from chevalvideo.runner import CommandRunner
 from chevalvideo.widgets.file_picker import FileDropWidget
 from chevalvideo.widgets.media_info import MediaInfoWidget
@@ -32,6 +33,7 @@ class WatermarkPage(QWidget):
         self._watermark_path = ""
         self._probe_info = {}
         self._duration = 0.0
+        self._video_width = 0
         self._runner = CommandRunner(self)
 
         layout = QVBoxLayout(self)
@@ -176,6 +178,7 @@ class WatermarkPage(QWidget):
 
         self._progress = ProgressWidget()
         self._progress.cancel_button.clicked.connect(self._runner.cancel)
+        self._progress.keep_button.clicked.connect(lambda: self._runner.cancel(keep=True))
         layout.addWidget(self._progress)
 
         self._runner.progress.connect(self._progress.set_progress)
@@ -195,6 +198,7 @@ class WatermarkPage(QWidget):
         try:
             self._probe_info = probe(path)
             self._duration = get_duration_secs(self._probe_info)
+            self._video_width = get_video_size(self._probe_info)[0]
             self._info.set_info(summarize(self._probe_info))
         except Exception as e:
             self._progress.append_log(f"Probe error: {e}")
@@ -224,33 +228,13 @@ class WatermarkPage(QWidget):
     # Position math helpers
     # ------------------------------------------------------------------
 
+    def _position(self) -> str:
+        sel = self._position_grid.selected()
+        return sel[0] if sel else "bottom-right"
+
     def _overlay_position(self, pad: int) -> str:
         """Return ffmpeg overlay x:y expression for the selected position."""
-        sel = self._position_grid.selected()
-        pos = sel[0] if sel else "bottom-right"
-        positions = {
-            "top-left": (f"{pad}", f"{pad}"),
-            "top-right": (f"main_w-overlay_w-{pad}", f"{pad}"),
-            "center": ("(main_w-overlay_w)/2", "(main_h-overlay_h)/2"),
-            "bottom-left": (f"{pad}", f"main_h-overlay_h-{pad}"),
-            "bottom-right": (f"main_w-overlay_w-{pad}", f"main_h-overlay_h-{pad}"),
-        }
-        x, y = positions[pos]
-        return f"{x}:{y}"
-
-    def _drawtext_position(self, pad: int) -> str:
-        """Return ffmpeg drawtext x:y expression for the selected position."""
-        sel = self._position_grid.selected()
-        pos = sel[0] if sel else "bottom-right"
-        positions = {
-            "top-left": (f"{pad}", f"{pad}"),
-            "top-right": (f"w-tw-{pad}", f"{pad}"),
-            "center": ("(w-tw)/2", "(h-th)/2"),
-            "bottom-left": (f"{pad}", f"h-th-{pad}"),
-            "bottom-right": (f"w-tw-{pad}", f"h-th-{pad}"),
-        }
-        x, y = positions[pos]
-        return x, y
+        return watermark.overlay_xy(self._position(), pad)
 
     # ------------------------------------------------------------------
     # Run
@@ -280,86 +264,101 @@ class WatermarkPage(QWidget):
         self._go_btn.setEnabled(False)
         self._runner.run(cmd, duration=self._duration)
 
-    def _build_image_cmd(self, out_path: str) -> list[str] | None:
-        if not self._watermark_path:
-            return None
+    def _logo_width(self) -> int:
+        """Watermark width in pixels: the slider is a share of the video's width."""
+        return watermark.logo_width(self._video_width, self._scale_slider.value())
 
-        pad = self._padding_spin.value()
-        scale_pct = self._scale_slider.value() / 100.0
+    def _image_prep(self) -> str:
+        """Filter chain applied to the watermark image before overlay."""
         opacity = self._opacity_slider.value() / 100.0
-        pos_expr = self._overlay_position(pad)
-
-        # Scale watermark relative to video width, then overlay with opacity
-        scale_w = f"iw*{scale_pct}*(main_w/iw)" if scale_pct < 1.0 else "main_w"
-        # Simpler: scale watermark to scale_pct of main video width, keep aspect
-        wm_scale = f"scale={scale_pct}*main_w:-1"
-
-        # Build filter_complex:
-        # [1:v] scale to percentage of input width -> [wm]
         # If opacity < 1, apply colorchannelmixer for alpha
-        # [0:v][wm] overlay at position
-        filter_parts = []
         if opacity < 1.0:
-            filter_parts.append(
-                f"[1:v]scale=iw*{scale_pct}:-1,format=rgba,"
-                f"colorchannelmixer=aa={opacity}[wm];"
-                f"[0:v][wm]overlay={pos_expr}"
-            )
-        else:
-            filter_parts.append(
-                f"[1:v]scale=iw*{scale_pct}:-1[wm];"
-                f"[0:v][wm]overlay={pos_expr}"
-            )
-
-        filter_complex = filter_parts[0]
+            return f"scale={self._logo_width()}:-1,format=rgba,colorchannelmixer=aa={opacity}"
+        return f"scale={self._logo_width()}:-1"
 
+    def _overlay_cmd(self, asset: str, out_path: str) -> list[str]:
+        """Overlay a ready-made asset; a one-frame input is repeated by overlay."""
+        pos_expr = self._overlay_position(self._padding_spin.value())
         return [
             "ffmpeg", "-y",
             "-i", self._input_path,
-            "-i", self._watermark_path,
-            "-filter_complex", filter_complex,
+            "-i", asset,
+            "-filter_complex", f"[0:v][1:v]overlay={pos_expr}",
             "-c:a", "copy",
             "-progress", "pipe:1",
             out_path,
         ]
 
+    def _build_image_cmd(self, out_path: str) -> list[str] | None:
+        if not self._watermark_path:
+            return None
+        if not self._video_width:
+            self._progress.append_log("Error: no video size (probe failed?)")
+            return None
+        # Scaled and faded once into a cached PNG instead of in the encode's graph
+        try:
+            asset = watermark.logo_asset(
+                self._watermark_path, self._logo_width(), self._opacity_slider.value() / 100.0
+            )
+        except (OSError, RuntimeError) as e:
+            self._progress.append_log(f"Error: {e}")
+            return None
+        return self._overlay_cmd(asset, out_path)
+
+    def _text_options(self) -> tuple[str, int, str, str]:
+        """(text, font size, colour, box colour or "")."""
+        box = (self._bg_color_input.text().strip() or "#000000@0.5") if self._bg_check.isChecked() else ""
+        return (
+            self._text_input.text().strip(),
+            self._font_size_spin.value(),
+            self._font_color_input.text().strip() or "#ffffff",
+            box,
+        )
+
+    def _build_drawtext(self) -> str | None:
+        text, font_size, color, box = self._text_options()
+        if not text:
+            return None
+        return watermark.drawtext_filter(
+            text, font_size, color, self._position(), self._padding_spin.value(), box
+        )
+
     def _build_text_cmd(self, out_path: str) -> list[str] | None:
-        text = self._text_input.text().strip()
+        text, font_size, color, box = self._text_options()
         if not text:
             self._progress.append_log("Error: no watermark text entered.")
             return None
 
-        pad = self._padding_spin.value()
-        font_size = self._font_size_spin.value()
-        font_color = self._font_color_input.text().strip() or "#ffffff"
-        x_expr, y_expr = self._drawtext_position(pad)
-
-        # Escape special characters for ffmpeg drawtext
-        escaped = text.replace("\\", "\\\\\\\\")
-        escaped = escaped.replace("'", "\u2019")
-        escaped = escaped.replace(":", "\\:")
-        escaped = escaped.replace("%", "%%")
-
-        drawtext = (
-            f"drawtext=text='{escaped}'"
-            f":fontsize={font_size}"
-            f":fontcolor={font_color}"
-            f":x={x_expr}:y={y_expr}"
-        )
-
-        if self._bg_check.isChecked():
-            bg_color = self._bg_color_input.text().strip() or "#000000@0.5"
-            drawtext += f":box=1:boxcolor={bg_color}:boxborderw={pad // 2}"
+        # The text never changes, so rasterize it once rather than per frame
+        try:
+            asset = watermark.text_asset(text, font_size, color, box, self._padding_spin.value())
+        except (OSError, ValueError) as e:
+            self._progress.append_log(f"Text rendering failed ({e}); using drawtext")
+            asset = None
+        if asset:
+            return self._overlay_cmd(asset, out_path)
 
         return [
             "ffmpeg", "-y",
             "-i", self._input_path,
-            "-vf", drawtext,
+            "-vf", self._build_drawtext(),
             "-c:a", "copy",
             "-progress", "pipe:1",
             out_path,
         ]
 
+    def pipeline_step(self) -> dict | None:
+        """Current settings as a Pipeline step."""
+        if self._mode_combo.currentIndex() == 0:
+            if not self._watermark_path or not self._video_width:
+                return None
+            pos_expr = self._overlay_position(self._padding_spin.value())
+            return pipeline.overlay_step(
+                "Watermark", self._watermark_path, self._image_prep(), pos_expr
+            )
+        drawtext = self._build_drawtext()
+        return pipeline.vf_step("Text watermark", drawtext) if drawtext else None
+
     def _on_done(self, ok, msg):
         self._progress.set_running(False)
         self._go_btn.setEnabled(True)
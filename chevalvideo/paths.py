@@ -0,0 +1,22 @@
+"""Per-user data and cache directories (XDG on Linux)."""
+
+import os
+from pathlib import Path
+
+APP_NAME = "chevalvideo"
+
+
+def data_dir() -> Path:
+    """Persistent app data (download archive, metrics, recipes). Created on demand."""
+    base = os.environ.get("XDG_DATA_HOME") or str(Path.home() / ".local" / "share")
+    path = Path(base) / APP_NAME
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def cache_dir(*sub: str) -> Path:
+    """Disposable cache storage, optionally a named subdirectory. Created on demand."""
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    path = Path(base, APP_NAME, *sub)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
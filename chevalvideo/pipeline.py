@@ -0,0 +1,120 @@
+"""Fuse several pages' video transforms into one ffmpeg filter_complex pass.
+
+A pipeline is a list of steps, each a plain dict so it can be saved as a
+recipe:
+
+    {"kind": "vf", "name": "Resize", "vf": "scale=1920:-2"}
+    {"kind": "overlay", "name": "Watermark", "image": "/logo.png",
+     "prep": "scale=iw*0.25:-1", "position": "main_w-overlay_w-20:20"}
+
+Steps are chained in order on the first video stream; image overlays add
+their own input. Only one encode happens at the end.
+"""
+
+import json
+from pathlib import Path
+
+from chevalvideo.paths import data_dir
+
+RECIPE_VERSION = 1
+
+
+def vf_step(name: str, vf: str) -> dict:
+    """A single-input filter chain applied to the running video."""
+    return {"kind": "vf", "name": name, "vf": vf}
+
+
+def overlay_step(name: str, image: str, prep: str, position: str) -> dict:
+    """Overlay an image input, after filtering it with `prep`, at `position`."""
+    return {"kind": "overlay", "name": name, "image": image, "prep": prep, "position": position}
+
+
+def describe(step: dict) -> str:
+    if step["kind"] == "overlay":
+        return f"{step['name']}: {Path(step['image']).name} @ {step['position']}"
+    return f"{step['name']}: {step['vf']}"
+
+
+def build_graph(steps: list[dict]) -> tuple[list[str], str, str]:
+    """Return (extra input paths, filter_complex string, final video label)."""
+    inputs: list[str] = []
+    parts: list[str] = []
+    cur = "0:v"
+    for n, step in enumerate(steps):
+        out = f"v{n}"
+        if step["kind"] == "overlay":
+            inputs.append(step["image"])
+            src = f"{len(inputs)}:v"
+            if step.get("prep"):
+                parts.append(f"[{src}]{step['prep']}[wm{n}]")
+                src = f"wm{n}"
+            parts.append(f"[{cur}][{src}]overlay={step['position']}[{out}]")
+        elif step["kind"] == "vf":
+            parts.append(f"[{cur}]{step['vf']}[{out}]")
+        else:
+            raise ValueError(f"unknown pipeline step kind: {step['kind']!r}")
+        cur = out
+    return inputs, ";".join(parts), cur
+
+
+def build_cmd(input_path: str, steps: list[dict], out_path: str, *,
+              codec: str = "libx264", crf: int = 20) -> list[str]:
+    """One decode, all steps in a single graph, one encode; audio is copied."""
+    inputs, graph, label = build_graph(steps)
+    cmd = ["ffmpeg", "-y", "-i", input_path]
+    for path in inputs:
+        cmd += ["-i", path]
+    if graph:
+        cmd += ["-filter_complex", graph, "-map", f"[{label}]"]
+    else:
+        cmd += ["-map", "0:v"]
+    cmd += [
+        "-map", "0:a?",
+        "-c:v", codec, "-crf", str(crf),
+        "-c:a", "copy",
+        "-progress", "pipe:1", out_path,
+    ]
+    return cmd
+
+
+# ── Recipes ──
+
+def recipes_dir() -> Path:
+    path = data_dir() / "recipes"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def save_recipe(path: str, steps: list[dict], *, codec: str = "libx264", crf: int = 20):
+    data = {"version": RECIPE_VERSION, "codec": codec, "crf": crf, "steps": steps}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def load_recipe(path: str) -> dict:
+    """Load and validate a recipe; raises ValueError on a malformed file."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or data.get("version") != RECIPE_VERSION:
+        raise ValueError("unsupported recipe version")
+    steps = data.get("steps")
+    if not isinstance(steps, list):
+        raise ValueError("recipe has no step list")
+    for step in steps:
+        kind = step.get("kind") if isinstance(step, dict) else None
+        if kind == "vf":
+            fields = ("name", "vf")
+        elif kind == "overlay":
+            fields = ("name", "image", "position")
+        else:
+            raise ValueError(f"invalid recipe step: {step!r}")
+        if not all(isinstance(step.get(k), str) for k in fields) or not isinstance(step.get("prep", ""), str):
+            raise ValueError(f"invalid recipe step: {step!r}")
+    data.setdefault("codec", "libx264")
+    data.setdefault("crf", 20)
+    if not isinstance(data["codec"], str):
+        raise ValueError("recipe codec must be a string")
+    crf = data["crf"]
+    if isinstance(crf, bool) or not isinstance(crf, int) or not 0 <= crf <= 63:
+        raise ValueError("recipe crf must be a whole number from 0 to 63")
+    return data
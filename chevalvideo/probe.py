@@ -1,21 +1,62 @@
 """Shells out to ffprobe, returns structured dict."""
 
 import json
+import os
 import subprocess
 
+_CACHE_SIZE = 256
 
-def probe(path: str) -> dict:
-    """Run ffprobe on a file and return parsed JSON output."""
-    cmd = [
+# (abspath, size, mtime_ns) -> parsed ffprobe output
+_cache: dict[tuple, dict] = {}
+
+
+def _cache_key(path: str) -> tuple | None:
+    try:
+        st = os.stat(path)
+        return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    except OSError:
+        return None
+
+
+def probe_cmd(path: str) -> list[str]:
+    """The ffprobe command probe() runs, for callers that run it themselves."""
+    return [
         "ffprobe", "-v", "quiet",
         "-print_format", "json",
         "-show_format", "-show_streams",
         path,
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
+
+
+def remember(path: str, info: dict):
+    """Cache a probe result obtained by running probe_cmd() elsewhere."""
+    key = _cache_key(path)
+    if key is not None:
+        if len(_cache) >= _CACHE_SIZE:
+            del _cache[next(iter(_cache))]
+        _cache[key] = info
+
+
+def cached(path: str) -> dict | None:
+    """The cached probe result for an unchanged file, if there is one."""
+    return _cache.get(_cache_key(path))
+
+
+def probe(path: str) -> dict:
+    """Run ffprobe on a file and return parsed JSON output.
+
+    Results are cached per unchanged file, so pages and the batch estimator
+    can probe the same files repeatedly for free.
+    """
+    info = cached(path)
+    if info is not None:
+        return info
+    result = subprocess.run(probe_cmd(path), capture_output=True, text=True, timeout=15)
     if result.returncode != 0:
         raise RuntimeError(f"ffprobe failed: {result.stderr.strip()}")
-    return json.loads(result.stdout)
+    info = json.loads(result.stdout)
+    remember(path, info)
+    return info
 
 
 def summarize(info: dict) -> dict:
@@ -51,6 +92,31 @@ def get_duration_secs(info: dict) -> float:
     return float(info.get("format", {}).get("duration", 0))
 
 
+def get_video_size(info: dict) -> tuple[int, int]:
+    """Return (width, height) of the first video stream, or (0, 0)."""
+    for s in info.get("streams", []):
+        if s.get("codec_type") == "video":
+            return int(s.get("width", 0)), int(s.get("height", 0))
+    return 0, 0
+
+
+def parse_timestamp(text: str) -> float:
+    """Parse "SS", "MM:SS" or "HH:MM:SS(.ms)" into seconds. Raises ValueError."""
+    secs = 0.0
+    for part in text.strip().split(":"):
+        secs = secs * 60 + float(part)
+    return secs
+
+
+def format_timestamp(secs: float) -> str:
+    """Format seconds as HH:MM:SS.mmm, accepted by ffmpeg -ss/-to."""
+    ms = int(round(secs * 1000))
+    h, rem = divmod(ms, 3_600_000)
+    m, rem = divmod(rem, 60_000)
+    s, ms = divmod(rem, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+
+
 def _fmt_duration(secs: float) -> str:
     h, rem = divmod(int(secs), 3600)
     m, s = divmod(rem, 60)
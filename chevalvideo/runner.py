@@ -1,53 +1,211 @@
 """QProcess wrapper for running ffmpeg/yt-dlp with progress parsing."""
 
+import os
 import re
+import shutil
 import signal
+import time
 
-from PyQt6.QtCore import QObject, QProcess, pyqtSignal
+from PyQt6.QtCore import QObject, QProcess, QTimer, pyqtSignal
+
+from chevalvideo import limits as proc_limits
+from chevalvideo import metrics
+from chevalvideo.scheduler import PRIORITY_NORMAL, RESOURCE_CLASSES, classify, scheduler
+
+STOP_GRACE_MS = 5000   # after SIGINT, time to finalize before SIGTERM
+KILL_GRACE_MS = 3000   # after SIGTERM, time to exit before SIGKILL
+
+# Run each job as its own process group so signals reach helper children
+# (ffmpeg or aria2c under yt-dlp) too; setsid execs in place, keeping the PID.
+_SETSID = shutil.which("setsid")
+
+
+def output_paths(cmd: list[str]) -> list[str]:
+    """Files an ffmpeg command writes: each of its outputs that isn't a pipe, null sink or pattern."""
+    if os.path.basename(cmd[0]) != "ffmpeg" or len(cmd) < 2:
+        return []
+    outs = [cmd[i] for i in proc_limits.output_indexes(cmd)]
+    return [o for o in outs if not (o == "-" or o.startswith("pipe:") or "%" in o)]
+
+
+def _descendants(pid: int) -> list[int]:
+    """All live descendants of `pid`, from /proc (empty where /proc is missing)."""
+    children: dict[int, list[int]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+    for name in entries:
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", encoding="ascii") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
 
 
 class CommandRunner(QObject):
-    """Runs a CLI command via QProcess, parses progress, emits signals."""
+    """Runs a CLI command via QProcess, parses progress, emits signals.
+
+    Commands go through the global scheduler, so run() may only queue the
+    job; is_running() is true from submission until finished is emitted.
+    """
 
     progress = pyqtSignal(float)       # 0.0 – 100.0
     output = pyqtSignal(str)           # raw line of output
     finished = pyqtSignal(bool, str)   # (success, message)
+    metrics = pyqtSignal(dict)         # resource usage, emitted just before finished
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._proc = None
         self._duration = 0.0  # total duration in seconds (for ffmpeg progress)
         self._mode = "ffmpeg"
+        self._cmd: list[str] = []
+        self._sampler: metrics.ProcSampler | None = None
+        self.last_metrics: dict = {}
+        # Per-runner override of the global process limits
+        self.limits: proc_limits.ProcessLimits | None = None
+        # Scheduling: resource class ("" = guess from the command) and priority
+        self.resource = ""
+        self.priority = PRIORITY_NORMAL
+        self._job = None
+        self._outputs: list[str] = []
+        self._stopping = ""        # "", "keep" or "discard"
+        self._escalation: list[signal.Signals] = []
+        self._escalate_timer = QTimer(self)
+        self._escalate_timer.setSingleShot(True)
+        self._escalate_timer.timeout.connect(self._escalate)
+        self._sample_timer = QTimer(self)
+        self._sample_timer.setInterval(metrics.SAMPLE_MS)
+        self._sample_timer.timeout.connect(self._sample)
 
-    def run(self, cmd: list[str], *, duration: float = 0.0):
-        """Start a command. `duration` is used for ffmpeg progress calculation."""
-        if self._proc is not None:
+    def run(self, cmd: list[str], *, duration: float = 0.0,
+            limits: proc_limits.ProcessLimits | None = None,
+            outputs: list[str] | None = None):
+        """Start a command. `duration` is used for ffmpeg progress calculation.
+
+        `limits` overrides this runner's (or the global) priority and thread caps.
+        `outputs` lists the files a discarding cancel deletes; by default the
+        ffmpeg command's output arguments.
+        """
+        if self._job is not None:
             return
 
         self._duration = duration
         self._mode = "yt-dlp" if "yt-dlp" in cmd[0] else "ffmpeg"
+        self._cmd = list(cmd)
+        self._limits = limits or self.limits or proc_limits.defaults()
+        self._outputs = list(outputs) if outputs is not None else output_paths(cmd)
+        self._stopping = ""
+
+        resource = self.resource or classify(cmd)
+        title = f"{os.path.basename(cmd[0])} → {os.path.basename(cmd[-1])}"
+        self._job = scheduler().submit(self, title, resource, self.priority)
+        scheduler().dispatch()
+        if self._job is not None and self._proc is None:
+            self.output.emit(f"Queued — waiting for a free {RESOURCE_CLASSES[resource]} slot")
+
+    def _launch(self):
+        """Called by the scheduler when this runner's job may start."""
+        cmd = self._limits.apply(self._cmd)
+        if _SETSID:
+            cmd = [_SETSID, *cmd]
+        self._sampler = metrics.ProcSampler()
+        self._launched_at = time.time()
 
         self._proc = QProcess(self)
         self._proc.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
         self._proc.readyReadStandardOutput.connect(self._on_output)
         self._proc.finished.connect(self._on_finished)
+        self._proc.started.connect(self._on_started)
+        self._proc.errorOccurred.connect(self._on_error)
 
         self.output.emit(f"$ {' '.join(cmd)}")
         self._proc.start(cmd[0], cmd[1:])
 
-    def cancel(self):
-        """Send SIGTERM to the running process."""
-        if self._proc is not None and self._proc.state() != QProcess.ProcessState.NotRunning:
-            pid = self._proc.processId()
-            if pid:
-                try:
-                    import os
-                    os.kill(pid, signal.SIGTERM)
-                except ProcessLookupError:
-                    pass
+    def cancel(self, *, keep: bool = False):
+        """Stop the job, escalating until the process tree is gone.
+
+        keep=True sends SIGINT first so ffmpeg can finalize a playable partial
+        file, then SIGTERM, then SIGKILL. Otherwise SIGTERM then SIGKILL, and
+        outputs written by this run are deleted. Cancelling again while
+        stopping skips straight to the next signal. A queued job is dropped;
+        its finished signal comes from the event loop, never from inside
+        cancel(), so callers cancelling several runners don't re-enter.
+        """
+        if self._job is not None and self._proc is None:
+            self._release()
+            QTimer.singleShot(0, self._emit_cancelled)
+            return
+        if self._proc is None or self._proc.state() == QProcess.ProcessState.NotRunning:
+            return
+        if self._stopping:
+            self._escalate()
+            return
+        self._stopping = "keep" if keep else "discard"
+        if keep:
+            self.output.emit("Stopping — finalizing partial output...")
+            self._escalation = [signal.SIGINT, signal.SIGTERM, signal.SIGKILL]
+        else:
+            self._escalation = [signal.SIGTERM, signal.SIGKILL]
+        self._escalate()
+
+    def _emit_cancelled(self):
+        self.finished.emit(False, "Cancelled before start")
+
+    def _escalate(self):
+        if not self._escalation or self._proc is None:
+            return
+        sig = self._escalation.pop(0)
+        self._signal(sig)
+        if self._escalation:
+            self._escalate_timer.start(STOP_GRACE_MS if sig == signal.SIGINT else KILL_GRACE_MS)
+
+    def _signal(self, sig: signal.Signals):
+        pid = self._proc.processId()
+        if not pid:
+            return
+        try:
+            if os.getpgid(pid) == pid:
+                os.killpg(pid, sig)
+                return
+        except (ProcessLookupError, PermissionError):
+            return
+        # Not a group leader (no setsid): signal the tree, children first
+        for child in reversed(_descendants(pid)):
+            try:
+                os.kill(child, sig)
+            except (ProcessLookupError, PermissionError):
+                pass
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
 
     def is_running(self) -> bool:
-        return self._proc is not None and self._proc.state() != QProcess.ProcessState.NotRunning
+        return self._job is not None
+
+    def _release(self):
+        job, self._job = self._job, None
+        if job is not None:
+            scheduler().withdraw(self)
+
+    def _on_started(self):
+        self._sampler.attach(self._proc.processId())
+        self._sample_timer.start()
+
+    def _sample(self):
+        if self._sampler is not None:
+            self._sampler.sample()
 
     def _on_output(self):
         data = self._proc.readAllStandardOutput().data().decode(errors="replace")
@@ -58,29 +216,76 @@ class CommandRunner(QObject):
             self.output.emit(line)
             self._parse_progress(line)
 
+    def _set_progress(self, pct: float):
+        if self._job is not None:
+            scheduler().update_progress(self._job, pct)
+        self.progress.emit(pct)
+
     def _parse_progress(self, line: str):
         if self._mode == "yt-dlp":
             m = re.search(r"\[download\]\s+([\d.]+)%", line)
             if m:
-                self.progress.emit(float(m.group(1)))
+                self._set_progress(float(m.group(1)))
         else:
             # ffmpeg progress: look for out_time_us or out_time
             m = re.search(r"out_time_us=(\d+)", line)
             if m and self._duration > 0:
                 current = int(m.group(1)) / 1_000_000
                 pct = min(current / self._duration * 100, 100.0)
-                self.progress.emit(pct)
+                self._set_progress(pct)
                 return
             m = re.search(r"out_time=(\d+):(\d+):([\d.]+)", line)
             if m and self._duration > 0:
                 secs = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
                 pct = min(secs / self._duration * 100, 100.0)
-                self.progress.emit(pct)
+                self._set_progress(pct)
+
+    def _remove_partial_outputs(self) -> int:
+        removed = 0
+        for path in self._outputs:
+            try:
+                # Only files this run wrote; never something older it did not touch
+                if os.path.getmtime(path) >= self._launched_at - 1:
+                    os.remove(path)
+                    self.output.emit(f"Removed partial output: {path}")
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def _on_error(self, error):
+        # A process that never started emits no finished signal of its own
+        if error != QProcess.ProcessError.FailedToStart:
+            return
+        msg = f"Failed to start {self._cmd[0]}: {self._proc.errorString()}"
+        self._proc.deleteLater()
+        self._proc = None
+        self._sampler = None
+        self._release()
+        self.finished.emit(False, msg)
 
     def _on_finished(self, exit_code, _exit_status):
         ok = exit_code == 0
         msg = "Done" if ok else f"Exited with code {exit_code}"
+        self._escalate_timer.stop()
+        self._escalation = []
+        if self._stopping == "keep":
+            kept = [p for p in self._outputs if os.path.exists(p)]
+            msg = "Stopped — kept partial output" + (f": {kept[0]}" if kept else "")
+        elif self._stopping == "discard":
+            removed = self._remove_partial_outputs()
+            msg = "Cancelled" + (" — removed partial output" if removed else "")
+        self._proc.deleteLater()
         self._proc = None
+        self._sample_timer.stop()
+        self.last_metrics = self._sampler.result(self._cmd, ok, exit_code, self._duration)
+        self.last_metrics["limits"] = self._limits.to_dict()
+        self._sampler = None
+        metrics.record(self.last_metrics)
+        self.output.emit(metrics.summarize(self.last_metrics))
+        self.metrics.emit(self.last_metrics)
         if ok:
             self.progress.emit(100.0)
+        # Free the slot first so a follow-up run() from a finished handler can start
+        self._release()
         self.finished.emit(ok, msg)
@@ -0,0 +1,156 @@
+"""Application-wide job scheduler shared by every CommandRunner.
+
+A runner's run() submits a job here instead of starting straight away. Jobs
+belong to a resource class with its own concurrency limit, so a network
+download never waits behind an encode and two stream copies can share the
+disk while CPU-heavy encodes stay capped. Within a class, higher priority
+goes first, then submission order.
+
+A feature that runs its own batch of parallel jobs (chunked interpolation,
+the download queue) can reserve() slots for it: while the reservation is
+held, jobs of runners it owns (their QObject parent) may run up to the slots
+granted, at most max_reservable(), and the caller sizes its work from that.
+Everyone else's jobs of the class still share the base capacity, which the
+owner's running jobs count against.
+"""
+
+import itertools
+import os
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from chevalvideo import limits
+
+RESOURCE_CLASSES = {
+    "cpu": "Encode (CPU)",
+    "io": "Remux / copy (disk)",
+    "net": "Download (network)",
+}
+
+PRIORITY_BACKGROUND = -10
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+_CODEC_FLAGS = ("-c", "-c:v", "-c:a", "-vcodec", "-acodec", "-codec")
+_FILTER_FLAGS = ("-vf", "-af", "-filter:v", "-filter:a", "-filter_complex", "-lavfi")
+
+
+def default_capacity() -> dict[str, int]:
+    # Encoders already multithread; a couple at once keeps cores busy between passes
+    return {"cpu": max(2, limits.cpu_count() // 4), "io": 3, "net": 3}
+
+
+def max_reservable() -> dict[str, int]:
+    """Most slots a single batch may reserve per class."""
+    return {"cpu": limits.cpu_count(), "io": 8, "net": 16}
+
+
+def classify(cmd: list[str]) -> str:
+    """Guess a command's resource class from its arguments."""
+    if "yt-dlp" in os.path.basename(cmd[0]):
+        return "net"
+    codecs = [cmd[i + 1] for i, arg in enumerate(cmd[:-1]) if arg in _CODEC_FLAGS]
+    filtered = any(arg in _FILTER_FLAGS for arg in cmd)
+    if codecs and all(c == "copy" for c in codecs) and not filtered:
+        return "io"
+    return "cpu"
+
+
+class Job:
+    """One submitted run, as shown in the queue panel."""
+
+    def __init__(self, seq: int, runner, title: str, resource: str, priority: int):
+        self.seq = seq
+        self.runner = runner
+        self.owner = runner.parent()
+        self.title = title
+        self.resource = resource
+        self.priority = priority
+        self.state = "Queued"
+        self.progress = 0.0
+
+
+class Scheduler(QObject):
+    """Starts queued runners as their resource class frees up."""
+
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._seq = itertools.count()
+        self._jobs: list[Job] = []
+        self.capacity = default_capacity()
+        self._reservations: dict[object, tuple[str, int]] = {}   # owner -> (resource, slots)
+
+    def jobs(self) -> list[Job]:
+        """Running jobs first, then the queue in dispatch order."""
+        return sorted(self._jobs, key=lambda j: (j.state != "Running", -j.priority, j.seq))
+
+    def running(self, resource: str) -> int:
+        return sum(1 for j in self._jobs if j.resource == resource and j.state == "Running")
+
+    def _may_start(self, job: Job) -> bool:
+        """Whether `job` fits its owner's reservation, or else the class's base capacity."""
+        res = self._reservations.get(job.owner)
+        if res is not None and res[0] == job.resource:
+            mine = sum(1 for j in self._jobs if j.owner is job.owner and j.state == "Running")
+            return mine < res[1]
+        return self.running(job.resource) < self.capacity.get(job.resource, 1)
+
+    def reserve(self, owner, resource: str, n: int) -> int:
+        """Let `owner` run `n` jobs of `resource` at once; returns the slots granted.
+
+        Replaces any earlier reservation by the same owner. Call release()
+        when the batch is over.
+        """
+        granted = max(1, min(n, max_reservable().get(resource, 1)))
+        self._reservations[owner] = (resource, granted)
+        self.dispatch()
+        return granted
+
+    def release(self, owner):
+        if self._reservations.pop(owner, None) is not None:
+            self.dispatch()
+
+    def set_capacity(self, resource: str, n: int):
+        self.capacity[resource] = max(1, n)
+        self.dispatch()
+
+    def set_priority(self, job: Job, priority: int):
+        job.priority = priority
+        self.dispatch()
+
+    def submit(self, runner, title: str, resource: str, priority: int = PRIORITY_NORMAL) -> Job:
+        """Queue a job; the caller runs dispatch() once it has recorded the job."""
+        job = Job(next(self._seq), runner, title, resource, priority)
+        self._jobs.append(job)
+        return job
+
+    def withdraw(self, runner):
+        """Forget a runner's job, queued or finished, and start whatever can run next."""
+        self._jobs = [j for j in self._jobs if j.runner is not runner]
+        self.dispatch()
+
+    def update_progress(self, job: Job, pct: float):
+        job.progress = pct
+        self.changed.emit()
+
+    def dispatch(self):
+        """Start every queued job whose resource class has a free slot."""
+        for job in self.jobs():
+            if job.state != "Queued":
+                continue
+            if self._may_start(job):
+                job.state = "Running"
+                job.runner._launch()
+        self.changed.emit()
+
+
+_scheduler: Scheduler | None = None
+
+
+def scheduler() -> Scheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+    return _scheduler
@@ -0,0 +1,166 @@
+"""Burn subtitles by re-encoding only the GOPs that show them.
+
+Cue spans are widened to the keyframe at or before each start and the
+keyframe at or after each end; nearby spans are merged so no stream-copied
+stretch is shorter than MIN_COPY. Those spans are re-encoded through the
+subtitles filter with the source's codec and pixel format, everything else
+is stream-copied, and the video pieces (MPEG-TS, so each keeps its own
+parameter sets) are joined with the concat demuxer. Audio is copied from
+the original in the same final mux, so it has no seams.
+
+Planning takes two steps so the keyframe scan can run through a
+CommandRunner like any other job: scan() reads the cues and returns the
+ffprobe command, build() turns its output into the burn commands.
+
+Only H.264 and HEVC sources qualify; other codecs, keyframes further apart
+than KEYFRAME_WINDOW or subtitles covering most of the file fall back to a
+normal full burn.
+"""
+
+import math
+import os
+import re
+
+from chevalvideo.subtitles import cue_times
+
+ENCODERS = {"h264": "libx264", "hevc": "libx265"}
+KEYFRAME_WINDOW = 15.0
+MIN_COPY = 2.0
+MAX_ENCODE_FRACTION = 0.6
+CRF = 18
+
+_PACKET_RE = re.compile(r"^(-?\d+(?:\.\d+)?),(\S*)$")   # "pts_time,flags" from keyframes_cmd
+
+
+def keyframes_cmd(path: str, times: list[float]) -> list[str]:
+    """ffprobe listing packets within KEYFRAME_WINDOW of `times`, reading only those stretches."""
+    intervals = ",".join(
+        f"{max(0.0, t - KEYFRAME_WINDOW):.3f}%{t + KEYFRAME_WINDOW:.3f}" for t in times
+    )
+    return [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-read_intervals", intervals,
+        "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", path,
+    ]
+
+
+def parse_keyframes(lines: list[str]) -> list[float]:
+    """Sorted keyframe times from keyframes_cmd output; other lines are ignored."""
+    keys = set()
+    for line in lines:
+        m = _PACKET_RE.match(line.strip())
+        if m and "K" in m.group(2):
+            keys.add(float(m.group(1)))
+    return sorted(keys)
+
+
+def plan(duration: float, cues: list[tuple[float, float]],
+         keyframes: list[float]) -> list[tuple[float, float, bool]] | None:
+    """(start, end, re-encode?) pieces covering the file, or None if some cue
+    has no keyframe within KEYFRAME_WINDOW on either side."""
+    spans = []
+    for start, end in cues:
+        before = [k for k in keyframes if start - KEYFRAME_WINDOW <= k <= start]
+        after = [k for k in keyframes if end <= k <= end + KEYFRAME_WINDOW]
+        a = before[-1] if before else (0.0 if start < KEYFRAME_WINDOW else None)
+        b = after[0] if after else (duration if end > duration - KEYFRAME_WINDOW else None)
+        if a is None or b is None:
+            return None
+        if spans and a - spans[-1][1] < MIN_COPY:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], b))
+        else:
+            spans.append((a, b))
+    if spans and spans[0][0] < MIN_COPY:
+        spans[0] = (0.0, spans[0][1])
+    if spans and duration - spans[-1][1] < MIN_COPY:
+        spans[-1] = (spans[-1][0], duration)
+
+    pieces, pos = [], 0.0
+    for a, b in spans:
+        if a > pos:
+            pieces.append((pos, a, False))
+        pieces.append((a, b, True))
+        pos = b
+    if pos < duration:
+        pieces.append((pos, duration, False))
+    return pieces
+
+
+def _ms(t: float, up: bool) -> str:
+    """Seconds rounded to the millisecond in a chosen direction, for -ss/-t."""
+    return f"{(math.ceil if up else math.floor)(t * 1000) / 1000:.3f}"
+
+
+def video_stream(info: dict) -> dict:
+    for s in info.get("streams", []):
+        if s.get("codec_type") == "video":
+            return s
+    return {}
+
+
+def scan(inp: str, sub_path: str, info: dict) -> tuple[list[str], list[tuple[float, float]], str]:
+    """The keyframe scan a sparse burn needs, and the cue times, or ([], [], why not)."""
+    stream = video_stream(info)
+    if stream.get("codec_name", "") not in ENCODERS:
+        return [], [], f"{stream.get('codec_name', 'no video')} source: sparse burn needs H.264 or HEVC"
+    try:
+        cues = cue_times(sub_path)
+    except (OSError, ValueError) as e:
+        return [], [], f"could not read cue times: {e}"
+    if not cues:
+        return [], [], "no cues found in the subtitle file"
+    return keyframes_cmd(inp, sorted({t for cue in cues for t in cue})), cues, ""
+
+
+def build(inp: str, sub_vf: str, info: dict, duration: float, cues: list[tuple[float, float]],
+          keys: list[float], out_path: str, work_dir: str) -> tuple[list[tuple[str, list[str], float]], str]:
+    """Commands for a sparse burn as (label, cmd, progress duration), plus a note.
+
+    `cues` come from scan() and `keys` from parse_keyframes() on its scan.
+    Pieces keep source timestamps, so every step reports progress as a
+    position in the whole file.
+
+    An empty command list means sparse burning doesn't apply; the note says why.
+    """
+    stream = video_stream(info)
+    encoder = ENCODERS[stream.get("codec_name", "")]
+    pieces = plan(duration, cues, keys)
+    if pieces is None:
+        return [], f"keyframes more than {KEYFRAME_WINDOW:.0f} s apart"
+    encoded = sum(b - a for a, b, enc in pieces if enc)
+    if encoded > MAX_ENCODE_FRACTION * duration:
+        return [], f"subtitles span {encoded / duration:.0%} of the video"
+
+    steps = []
+    listing = []
+    for n, (a, b, enc) in enumerate(pieces):
+        piece = os.path.join(work_dir, f"piece{n:04d}.ts")
+        listing.append(piece)
+        # A copy must seek to the keyframe itself (round up, or the demuxer
+        # lands on the previous one); a decode must not skip it (round down).
+        # -copyts keeps source timestamps so the subtitles filter lines up.
+        cmd = ["ffmpeg", "-y", "-copyts", "-ss", _ms(a, not enc), "-t", _ms(b - a, False),
+               "-i", inp, "-map", "0:v:0", "-an", "-sn", "-dn"]
+        if enc:
+            cmd += ["-vf", sub_vf, "-c:v", encoder, "-crf", str(CRF), "-preset", "medium"]
+            if stream.get("pix_fmt"):
+                cmd += ["-pix_fmt", stream["pix_fmt"]]
+        else:
+            cmd += ["-c:v", "copy"]
+        cmd += ["-f", "mpegts", "-progress", "pipe:1", piece]
+        label = f"{'Encode' if enc else 'Copy'} {a:.1f}–{b:.1f}s"
+        steps.append((label, cmd, duration))
+
+    list_path = os.path.join(work_dir, "pieces.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for piece in listing:
+            escaped = piece.replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    steps.append(("Join", [
+        "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_path, "-i", inp,
+        "-map", "0:v", "-map", "1:a?", "-c", "copy",
+        "-progress", "pipe:1", out_path,
+    ], duration))
+    note = (f"re-encoding {encoded:.0f} s of {duration:.0f} s "
+            f"in {sum(1 for *_, enc in pieces if enc)} spans")
+    return steps, note
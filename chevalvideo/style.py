@@ -136,7 +136,7 @@ QProgressBar::chunk {{
 }}
 
 /* Log output */
-QPlainTextEdit {{
+QPlainTextEdit, QListView#log {{
     background-color: {BLACK};
     border: 1px solid {BORDER};
     border-radius: 0;
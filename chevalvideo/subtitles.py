@@ -0,0 +1,280 @@
+"""Subtitle engine: read, transform and write SRT, WebVTT and ASS/SSA in Python.
+
+Files are read line by line and cues yielded as they complete, so huge
+files never sit in memory twice. Cue text is kept in a neutral markup
+(newlines plus <i>, <b>, <u>); ASS override tags and \\N breaks are
+translated on the way in and out, anything else is dropped. ASS headers
+(script info and styles) are carried through when writing ASS again.
+"""
+
+import re
+from pathlib import Path
+
+from chevalvideo.probe import parse_timestamp
+
+FORMATS = ("srt", "vtt", "ass")
+
+# Subtitle codecs ffmpeg can re-encode to any text format; bitmap ones can
+# only be copied, into the container that holds them best (Matroska as .mkv:
+# ffmpeg doesn't pick a muxer for .mks).
+TEXT_CODECS = {"subrip", "srt", "ass", "ssa", "webvtt", "mov_text", "text", "microdvd", "subviewer"}
+BITMAP_EXTENSIONS = {"hdmv_pgs_subtitle": "sup", "dvd_subtitle": "mkv", "dvb_subtitle": "mkv"}
+
+_ARROW_RE = re.compile(
+    r"((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})"
+)
+_TAG_RE = re.compile(r"</?([a-zA-Z]+)[^>]*>")
+_ASS_OVERRIDE_RE = re.compile(r"\{([^}]*)\}")
+_STYLE_TAGS = {"i", "b", "u"}
+_VTT_TIMESTAMP_RE = re.compile(r"<\d[\d:.]*>")
+
+DEFAULT_ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: 384
+PlayResY: 288
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,16,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,1,0,2,10,10,10,1
+"""
+_ASS_EVENTS_FORMAT = "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"
+
+
+class Cue:
+    """One subtitle event; `text` uses newlines and <i>/<b>/<u> markup."""
+
+    __slots__ = ("start", "end", "text", "style")
+
+    def __init__(self, start: float, end: float, text: str, style: str = "Default"):
+        self.start = start
+        self.end = end
+        self.text = text
+        self.style = style
+
+    def __repr__(self):
+        return f"Cue({self.start:.3f}, {self.end:.3f}, {self.text!r})"
+
+
+def _secs(text: str) -> float:
+    return parse_timestamp(text.replace(",", "."))
+
+
+def detect_format(path: str) -> str:
+    """srt, vtt or ass, from the extension or, failing that, the first lines."""
+    ext = Path(path).suffix.lower().lstrip(".")
+    if ext in ("ass", "ssa"):
+        return "ass"
+    if ext in FORMATS:
+        return ext
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        head = f.read(4096)
+    if head.startswith("WEBVTT"):
+        return "vtt"
+    if "[Script Info]" in head or "[Events]" in head:
+        return "ass"
+    return "srt"
+
+
+# ── Markup ──
+
+def _from_html(text: str) -> str:
+    """SRT/VTT tags to neutral markup: keep i/b/u, drop voice, class, font and the rest."""
+    return _TAG_RE.sub(lambda m: m.group(0) if m.group(1).lower() in _STYLE_TAGS else "", text)
+
+
+def _from_ass(text: str) -> str:
+    def override(m):
+        out = []
+        for tag in m.group(1).split("\\"):
+            if len(tag) == 2 and tag[0] in _STYLE_TAGS and tag[1] in "01":
+                out.append(f"<{'' if tag[1] == '1' else '/'}{tag[0]}>")
+        return "".join(out)
+    text = _ASS_OVERRIDE_RE.sub(override, text)
+    return text.replace("\\N", "\n").replace("\\n", "\n").replace("\\h", " ")
+
+
+def _to_ass(text: str) -> str:
+    text = _TAG_RE.sub(
+        lambda m: (f"{{\\{m.group(1).lower()}{'0' if m.group(0).startswith('</') else '1'}}}"
+                   if m.group(1).lower() in _STYLE_TAGS else ""),
+        text,
+    )
+    return text.replace("\n", "\\N")
+
+
+# ── Reading ──
+
+def _read_blocks(f):
+    """Blank-line separated blocks of stripped lines."""
+    block = []
+    for line in f:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            block.append(line)
+        elif block:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def _iter_srt_vtt(f, vtt: bool):
+    for block in _read_blocks(f):
+        for i, line in enumerate(block):
+            m = _ARROW_RE.search(line)
+            if m:
+                text = "\n".join(block[i + 1:])
+                start, end = _secs(m.group(1)), _secs(m.group(2))
+                if vtt:
+                    text = _VTT_TIMESTAMP_RE.sub("", text)
+                if end > start and text:
+                    yield Cue(start, end, _from_html(text))
+                break
+        # WEBVTT header, NOTE, STYLE and REGION blocks have no timing line
+
+
+def _iter_ass(f, header: list[str] | None):
+    fields = ["Layer", "Start", "End", "Style", "Name", "MarginL", "MarginR", "MarginV", "Effect", "Text"]
+    in_events = False
+    for line in f:
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
+        if stripped.startswith("["):
+            in_events = stripped.lower() == "[events]"
+        if not in_events:
+            if header is not None:
+                header.append(line)
+            continue
+        if stripped.startswith("Format:"):
+            fields = [x.strip() for x in stripped[7:].split(",")]
+        elif stripped.startswith("Dialogue:"):
+            values = stripped[9:].split(",", len(fields) - 1)
+            if len(values) < len(fields):
+                continue
+            row = dict(zip(fields, (v.strip() if k != "Text" else v for k, v in zip(fields, values))))
+            start, end = _secs(row["Start"]), _secs(row["End"])
+            if end > start:
+                yield Cue(start, end, _from_ass(row["Text"]), row.get("Style", "Default") or "Default")
+
+
+def iter_cues(path: str, fmt: str = "", header: list[str] | None = None):
+    """Yield cues in file order. For ASS, `header` collects the lines before [Events]."""
+    fmt = fmt or detect_format(path)
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        if fmt == "ass":
+            yield from _iter_ass(f, header)
+        else:
+            yield from _iter_srt_vtt(f, fmt == "vtt")
+
+
+def read(path: str, fmt: str = "") -> tuple[list[Cue], str]:
+    """All cues plus the ASS header text ("" for SRT/VTT)."""
+    header: list[str] = []
+    cues = list(iter_cues(path, fmt, header))
+    return cues, "\n".join(header).strip()
+
+
+def cue_times(path: str) -> list[tuple[float, float]]:
+    """(start, end) of every cue, sorted. Raises OSError/ValueError."""
+    return sorted((c.start, c.end) for c in iter_cues(path))
+
+
+# ── Transforms ──
+
+def shift(cues, secs: float):
+    """Move every cue by `secs`; cues pushed entirely before 0 are dropped."""
+    for c in cues:
+        if c.end + secs > 0:
+            yield Cue(max(0.0, c.start + secs), c.end + secs, c.text, c.style)
+
+
+def retime(cues, from_fps: float, to_fps: float):
+    """Rescale times for a frame-rate change, e.g. 23.976 -> 25 for a PAL speed-up."""
+    factor = from_fps / to_fps
+    for c in cues:
+        yield Cue(c.start * factor, c.end * factor, c.text, c.style)
+
+
+def merge(*tracks) -> list[Cue]:
+    """All cues of several tracks in time order."""
+    return sorted((c for track in tracks for c in track), key=lambda c: (c.start, c.end))
+
+
+def dedupe(cues: list[Cue], tolerance: float = 0.05) -> list[Cue]:
+    """Drop cues repeating the text of an earlier cue at (nearly) the same time.
+
+    Overlapping or touching repeats of the same line are joined into one cue.
+    """
+    out: list[Cue] = []
+    recent: dict[str, Cue] = {}
+    for c in sorted(cues, key=lambda c: (c.start, c.end)):
+        key = c.text.strip()
+        prev = recent.get(key)
+        if prev is not None and c.start <= prev.end + tolerance:
+            prev.end = max(prev.end, c.end)
+            continue
+        c = Cue(c.start, c.end, c.text, c.style)
+        recent[key] = c
+        out.append(c)
+    return out
+
+
+# ── Writing ──
+
+def format_time(secs: float, fmt: str) -> str:
+    if fmt == "ass":
+        cs = int(round(max(secs, 0.0) * 100))
+        h, rem = divmod(cs, 360_000)
+        m, rem = divmod(rem, 6000)
+        s, cs = divmod(rem, 100)
+        return f"{h}:{m:02d}:{s:02d}.{cs:02d}"
+    ms = int(round(max(secs, 0.0) * 1000))
+    h, rem = divmod(ms, 3_600_000)
+    m, rem = divmod(rem, 60_000)
+    s, ms = divmod(rem, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{',' if fmt == 'srt' else '.'}{ms:03d}"
+
+
+def write(path: str, cues, fmt: str = "", ass_header: str = "") -> int:
+    """Write cues (any iterable) to `path`; returns how many were written."""
+    fmt = fmt or detect_format(path)
+    n = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        if fmt == "vtt":
+            f.write("WEBVTT\n\n")
+        elif fmt == "ass":
+            f.write((ass_header or DEFAULT_ASS_HEADER).rstrip() + "\n\n[Events]\n" + _ASS_EVENTS_FORMAT + "\n")
+        for c in cues:
+            n += 1
+            start, end = format_time(c.start, fmt), format_time(c.end, fmt)
+            if fmt == "ass":
+                f.write(f"Dialogue: 0,{start},{end},{c.style},,0,0,0,,{_to_ass(c.text)}\n")
+            elif fmt == "vtt":
+                f.write(f"{start} --> {end}\n{c.text}\n\n")
+            else:
+                f.write(f"{n}\n{start} --> {end}\n{c.text}\n\n")
+    return n
+
+
+def convert(src: str, dst: str, *, offset: float = 0.0, fps: tuple[float, float] | None = None,
+            extra: list[str] = (), dedup: bool = False) -> int:
+    """Read `src` (plus `extra` tracks to merge), transform, and write `dst` in its format.
+
+    Streams straight through unless merging or deduplicating needs every cue at once.
+    """
+    fmt = detect_format(dst)
+    header: list[str] = []
+    cues = iter_cues(src, "", header)
+    if extra or dedup:
+        cues = merge(cues, *(iter_cues(p) for p in extra))
+        if dedup:
+            cues = dedupe(cues)
+    if fps:
+        cues = retime(cues, *fps)
+    if offset:
+        cues = shift(cues, offset)
+    if fmt != "ass":
+        return write(dst, cues, fmt)
+    # The source's ASS header is only complete once its [Events] section is reached
+    cues = list(cues)
+    return write(dst, cues, fmt, "\n".join(header).strip())
@@ -0,0 +1,356 @@
+"""Hot folders — ingest files dropped into watched directories through a Batch operation.
+
+Directories are watched with QFileSystemWatcher (inotify on Linux) and also
+re-scanned on a timer, since network shares often deliver no change events.
+A file is only picked up once its size and mtime have stayed unchanged for
+STABLE_SECS, so half-copied camera cards are left alone. Only top-level
+files are considered; outputs go to an output/ subfolder by default.
+
+Every finished input is recorded in a per-directory ledger
+(LEDGER_NAME, one "name<TAB>size<TAB>mtime_ns<TAB>status" line each) and, in
+"move" mode, moved into processed/ or failed/.
+
+Headless:  python -m chevalvideo watch DIR [DIR...] --op Convert --set convert_crf=20
+"""
+
+import argparse
+import os
+import shutil
+import signal
+import sys
+import time
+from pathlib import Path
+
+from PyQt6.QtCore import QCoreApplication, QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+from chevalvideo import batchops, detect, loudnorm
+from chevalvideo.runner import CommandRunner
+
+STABLE_SECS = 5.0
+SETTLE_POLL_MS = 1000    # while some file is still settling
+IDLE_POLL_MS = 10_000    # fallback rescan when nothing is pending
+LEDGER_NAME = ".chevalvideo-ingested"
+OUTPUT_DIR = "output"
+PROCESSED_DIR = "processed"
+FAILED_DIR = "failed"
+AFTER_MODES = ("move", "mark")
+
+
+def _ledger_key(name: str, st: os.stat_result) -> str:
+    return f"{name}\t{st.st_size}\t{st.st_mtime_ns}"
+
+
+class WatchFolder(QObject):
+    """Watches directories and runs one Batch operation on each new, settled file."""
+
+    output = pyqtSignal(str)
+    file_started = pyqtSignal(str)
+    file_done = pyqtSignal(str, bool, str)   # (input path, success, message)
+
+    def __init__(self, op: str, options: dict | None = None, *, parallel: int = 2,
+                 after: str = "move", output_dir: str = "", suffix: str = "",
+                 poll_only: bool = False, parent=None):
+        super().__init__(parent)
+        if op not in batchops.OPERATIONS:
+            raise ValueError(f"unknown operation: {op!r}")
+        if after not in AFTER_MODES:
+            raise ValueError(f"after must be one of {AFTER_MODES}")
+        self.op = op
+        self.options = dict(options or {})
+        self.parallel = max(1, parallel)
+        self.after = after
+        self.output_dir = output_dir
+        self.suffix = suffix
+        self._dirs: list[str] = []
+        self._ledgers: dict[str, set[str]] = {}
+        self._candidates: dict[str, tuple[int, int, float]] = {}
+        self._claimed: set[str] = set()
+        self._queue: list[str] = []
+        self._active: dict[CommandRunner, str] = {}
+        self._measuring: dict[CommandRunner, list[str]] = {}
+        self._active_flag = False
+
+        self._watcher = None if poll_only else QFileSystemWatcher(self)
+        if self._watcher is not None:
+            self._watcher.directoryChanged.connect(lambda _d: self._scan())
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._scan)
+
+    def dirs(self) -> list[str]:
+        return list(self._dirs)
+
+    def is_active(self) -> bool:
+        return self._active_flag
+
+    def add_dir(self, path: str):
+        path = os.path.abspath(path)
+        if path in self._dirs:
+            return
+        if self.output_dir and os.path.abspath(self.output_dir) == path:
+            raise ValueError("output folder must not be a watched folder")
+        self._dirs.append(path)
+        self._ledgers[path] = self._load_ledger(path)
+        if self._active_flag and self._watcher is not None:
+            self._watcher.addPath(path)
+
+    def start(self):
+        if self._active_flag:
+            return
+        self._active_flag = True
+        if self._watcher is not None and self._dirs:
+            self._watcher.addPaths(self._dirs)
+        self.output.emit(
+            f"Watching {len(self._dirs)} folder(s): {self.op}, {self.parallel} at a time, "
+            f"{'moving' if self.after == 'move' else 'marking'} finished inputs"
+        )
+        self._scan()
+
+    def stop(self):
+        """Stop watching; running jobs are cancelled and picked up again next start."""
+        self._active_flag = False
+        self._timer.stop()
+        if self._watcher is not None and self._watcher.directories():
+            self._watcher.removePaths(self._watcher.directories())
+        self._claimed.difference_update(self._queue)
+        self._queue.clear()
+        self._candidates.clear()
+        for runner in list(self._active) + list(self._measuring):
+            runner.cancel()
+        self.output.emit("Stopped watching")
+
+    # ── Discovery ──
+
+    @staticmethod
+    def _load_ledger(folder: str) -> set[str]:
+        try:
+            with open(os.path.join(folder, LEDGER_NAME), encoding="utf-8") as f:
+                return {line.rsplit("\t", 1)[0] for line in f if line.strip()}
+        except OSError:
+            return set()
+
+    def _scan(self):
+        if not self._active_flag:
+            return
+        now = time.monotonic()
+        for folder in self._dirs:
+            try:
+                entries = list(os.scandir(folder))
+            except OSError as e:
+                self.output.emit(f"Cannot read {folder}: {e}")
+                continue
+            for entry in entries:
+                if (entry.name.startswith(".") or not entry.is_file()
+                        or Path(entry.name).suffix.lower() not in batchops.VIDEO_EXTENSIONS
+                        or entry.path in self._claimed):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if _ledger_key(entry.name, st) in self._ledgers[folder]:
+                    continue
+                prev = self._candidates.get(entry.path)
+                if prev is None or prev[:2] != (st.st_size, st.st_mtime_ns):
+                    # New or still growing: (re)start the settle clock
+                    self._candidates[entry.path] = (st.st_size, st.st_mtime_ns, now)
+                elif now - prev[2] >= STABLE_SECS and st.st_size > 0:
+                    del self._candidates[entry.path]
+                    self._claimed.add(entry.path)
+                    self._queue.append(entry.path)
+                    self.output.emit(f"Queued: {entry.name}")
+        # Forget candidates that vanished before settling
+        for path in [p for p in self._candidates if not os.path.exists(p)]:
+            del self._candidates[path]
+        self._timer.start(SETTLE_POLL_MS if self._candidates else IDLE_POLL_MS)
+        self._fill()
+
+    # ── Processing ──
+
+    def _busy(self) -> int:
+        return len(self._active) + len(self._measuring)
+
+    def _out_dir(self, path: str) -> str:
+        out = self.output_dir or os.path.join(os.path.dirname(path), OUTPUT_DIR)
+        os.makedirs(out, exist_ok=True)
+        return out
+
+    def _fill(self):
+        while self._queue and self._busy() < self.parallel:
+            path = self._queue.pop(0)
+            self.file_started.emit(path)
+            if self.op == "Normalize Audio" and loudnorm.cached(path, self._lufs()) is None:
+                self._start_measure(path)
+            elif self.op in batchops.DETECT_OPERATIONS and batchops.detection(path, self.options) is None:
+                self._start_detect(path)
+            else:
+                self._start_job(path)
+
+    def _lufs(self) -> float:
+        return {**batchops.DEFAULT_OPTIONS, **self.options}["lufs"]
+
+    def _start_measure(self, path: str):
+        runner = CommandRunner(self)
+        lines: list[str] = []
+        runner.output.connect(lines.append)
+        runner.finished.connect(lambda ok, msg, r=runner, p=path: self._on_measured(r, p, ok, msg))
+        self._measuring[runner] = lines
+        self.output.emit(f"Measuring loudness: {Path(path).name}")
+        runner.run(loudnorm.measure_cmd(path, self._lufs()))
+
+    def _on_measured(self, runner: CommandRunner, path: str, ok: bool, msg: str):
+        lines = self._measuring.pop(runner)
+        runner.deleteLater()
+        if not self._active_flag:
+            self._claimed.discard(path)
+            return
+        data = loudnorm.parse_measurement(lines) if ok else None
+        if data is None:
+            self._finish(path, False, f"loudness measurement failed: {msg}")
+            return
+        loudnorm.store(path, data, self._lufs())
+        self._start_job(path)
+
+    def _detect_params(self) -> tuple[float, float, bool]:
+        opts = {**batchops.DEFAULT_OPTIONS, **self.options}
+        return opts["black_min"], opts["silence_db"], bool(opts["detect_fast"])
+
+    def _start_detect(self, path: str):
+        try:
+            det, cmd = detect.prepare(path, *self._detect_params())
+        except (RuntimeError, ValueError, OSError) as e:
+            self._finish(path, False, f"detection failed: {e}")
+            return
+        runner = CommandRunner(self)
+        lines: list[str] = []
+        runner.output.connect(lines.append)
+        runner.finished.connect(
+            lambda ok, msg, r=runner, p=path, d=det: self._on_detected(r, p, d, ok, msg)
+        )
+        self._measuring[runner] = lines
+        self.output.emit(f"Detecting black/silence: {Path(path).name}")
+        runner.run(cmd)
+
+    def _on_detected(self, runner: CommandRunner, path: str, det, ok: bool, msg: str):
+        lines = self._measuring.pop(runner)
+        runner.deleteLater()
+        if not self._active_flag:
+            self._claimed.discard(path)
+            return
+        if not ok:
+            self._finish(path, False, f"detection failed: {msg}")
+            return
+        detect.parse_detection(lines, det)
+        detect.store(path, det, *self._detect_params())
+        self._start_job(path)
+
+    def _start_job(self, path: str):
+        if not self._active_flag:
+            self._claimed.discard(path)
+            return
+        try:
+            cmd = batchops.build_command(self.op, path, self.options, self._out_dir(path), self.suffix)
+        except (OSError, RuntimeError, ValueError) as e:
+            self._finish(path, False, str(e))
+            return
+        if cmd is None:
+            reason = ("nothing but black/silence detected" if self.op in batchops.DETECT_OPERATIONS
+                      else "no command for this operation")
+            self._finish(path, False, reason)
+            return
+        runner = CommandRunner(self)
+        runner.output.connect(self._on_job_output)
+        runner.finished.connect(lambda ok, msg, r=runner: self._on_job_done(r, ok, msg))
+        self._active[runner] = path
+        self.output.emit(f"--- {Path(path).name} ---")
+        runner.run(cmd)
+
+    def _on_job_output(self, line: str):
+        # -progress key=value lines would swamp the log
+        if "=" in line and " " not in line:
+            return
+        self.output.emit(line)
+
+    def _on_job_done(self, runner: CommandRunner, ok: bool, msg: str):
+        path = self._active.pop(runner)
+        runner.deleteLater()
+        if not self._active_flag:
+            # Stopped mid-job: leave the input unmarked so it is retried
+            self._claimed.discard(path)
+            return
+        self._finish(path, ok, msg)
+
+    def _finish(self, path: str, ok: bool, msg: str):
+        folder, name = os.path.split(path)
+        try:
+            st = os.stat(path)
+            key = _ledger_key(name, st)
+            with open(os.path.join(folder, LEDGER_NAME), "a", encoding="utf-8") as f:
+                f.write(f"{key}\t{'ok' if ok else 'failed'}\n")
+            self._ledgers.setdefault(folder, set()).add(key)
+        except OSError as e:
+            self.output.emit(f"Could not record {name}: {e}")
+        if self.after == "move":
+            dest = os.path.join(folder, PROCESSED_DIR if ok else FAILED_DIR)
+            try:
+                os.makedirs(dest, exist_ok=True)
+                shutil.move(path, os.path.join(dest, name))
+            except OSError as e:
+                self.output.emit(f"Could not move {name}: {e}")
+        self._claimed.discard(path)
+        self.output.emit(f"{name}: {msg if ok else 'FAILED — ' + msg}")
+        self.file_done.emit(path, ok, msg)
+        self._fill()
+
+
+# ── Headless ──
+
+def run_headless(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m chevalvideo watch",
+        description="Watch folders and run a Batch operation on every new file.",
+    )
+    parser.add_argument("dirs", nargs="+", help="folders to watch")
+    parser.add_argument("--op", default="Convert", choices=batchops.OPERATIONS)
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help=f"operation option; keys: {', '.join(batchops.DEFAULT_OPTIONS)}")
+    parser.add_argument("--parallel", type=int, default=2)
+    parser.add_argument("--after", choices=AFTER_MODES, default="move",
+                        help="move inputs to processed/ and failed/, or only mark them in the ledger")
+    parser.add_argument("--output", default="", help=f"output folder (default: <dir>/{OUTPUT_DIR})")
+    parser.add_argument("--suffix", default="")
+    parser.add_argument("--poll", action="store_true", help="poll only, no inotify")
+    args = parser.parse_args(argv)
+
+    options = {}
+    for item in args.set:
+        key, _, value = item.partition("=")
+        try:
+            options[key] = batchops.coerce_option(key, value)
+        except (KeyError, ValueError):
+            parser.error(f"bad option: {item}")
+
+    app = QCoreApplication(sys.argv[:1])
+    try:
+        watch = WatchFolder(args.op, options, parallel=args.parallel, after=args.after,
+                            output_dir=args.output, suffix=args.suffix, poll_only=args.poll)
+        for d in args.dirs:
+            if not os.path.isdir(d):
+                parser.error(f"not a directory: {d}")
+            watch.add_dir(d)
+    except ValueError as e:
+        parser.error(str(e))
+    watch.output.connect(lambda line: print(line, flush=True))
+
+    def _quit(*_):
+        watch.stop()
+        app.quit()
+
+    signal.signal(signal.SIGINT, _quit)
+    signal.signal(signal.SIGTERM, _quit)
+    # Python signal handlers only run when the interpreter gets control back
+    wake = QTimer()
+    wake.timeout.connect(lambda: None)
+    wake.start(500)
+
+    watch.start()
+    return app.exec()
@@ -0,0 +1,178 @@
+"""Watermark assets rendered once, then overlaid as-is.
+
+The logo is scaled to a share of the *video's* width and given its
+opacity in a one-frame ffmpeg run; static text is rasterized with Qt.
+Both are cached as PNGs under cache_dir("watermarks"), keyed by source
+and target size, so a batch over files of the same resolution renders
+each asset once and every encode runs nothing but a plain overlay.
+Text falls back to drawtext where there is no GUI (headless watch folders).
+
+Assets keep straight alpha: overlay onto YUV video has no exact
+premultiplied chroma path, and a one-frame input is only converted once.
+"""
+
+import hashlib
+import os
+import subprocess
+
+from PyQt6.QtCore import QCoreApplication, Qt
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QGuiApplication, QImage, QPainter
+
+from chevalvideo.paths import cache_dir
+from chevalvideo.probe import get_video_size, probe
+
+POSITIONS = ["top-left", "top-right", "center", "bottom-left", "bottom-right"]
+
+
+def overlay_xy(position: str, pad: int) -> str:
+    """overlay x:y expression for a named position."""
+    positions = {
+        "top-left": (f"{pad}", f"{pad}"),
+        "top-right": (f"main_w-overlay_w-{pad}", f"{pad}"),
+        "center": ("(main_w-overlay_w)/2", "(main_h-overlay_h)/2"),
+        "bottom-left": (f"{pad}", f"main_h-overlay_h-{pad}"),
+        "bottom-right": (f"main_w-overlay_w-{pad}", f"main_h-overlay_h-{pad}"),
+    }
+    x, y = positions.get(position, positions["bottom-right"])
+    return f"{x}:{y}"
+
+
+def drawtext_xy(position: str, pad: int) -> tuple[str, str]:
+    """drawtext x, y expressions for a named position."""
+    positions = {
+        "top-left": (f"{pad}", f"{pad}"),
+        "top-right": (f"w-tw-{pad}", f"{pad}"),
+        "center": ("(w-tw)/2", "(h-th)/2"),
+        "bottom-left": (f"{pad}", f"h-th-{pad}"),
+        "bottom-right": (f"w-tw-{pad}", f"h-th-{pad}"),
+    }
+    return positions.get(position, positions["bottom-right"])
+
+
+def drawtext_filter(text: str, font_size: int, color: str, position: str, pad: int,
+                    box_color: str = "") -> str:
+    """drawtext filter drawing `text` on every frame (the fallback to text_asset)."""
+    x_expr, y_expr = drawtext_xy(position, pad)
+    # Escape special characters for ffmpeg drawtext
+    escaped = text.replace("\\", "\\\\\\\\")
+    escaped = escaped.replace("'", "\u2019")
+    escaped = escaped.replace(":", "\\:")
+    escaped = escaped.replace("%", "%%")
+    drawtext = (
+        f"drawtext=text='{escaped}'"
+        f":fontsize={font_size}"
+        f":fontcolor={color}"
+        f":x={x_expr}:y={y_expr}"
+    )
+    if box_color:
+        drawtext += f":box=1:boxcolor={box_color}:boxborderw={pad // 2}"
+    return drawtext
+
+
+def logo_width(video_width: int, scale_pct: float) -> int:
+    """Logo width in pixels for `scale_pct` percent of the video width (even, >= 2)."""
+    return max(2, int(video_width * scale_pct / 100) // 2 * 2)
+
+
+def _asset_path(*key) -> str:
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:20]
+    return str(cache_dir("watermarks") / f"{digest}.png")
+
+
+def _filter_path(path: str) -> str:
+    return path.replace("\\", "/").replace(":", "\\:")
+
+
+def logo_asset(src: str, width: int, opacity: float) -> str:
+    """Path of `src` scaled to `width` px at `opacity`, rendering it on first use.
+
+    Raises OSError if `src` is missing, RuntimeError if ffmpeg can't render it.
+    """
+    st = os.stat(src)
+    path = _asset_path("logo", os.path.abspath(src), st.st_size, st.st_mtime_ns, width, round(opacity, 3))
+    if os.path.exists(path):
+        return path
+    chain = f"scale={width}:-1,format=rgba"
+    if opacity < 1.0:
+        chain += f",colorchannelmixer=aa={opacity:.3f}"
+    tmp = path + ".tmp.png"
+    cmd = ["ffmpeg", "-v", "error", "-y", "-i", src, "-vf", chain, "-frames:v", "1", tmp]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.SubprocessError) as e:
+        raise RuntimeError(f"could not render watermark: {e}") from e
+    if result.returncode != 0 or not os.path.exists(tmp):
+        raise RuntimeError(f"could not render watermark: {result.stderr.strip()}")
+    os.replace(tmp, path)
+    return path
+
+
+def _qcolor(spec: str) -> QColor:
+    """QColor from an ffmpeg colour like "#ffffff", "white", "0xff0000" or "#000000@0.5"."""
+    name, _, alpha = spec.strip().partition("@")
+    if name.lower().startswith("0x"):
+        name = "#" + name[2:]
+    color = QColor(name)
+    if not color.isValid():
+        raise ValueError(f"unknown colour: {spec}")
+    if alpha:
+        color.setAlphaF(max(0.0, min(1.0, float(alpha))))
+    return color
+
+
+def text_asset(text: str, font_size: int, color: str, box_color: str = "", pad: int = 0) -> str | None:
+    """Path of `text` rasterized tight to its box, or None without a GUI application.
+
+    Raises ValueError on an unknown colour, OSError if the PNG can't be written.
+    """
+    if not isinstance(QCoreApplication.instance(), QGuiApplication):
+        return None   # fonts need a GUI application
+    border = pad // 2 if box_color else 0
+    path = _asset_path("text", text, font_size, color, box_color, border)
+    if os.path.exists(path):
+        return path
+    font = QFont("Sans")
+    font.setPixelSize(font_size)
+    metrics = QFontMetrics(font)
+    width = metrics.horizontalAdvance(text) + 2 * border
+    height = metrics.height() + 2 * border
+    image = QImage(max(width, 1), max(height, 1), QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(_qcolor(box_color) if box_color else QColor(Qt.GlobalColor.transparent))
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+    painter.setFont(font)
+    painter.setPen(_qcolor(color))
+    painter.drawText(border, border + metrics.ascent(), text)
+    painter.end()
+    tmp = path + ".tmp.png"
+    if not image.save(tmp, "PNG"):
+        raise OSError(f"could not write {tmp}")
+    os.replace(tmp, path)
+    return path
+
+
+def overlay_filter(asset: str, position: str, pad: int) -> str:
+    """-vf graph overlaying a ready-made asset; the asset is read once and repeated."""
+    return f"movie={_filter_path(asset)}[wm];[in][wm]overlay={overlay_xy(position, pad)}[out]"
+
+
+def video_filter(inp: str, opts: dict) -> str:
+    """-vf for the batch Watermark operation on `inp`, rendering assets as needed.
+
+    Uses the image when `wm_image` is set, otherwise the text. Raises
+    ValueError if neither is set, RuntimeError/OSError if rendering fails.
+    """
+    position, pad = opts["wm_position"], int(opts["wm_padding"])
+    if opts["wm_image"]:
+        video_w, _ = get_video_size(probe(inp))
+        if not video_w:
+            raise RuntimeError("no video stream")
+        asset = logo_asset(opts["wm_image"], logo_width(video_w, opts["wm_scale"]), opts["wm_opacity"])
+        return overlay_filter(asset, position, pad)
+    text = opts["wm_text"].strip()
+    if not text:
+        raise ValueError("watermark needs an image or some text")
+    asset = text_asset(text, int(opts["wm_font_size"]), opts["wm_color"], opts["wm_box"], pad)
+    if asset is None:
+        return drawtext_filter(text, int(opts["wm_font_size"]), opts["wm_color"], position, pad, opts["wm_box"])
+    return overlay_filter(asset, position, pad)
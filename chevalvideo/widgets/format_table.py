@@ -0,0 +1,149 @@
+"""Virtualized yt-dlp format table — model over the raw format dicts."""
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+COLUMNS = ["ID", "Ext", "Resolution", "FPS", "Codec", "Bitrate", "Size", "Note"]
+
+
+def _codec(f: dict) -> str:
+    vcodec = f.get("vcodec") or "none"
+    acodec = f.get("acodec") or "none"
+    codec = ""
+    if vcodec != "none":
+        codec += vcodec.split(".")[0]
+    if acodec != "none":
+        codec += (" + " if codec else "") + acodec.split(".")[0]
+    return codec
+
+
+def _resolution(f: dict) -> str:
+    if f.get("width"):
+        return f"{f.get('width', '?')}x{f.get('height', '?')}"
+    if f.get("acodec") and f.get("acodec") != "none":
+        return "audio"
+    return ""
+
+
+def _size(f: dict) -> float:
+    return f.get("filesize") or f.get("filesize_approx") or 0
+
+
+# Numeric sort keys per column; text columns sort by display string
+_SORT_KEYS = {
+    2: lambda f: (f.get("width") or 0) * (f.get("height") or 0),
+    3: lambda f: f.get("fps") or 0,
+    5: lambda f: f.get("tbr") or 0,
+    6: _size,
+}
+
+
+class FormatTableModel(QAbstractTableModel):
+    """Formats are kept as the parsed dicts; cells are computed only when painted.
+
+    Sorting and codec/extension filtering reorder a list of row indices, so
+    the view stays flat regardless of how many formats are loaded.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._formats: list[dict] = []
+        self._rows: list[int] = []
+        self._codec_filter = ""
+        self._ext_filter = ""
+        self._sort_col = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+
+    def set_formats(self, formats: list[dict]):
+        self.beginResetModel()
+        self._formats = formats
+        self._rebuild()
+        self.endResetModel()
+
+    def set_filter(self, codec: str = "", ext: str = ""):
+        self.beginResetModel()
+        self._codec_filter = codec.strip().lower()
+        self._ext_filter = ext.strip().lower()
+        self._rebuild()
+        self.endResetModel()
+
+    def extensions(self) -> list[str]:
+        return sorted({f.get("ext", "") for f in self._formats if f.get("ext")})
+
+    def format_at(self, row: int) -> dict | None:
+        if 0 <= row < len(self._rows):
+            return self._formats[self._rows[row]]
+        return None
+
+    def _rebuild(self):
+        rows = range(len(self._formats))
+        if self._codec_filter:
+            rows = [i for i in rows if self._codec_filter in _codec(self._formats[i]).lower()]
+        if self._ext_filter:
+            rows = [i for i in rows if self._formats[i].get("ext", "").lower() == self._ext_filter]
+        self._rows = list(rows)
+        if self._sort_col >= 0:
+            self._apply_sort()
+
+    def _apply_sort(self):
+        key = _SORT_KEYS.get(self._sort_col)
+        if key is None:
+            col = self._sort_col
+            key = lambda f: self._display(f, col).lower()  # noqa: E731
+        self._rows.sort(
+            key=lambda i: key(self._formats[i]),
+            reverse=self._sort_order == Qt.SortOrder.DescendingOrder,
+        )
+
+    # ── QAbstractTableModel ──
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self._display(self._formats[self._rows[index.row()]], index.column())
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        old = self.persistentIndexList()
+        sources = [(self._rows[i.row()], i.column()) for i in old]
+        self._sort_col = column
+        self._sort_order = order
+        self._apply_sort()
+        # Keep the view's selection on the same formats after reordering
+        position = {src: row for row, src in enumerate(self._rows)}
+        self.changePersistentIndexList(
+            old, [self.index(position[src], col) for src, col in sources]
+        )
+        self.layoutChanged.emit()
+
+    @staticmethod
+    def _display(f: dict, col: int) -> str:
+        if col == 0:
+            return str(f.get("format_id", ""))
+        if col == 1:
+            return f.get("ext", "")
+        if col == 2:
+            return _resolution(f)
+        if col == 3:
+            return str(f.get("fps", "")) if f.get("fps") else ""
+        if col == 4:
+            return _codec(f)
+        if col == 5:
+            tbr = f.get("tbr")
+            return f"{tbr:.0f}k" if tbr else ""
+        if col == 6:
+            size = _size(f)
+            return f"{size / 1048576:.1f} MB" if size else ""
+        if col == 7:
+            return f.get("format_note", "") or ""
+        return ""
@@ -0,0 +1,101 @@
+"""Global job queue panel — every running and queued job from all pages."""
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import (
+    QAbstractItemView, QHBoxLayout, QHeaderView, QLabel, QPushButton, QSpinBox,
+    QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget,
+)
+
+from chevalvideo.scheduler import RESOURCE_CLASSES, scheduler
+
+COLUMNS = ["Job", "Class", "Priority", "State", "Progress"]
+REFRESH_MS = 250
+
+
+class JobQueueWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._sched = scheduler()
+        self._jobs = []
+
+        # Progress updates arrive many times a second; redraw at most every REFRESH_MS
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(REFRESH_MS)
+        self._refresh_timer.timeout.connect(self._refresh)
+        self._sched.changed.connect(self._schedule_refresh)
+
+        cap_row = QHBoxLayout()
+        cap_row.addWidget(QLabel("Slots:"))
+        for resource, label in RESOURCE_CLASSES.items():
+            cap_row.addWidget(QLabel(label))
+            spin = QSpinBox()
+            spin.setRange(1, 64)
+            spin.setValue(self._sched.capacity[resource])
+            spin.valueChanged.connect(lambda n, r=resource: self._sched.set_capacity(r, n))
+            cap_row.addWidget(spin)
+        cap_row.addStretch()
+
+        self._table = QTableWidget(0, len(COLUMNS))
+        self._table.setHorizontalHeaderLabels(COLUMNS)
+        self._table.verticalHeader().hide()
+        self._table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self._table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self._table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self._table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+
+        btn_row = QHBoxLayout()
+        for label, slot in (
+            ("Priority +", lambda: self._bump(1)),
+            ("Priority −", lambda: self._bump(-1)),
+            ("Cancel job", self._cancel),
+        ):
+            btn = QPushButton(label)
+            btn.clicked.connect(slot)
+            btn_row.addWidget(btn)
+        btn_row.addStretch()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 4, 8, 4)
+        layout.addLayout(cap_row)
+        layout.addWidget(self._table)
+        layout.addLayout(btn_row)
+
+    def _schedule_refresh(self):
+        if not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+
+    def _refresh(self):
+        selected = self._selected()
+        self._jobs = self._sched.jobs()
+        self._table.setRowCount(len(self._jobs))
+        for row, job in enumerate(self._jobs):
+            values = [
+                job.title,
+                RESOURCE_CLASSES.get(job.resource, job.resource),
+                str(job.priority),
+                job.state,
+                f"{job.progress:.0f}%" if job.state == "Running" else "",
+            ]
+            for col, text in enumerate(values):
+                item = self._table.item(row, col)
+                if item is None:
+                    self._table.setItem(row, col, QTableWidgetItem(text))
+                elif item.text() != text:
+                    item.setText(text)
+        if selected in self._jobs:
+            self._table.selectRow(self._jobs.index(selected))
+
+    def _selected(self):
+        row = self._table.currentRow()
+        return self._jobs[row] if 0 <= row < len(self._jobs) else None
+
+    def _bump(self, delta: int):
+        job = self._selected()
+        if job is not None:
+            self._sched.set_priority(job, job.priority + delta)
+
+    def _cancel(self):
+        job = self._selected()
+        if job is not None:
+            job.runner.cancel()
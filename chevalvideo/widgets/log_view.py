@@ -0,0 +1,159 @@
+"""Virtualized log view over a JobLog file, with search and jump-to-error."""
+
+import re
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer, QUrl
+from PyQt6.QtGui import QColor, QDesktopServices
+from PyQt6.QtWidgets import (
+    QAbstractItemView, QHBoxLayout, QLabel, QLineEdit, QListView, QPushButton,
+    QVBoxLayout, QWidget,
+)
+
+from chevalvideo.joblog import ERROR_RE, JobLog
+from chevalvideo.style import RED
+
+FLUSH_MS = 100
+
+
+class LogModel(QAbstractListModel):
+    """One row per log line; rows are read from disk only when painted."""
+
+    def __init__(self, log: JobLog, parent=None):
+        super().__init__(parent)
+        self._log = log
+        self._rows = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._log.line(index.row())
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if ERROR_RE.search(self._log.line(index.row()).encode()):
+                return QColor(RED)
+        return None
+
+    def sync(self):
+        """Expose lines appended since the last sync."""
+        n = len(self._log)
+        if n > self._rows:
+            self.beginInsertRows(QModelIndex(), self._rows, n - 1)
+            self._rows = n
+            self.endInsertRows()
+
+    def reset(self):
+        self.beginResetModel()
+        self._rows = 0
+        self.endResetModel()
+
+
+class LogView(QWidget):
+    """Full job log on disk; the view only ever holds the visible rows."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._log = JobLog()
+        self._model = LogModel(self._log, self)
+
+        # Appends are batched so a chatty process costs one view update per tick
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_MS)
+        self._flush_timer.timeout.connect(self._flush)
+
+        self._view = QListView()
+        self._view.setObjectName("log")
+        self._view.setModel(self._model)
+        self._view.setUniformItemSizes(True)
+        self._view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self._view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+
+        self._search = QLineEdit()
+        self._search.setPlaceholderText("Search log (regex)")
+        self._search.returnPressed.connect(lambda: self._find(backward=False))
+
+        prev_btn = QPushButton("Prev")
+        prev_btn.clicked.connect(lambda: self._find(backward=True))
+        next_btn = QPushButton("Next")
+        next_btn.clicked.connect(lambda: self._find(backward=False))
+        err_btn = QPushButton("Next error")
+        err_btn.clicked.connect(self._next_error)
+        open_btn = QPushButton("Open file")
+        open_btn.clicked.connect(self._open_file)
+        self._status = QLabel("")
+        self._status.setObjectName("subheading")
+
+        bar = QHBoxLayout()
+        bar.addWidget(self._search, 1)
+        for btn in (prev_btn, next_btn, err_btn, open_btn):
+            bar.addWidget(btn)
+        bar.addWidget(self._status)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(bar)
+        layout.addWidget(self._view)
+
+    @property
+    def path(self) -> str:
+        return self._log.path
+
+    def append(self, text: str):
+        self._log.append(text)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def clear(self):
+        """Start a new log file; the previous one stays on disk."""
+        self._flush_timer.stop()
+        self._log.open_new()
+        self._model.reset()
+        self._status.setText("")
+
+    def _flush(self):
+        bar = self._view.verticalScrollBar()
+        follow = bar.value() >= bar.maximum()
+        self._model.sync()
+        if follow:
+            self._view.scrollToBottom()
+
+    # ── Search ──
+
+    def _current_row(self) -> int:
+        idx = self._view.currentIndex()
+        return idx.row() if idx.isValid() else -1
+
+    def _find(self, backward: bool):
+        text = self._search.text()
+        if not text:
+            return
+        try:
+            pattern = re.compile(text.encode(), re.IGNORECASE)
+        except re.error as e:
+            self._status.setText(f"Bad pattern: {e}")
+            return
+        self._flush()
+        start = self._current_row()
+        if backward and start < 0:
+            start = len(self._log)
+        self._go_to(self._log.find(pattern, start, backward=backward), "No match")
+
+    def _next_error(self):
+        self._flush()
+        self._go_to(self._log.find_error(self._current_row()), "No more errors")
+
+    def _go_to(self, row: int, missing: str):
+        if row < 0:
+            self._status.setText(missing)
+            return
+        self._status.setText(f"Line {row + 1}")
+        idx = self._model.index(row)
+        self._view.setCurrentIndex(idx)
+        self._view.scrollTo(idx, QAbstractItemView.ScrollHint.PositionAtCenter)
+
+    def _open_file(self):
+        if self._log.path:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(self._log.path))
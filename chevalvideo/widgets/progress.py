@@ -1,9 +1,8 @@
 """Progress bar + log output + cancel button."""
 
-from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import (
-    QHBoxLayout, QPlainTextEdit, QProgressBar, QPushButton, QVBoxLayout, QWidget,
-)
+from PyQt6.QtWidgets import QHBoxLayout, QProgressBar, QPushButton, QVBoxLayout, QWidget
+
+from chevalvideo.widgets.log_view import LogView
 
 
 class ProgressWidget(QWidget):
@@ -16,16 +15,21 @@ class ProgressWidget(QWidget):
         self._bar.setRange(0, 100)
         self._bar.setValue(0)
 
-        self._log = QPlainTextEdit()
-        self._log.setReadOnly(True)
-        self._log.setMaximumBlockCount(500)
+        self._log = LogView()
+
+        self._keep_btn = QPushButton("Stop && keep")
+        self._keep_btn.setFixedWidth(110)
+        self._keep_btn.setEnabled(False)
+        self._keep_btn.setToolTip("Stop and finalize what has been written so far")
 
         self._cancel_btn = QPushButton("Cancel")
         self._cancel_btn.setFixedWidth(100)
         self._cancel_btn.setEnabled(False)
+        self._cancel_btn.setToolTip("Stop and delete the partial output")
 
         bar_row = QHBoxLayout()
         bar_row.addWidget(self._bar, 1)
+        bar_row.addWidget(self._keep_btn)
         bar_row.addWidget(self._cancel_btn)
 
         layout = QVBoxLayout(self)
@@ -37,11 +41,20 @@ class ProgressWidget(QWidget):
     def cancel_button(self):
         return self._cancel_btn
 
+    @property
+    def keep_button(self):
+        return self._keep_btn
+
     def set_progress(self, pct: float):
         self._bar.setValue(int(pct))
 
     def append_log(self, text: str):
-        self._log.appendPlainText(text)
+        self._log.append(text)
+
+    @property
+    def log_path(self) -> str:
+        """File holding the full log of the current job."""
+        return self._log.path
 
     def reset(self):
         self._bar.setValue(0)
@@ -49,3 +62,4 @@ class ProgressWidget(QWidget):
 
     def set_running(self, running: bool):
         self._cancel_btn.setEnabled(running)
+        self._keep_btn.setEnabled(running)
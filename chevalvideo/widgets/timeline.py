@@ -0,0 +1,217 @@
+"""Timeline scrubber — keyframe thumbnail strip, playhead, draggable in/out markers."""
+
+from PyQt6.QtCore import QPoint, QRect, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QImage, QPainter, QPen, QPixmap
+from PyQt6.QtWidgets import QLabel, QSizePolicy, QWidget
+
+from chevalvideo.framegrab import KeyframeStrip, fit_size
+from chevalvideo.probe import format_timestamp
+from chevalvideo.style import AMBER, AMBER_BRIGHT, BG_CELL, BORDER, GREEN, RED
+
+STRIP_HEIGHT = 48
+MARKER_GRAB_PX = 6
+SLOT_COUNT = 40
+
+
+class TimelineWidget(QWidget):
+    """Scrubbable timeline over a keyframe strip that fills in progressively.
+
+    Click or drag to move the playhead; with markers enabled, drag the green
+    (in) or red (out) handle, or press I / O to set them at the playhead.
+    Hovering shows an enlarged thumbnail and timestamp.
+    """
+
+    position_changed = pyqtSignal(float)
+    range_changed = pyqtSignal(float, float)
+
+    def __init__(self, markers: bool = True, parent=None):
+        super().__init__(parent)
+        self._markers = markers
+        self._duration = 0.0
+        self._pos = 0.0
+        self._in = 0.0
+        self._out = 0.0
+        self._drag = ""  # "", "pos", "in", "out"
+        self._thumbs: dict[int, QPixmap] = {}
+        self._strip = KeyframeStrip(parent=self)
+        self._strip.thumb_ready.connect(self._on_thumb)
+
+        self._hover = QLabel(self, Qt.WindowType.ToolTip)
+        self._hover.setStyleSheet(f"border: 1px solid {BORDER}; background: {BG_CELL};")
+        self._hover.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._hover.hide()
+
+        self.setMouseTracking(True)
+        self.setFocusPolicy(Qt.FocusPolicy.ClickFocus)
+        self.setMinimumHeight(STRIP_HEIGHT + 16)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+
+    # ── Public API ──
+
+    def set_source(self, path: str, duration: float, video_size: tuple[int, int] = (0, 0)):
+        """Point the timeline at a file and start filling the strip."""
+        self._duration = max(0.0, duration)
+        self._pos = 0.0
+        self._in, self._out = 0.0, self._duration
+        self._thumbs.clear()
+        w, h = fit_size(*video_size, 160)
+        # Thumbs are STRIP_HEIGHT tall; width follows the source aspect
+        tw = max(2, round(w * STRIP_HEIGHT / h / 2) * 2)
+        if path and self._duration > 0:
+            self._strip.load(path, self._duration, SLOT_COUNT, tw, STRIP_HEIGHT)
+        else:
+            self._strip.stop()
+        self.update()
+
+    def position(self) -> float:
+        return self._pos
+
+    def set_position(self, ts: float):
+        self._pos = self._clamp(ts)
+        self.update()
+
+    def in_point(self) -> float:
+        return self._in
+
+    def out_point(self) -> float:
+        return self._out
+
+    def set_range(self, start: float, end: float):
+        self._in = self._clamp(start)
+        self._out = max(self._in, self._clamp(end))
+        self.update()
+
+    # ── Geometry ──
+
+    def _clamp(self, ts: float) -> float:
+        return min(max(ts, 0.0), self._duration)
+
+    def _strip_rect(self) -> QRect:
+        return QRect(0, 8, self.width(), STRIP_HEIGHT)
+
+    def _x_for(self, ts: float) -> int:
+        if self._duration <= 0:
+            return 0
+        return round(ts / self._duration * (self.width() - 1))
+
+    def _ts_for(self, x: int) -> float:
+        if self.width() <= 1:
+            return 0.0
+        return self._clamp(x / (self.width() - 1) * self._duration)
+
+    def _slot_for(self, ts: float) -> int:
+        if self._duration <= 0:
+            return 0
+        return min(SLOT_COUNT - 1, int(ts / self._duration * SLOT_COUNT))
+
+    # ── Painting ──
+
+    def paintEvent(self, _event):
+        p = QPainter(self)
+        rect = self._strip_rect()
+        p.fillRect(rect, QColor(BG_CELL))
+
+        slot_w = rect.width() / SLOT_COUNT
+        for i, pix in self._thumbs.items():
+            x = round(i * slot_w)
+            target = QRect(x, rect.top(), round((i + 1) * slot_w) - x, rect.height())
+            # Centre-crop the thumb into its slot
+            src = pix.rect()
+            if src.width() > target.width():
+                src = QRect((src.width() - target.width()) // 2, 0, target.width(), src.height())
+            p.drawPixmap(target, pix, src)
+
+        if self._markers and self._duration > 0:
+            x_in, x_out = self._x_for(self._in), self._x_for(self._out)
+            shade = QColor(0, 0, 0, 160)
+            p.fillRect(QRect(0, rect.top(), x_in, rect.height()), shade)
+            p.fillRect(QRect(x_out, rect.top(), self.width() - x_out, rect.height()), shade)
+            for x, color in ((x_in, GREEN), (x_out, RED)):
+                p.setPen(QPen(QColor(color), 2))
+                p.drawLine(x, 0, x, self.height())
+
+        p.setPen(QPen(QColor(BORDER), 1))
+        p.drawRect(rect.adjusted(0, 0, -1, -1))
+
+        x = self._x_for(self._pos)
+        p.setPen(QPen(QColor(AMBER_BRIGHT), 2))
+        p.drawLine(x, 0, x, self.height())
+        p.setPen(QColor(AMBER))
+        p.drawText(QPoint(min(x + 4, max(0, self.width() - 90)), self.height() - 2),
+                   format_timestamp(self._pos))
+        p.end()
+
+    def _on_thumb(self, i: int, img: QImage):
+        self._thumbs[i] = QPixmap.fromImage(img)
+        self.update()
+
+    # ── Mouse / keyboard ──
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.MouseButton.LeftButton or self._duration <= 0:
+            return
+        x = round(event.position().x())
+        self._drag = "pos"
+        if self._markers:
+            if abs(x - self._x_for(self._in)) <= MARKER_GRAB_PX:
+                self._drag = "in"
+            elif abs(x - self._x_for(self._out)) <= MARKER_GRAB_PX:
+                self._drag = "out"
+        self._drag_to(x)
+
+    def mouseMoveEvent(self, event):
+        x = round(event.position().x())
+        if self._drag:
+            self._drag_to(x)
+        self._show_hover(event.globalPosition().toPoint(), self._ts_for(x))
+
+    def mouseReleaseEvent(self, _event):
+        self._drag = ""
+
+    def leaveEvent(self, _event):
+        self._hover.hide()
+
+    def keyPressEvent(self, event):
+        if self._markers and event.key() == Qt.Key.Key_I:
+            self._in = min(self._pos, self._out)
+            self.range_changed.emit(self._in, self._out)
+            self.update()
+        elif self._markers and event.key() == Qt.Key.Key_O:
+            self._out = max(self._pos, self._in)
+            self.range_changed.emit(self._in, self._out)
+            self.update()
+        else:
+            super().keyPressEvent(event)
+
+    def _drag_to(self, x: int):
+        ts = self._ts_for(x)
+        if self._drag == "in":
+            self._in = min(ts, self._out)
+            self.range_changed.emit(self._in, self._out)
+        elif self._drag == "out":
+            self._out = max(ts, self._in)
+            self.range_changed.emit(self._in, self._out)
+        else:
+            self._pos = ts
+            self.position_changed.emit(ts)
+        self.update()
+
+    def _show_hover(self, global_pos: QPoint, ts: float):
+        if self._duration <= 0:
+            return
+        pix = self._thumbs.get(self._slot_for(ts))
+        if pix is not None:
+            # Stamp the time onto an enlarged copy of the nearest thumb
+            big = pix.scaledToHeight(STRIP_HEIGHT * 2)
+            p = QPainter(big)
+            p.fillRect(QRect(0, big.height() - 16, big.width(), 16), QColor(0, 0, 0, 180))
+            p.setPen(QColor(AMBER))
+            p.drawText(QRect(0, big.height() - 16, big.width(), 16),
+                       Qt.AlignmentFlag.AlignCenter, format_timestamp(ts))
+            p.end()
+            self._hover.setPixmap(big)
+        else:
+            self._hover.setText(format_timestamp(ts))
+        self._hover.adjustSize()
+        self._hover.move(global_pos + QPoint(-self._hover.width() // 2, -self._hover.height() - 12))
+        self._hover.show()
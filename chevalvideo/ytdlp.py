@@ -0,0 +1,348 @@
+"""yt-dlp helpers — streaming -j parser, info cache, concurrent download queue."""
+
+import hashlib
+import json
+import os
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from chevalvideo.paths import cache_dir, data_dir
+from chevalvideo.runner import CommandRunner
+from chevalvideo.scheduler import scheduler
+
+
+def archive_path() -> str:
+    """Shared --download-archive file; yt-dlp skips any ID recorded here."""
+    return str(data_dir() / "ytdlp-archive.txt")
+
+
+def entry_url(info: dict) -> str:
+    """Best URL to re-request a single entry (full or --flat-playlist dict)."""
+    return info.get("webpage_url") or info.get("original_url") or info.get("url") or ""
+
+
+# Query parameters that never change what is extracted
+_TRACKING_PARAMS = {"si", "feature", "fbclid", "gclid", "pp", "ab_channel"}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical cache key: lower-case host, no fragment, sorted non-tracking query."""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in _TRACKING_PARAMS and not k.startswith("utm_")
+    )
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return urlunsplit((parts.scheme.lower(), host, parts.path.rstrip("/"), urlencode(query), ""))
+
+
+class InfoCache:
+    """On-disk cache of yt-dlp info JSON, one file per normalized URL.
+
+    Entries expire after `ttl` seconds (format URLs signed by the site go
+    stale) and the oldest-used files are evicted once the directory grows
+    past `max_bytes`.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_bytes: int = 128 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._dir = cache_dir("info")
+
+    def path_for(self, url: str) -> str:
+        digest = hashlib.sha1(normalize_url(url).encode()).hexdigest()
+        return str(self._dir / f"{digest}.info.json")
+
+    def get_path(self, url: str) -> str | None:
+        """Path of a fresh cached info file (usable with --load-info-json), or None."""
+        path = self.path_for(url)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if time.time() - st.st_mtime > self.ttl:
+            self._remove(path)
+            return None
+        # Bump atime so eviction is least-recently-used, mtime still tracks age
+        os.utime(path, (time.time(), st.st_mtime))
+        return path
+
+    def get(self, url: str) -> dict | None:
+        path = self.get_path(url)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._remove(path)
+            return None
+
+    def put(self, url: str, info: dict):
+        # Only full single-video dicts are replayable by --load-info-json
+        if "formats" not in info or info.get("_type") == "playlist":
+            return
+        path = self.path_for(url)
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(info, f)
+            os.replace(tmp, path)
+        except OSError:
+            self._remove(tmp)
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self._dir):
+            if not entry.name.endswith(".info.json"):
+                continue
+            st = entry.stat()
+            total += st.st_size
+            entries.append((st.st_atime, st.st_size, entry.path))
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _atime, size, path in entries:
+            self._remove(path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class JsonLineParser:
+    """Incremental parser for yt-dlp's one-JSON-object-per-line `-j` output.
+
+    Feed raw chunks as they arrive; complete lines are decoded immediately
+    so nothing but the trailing partial line is buffered.
+    """
+
+    def __init__(self):
+        self._buf = b""
+
+    def feed(self, data: bytes) -> tuple[list[dict], list[str]]:
+        """Return (decoded objects, other non-empty text lines) from complete lines."""
+        self._buf += data
+        *complete, self._buf = self._buf.split(b"\n")
+        return self._decode(complete)
+
+    def flush(self) -> tuple[list[dict], list[str]]:
+        """Decode whatever is left once the process has exited."""
+        rest, self._buf = self._buf, b""
+        return self._decode([rest])
+
+    @staticmethod
+    def _decode(raw_lines: list[bytes]) -> tuple[list[dict], list[str]]:
+        objs, text = [], []
+        for raw in raw_lines:
+            line = raw.decode(errors="replace").strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                try:
+                    objs.append(json.loads(line))
+                    continue
+                except json.JSONDecodeError:
+                    pass
+            text.append(line)
+        return objs, text
+
+
+class QueueItem:
+    """One URL in the download queue."""
+
+    def __init__(self, url: str, cmd: list[str], replay: bool = False):
+        self.url = url
+        self.cmd = cmd          # ends with the URL
+        self.replay = replay    # swap the URL for a fresh cached extraction at launch
+        self.attempts = 0
+        self.status = "Queued"
+        self.progress = 0.0
+        self.skipped = False
+
+
+class DownloadQueue(QObject):
+    """Runs yt-dlp jobs with bounded parallelism and retry with exponential backoff."""
+
+    item_progress = pyqtSignal(int, float)   # (index, 0.0 – 100.0)
+    item_status = pyqtSignal(int, str)       # (index, status text)
+    output = pyqtSignal(str)                 # prefixed log line
+    progress = pyqtSignal(float)             # aggregate 0.0 – 100.0
+    finished = pyqtSignal(int, int)          # (succeeded, failed)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items: list[QueueItem] = []
+        self._waiting: list[int] = []
+        self._active: dict[CommandRunner, int] = {}
+        self._retry_timers: set[QTimer] = set()
+        self._parallel = 3
+        self._slots = 0   # network slots reserved from the scheduler while running
+        self.info_cache: InfoCache | None = None
+        self._max_retries = 3
+        self._backoff = 2.0  # seconds; doubles each attempt
+        self._running = False
+        self._cancelling = False
+
+    def items(self) -> list[QueueItem]:
+        return self._items
+
+    def add(self, url: str, cmd: list[str], *, replay: bool = False) -> int:
+        self._items.append(QueueItem(url, cmd, replay))
+        idx = len(self._items) - 1
+        if self._running:
+            self._waiting.append(idx)
+            self._fill()
+        return idx
+
+    def clear(self):
+        if self._running:
+            return
+        self._items.clear()
+
+    def set_parallel(self, n: int):
+        self._parallel = max(1, n)
+        if self._running:
+            self._reserve()
+            self._fill()
+
+    def set_retries(self, n: int, backoff: float = 2.0):
+        self._max_retries = max(0, n)
+        self._backoff = backoff
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def start(self) -> bool:
+        """Start every item not yet done; False if there was nothing to start."""
+        if self._running:
+            return False
+        self._waiting = [
+            i for i, it in enumerate(self._items)
+            if not it.status.startswith(("Done", "Skipped"))
+        ]
+        for i in self._waiting:
+            self._items[i].attempts = 0
+            self._set_status(i, "Queued")
+        if not self._waiting:
+            return False
+        self._running = True
+        self._cancelling = False
+        self._reserve()
+        self._fill()
+        return True
+
+    def _reserve(self):
+        """Hold as many network slots as downloads we run side by side."""
+        self._slots = scheduler().reserve(self, "net", self._parallel)
+        if self._slots < self._parallel:
+            self.output.emit(f"Running {self._slots} downloads at a time (the most allowed)")
+
+    def cancel(self, *, keep: bool = False):
+        """Stop the queue; `keep` lets running downloads stop gracefully (see CommandRunner.cancel)."""
+        if not self._running:
+            return
+        self._cancelling = True
+        for i in self._waiting:
+            self._set_status(i, "Cancelled")
+        self._waiting.clear()
+        for t in self._retry_timers:
+            t.stop()
+            t.deleteLater()
+        self._retry_timers.clear()
+        for i, it in enumerate(self._items):
+            if it.status.startswith("Retry"):
+                self._set_status(i, "Cancelled")
+        for runner in list(self._active):
+            runner.cancel(keep=keep)
+        if not self._active:
+            self._finish()
+
+    def _fill(self):
+        while self._waiting and len(self._active) < self._slots:
+            idx = self._waiting.pop(0)
+            item = self._items[idx]
+            item.attempts += 1
+            item.progress = 0.0
+            item.skipped = False
+            runner = CommandRunner(self)
+            runner.progress.connect(lambda pct, i=idx: self._on_progress(i, pct))
+            runner.output.connect(lambda line, i=idx: self._on_output(i, line))
+            runner.finished.connect(lambda ok, msg, r=runner: self._on_finished(r, ok, msg))
+            self._active[runner] = idx
+            suffix = f" (attempt {item.attempts})" if item.attempts > 1 else ""
+            self._set_status(idx, f"Downloading{suffix}")
+            runner.run(self._launch_cmd(item))
+
+    def _launch_cmd(self, item: QueueItem) -> list[str]:
+        """The item's command, replaying its cached extraction if one is still fresh."""
+        cached = self.info_cache.get_path(item.url) if item.replay and self.info_cache else None
+        if cached:
+            return [*item.cmd[:-1], "--load-info-json", cached]
+        return item.cmd
+
+    def _on_progress(self, idx: int, pct: float):
+        self._items[idx].progress = pct
+        self.item_progress.emit(idx, pct)
+        total = sum(it.progress for it in self._items)
+        self.progress.emit(total / len(self._items) if self._items else 0.0)
+
+    def _on_output(self, idx: int, line: str):
+        if "has already been recorded in the archive" in line:
+            self._items[idx].skipped = True
+        self.output.emit(f"[{idx + 1}] {line}")
+
+    def _on_finished(self, runner: CommandRunner, ok: bool, msg: str):
+        idx = self._active.pop(runner)
+        runner.deleteLater()
+        item = self._items[idx]
+        if ok:
+            self._set_status(idx, "Skipped (archived)" if item.skipped else "Done")
+            self._on_progress(idx, 100.0)
+        elif self._cancelling:
+            self._set_status(idx, "Cancelled")
+        elif item.attempts <= self._max_retries:
+            delay = self._backoff * (2 ** (item.attempts - 1))
+            self._set_status(idx, f"Retry in {delay:.0f}s ({msg})")
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda i=idx, t=timer: self._retry(i, t))
+            self._retry_timers.add(timer)
+            timer.start(int(delay * 1000))
+        else:
+            self._set_status(idx, f"Failed ({msg})")
+
+        self._fill()
+        if not self._active and not self._waiting and not self._retry_timers:
+            self._finish()
+
+    def _retry(self, idx: int, timer: QTimer):
+        self._retry_timers.discard(timer)
+        timer.deleteLater()
+        self._waiting.append(idx)
+        self._fill()
+
+    def _finish(self):
+        self._running = False
+        scheduler().release(self)
+        self._slots = 0
+        ok = sum(1 for it in self._items if it.status.startswith(("Done", "Skipped")))
+        failed = sum(1 for it in self._items if it.status.startswith(("Failed", "Cancelled")))
+        self.finished.emit(ok, failed)
+
+    def _set_status(self, idx: int, status: str):
+        self._items[idx].status = status
+        self.item_status.emit(idx, status)